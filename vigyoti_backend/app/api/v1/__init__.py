@@ -1,2 +1,3 @@
 from .content_sources import router as content_sources_router
-from .twitter import router as twitter_router 
\ No newline at end of file
+from .twitter import router as twitter_router 
+from .jobs import router as jobs_router
@@ -1,22 +1,31 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Depends, status, Form
-from typing import Optional, List, Dict, Union
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Awaitable, Callable, Optional, List, Dict, Union
 from pydantic import BaseModel, HttpUrl
 from ...services.content_processing import process_youtube_url
 from ...services.content_processing.youtube import (
     extract_video_id, 
     fetch_transcript_and_summary,
-    generate_twitter_content
+    generate_twitter_content,
+    build_youtube_twitter_messages
 )
-from ...services.content_processing.audio import process_audio_file
-from ...services.content_processing.image import process_image, generate_twitter_content as image_twitter_content
-from ...services.content_processing.document import process_document, generate_twitter_content as document_twitter_content
-from ...services.content_processing.text import process_text_to_twitter
-from ...core.exceptions import ContentProcessingError
+from ...services.content_processing.youtube_batch import resolve_batch_videos, process_youtube_batch
+from ...services.content_processing.audio import process_audio_file, process_m3u8_url, spool_audio
+from ...services.content_processing.image import process_image, spool_image, generate_twitter_content as image_twitter_content
+from ...services.content_processing.document import process_document, spool_document, generate_twitter_content as document_twitter_content, build_document_twitter_messages
+from ...services.content_processing.text import process_text_to_twitter, build_text_twitter_messages
+from ...services.content_processing.streaming import stream_twitter_content, format_sse, SSE_HEADERS
+from ...services.content_processing.pipeline import run_stage, generation_stage_id, GENERATE
+from ...core.exceptions import ContentProcessingError, FileSizeError, FileTypeError
 from ...core.cache import get_cache_key, get_cached_data, set_cached_data
-from ...utils.cost_calculator import CostCalculator
+from ...core.usage import start_usage_tracking
+from ...utils.hashing import hash_text, hash_params
+from ...utils.uploads import SpooledUpload
+from ...utils.source_identity import canonical_source_id
 from fastapi import status
 from ...schemas.twitter import TwitterContent as TwitterContentSchema
-from ...services.content_processing.article import process_url_to_twitter
+from ...services.content_processing.article import process_url_to_twitter, fetch_article_and_summary, build_article_twitter_messages
 from ...schemas.cost import CostInfo
 from ...schemas.content import AudioToTwitterResponse, DocumentToTwitterResponse, ImageToTwitterResponse, ImageGenerationRequest, ImageGenerationResponse
 from ...services.image_generation import generate_image_from_prompt
@@ -47,6 +56,16 @@ class ContentGenerationRequest(BaseModel):
     generate_image: bool = False
     is_premium: bool = False
 
+class YouTubeBatchRequest(BaseModel):
+    playlist: Optional[str] = None  # playlist URL or id
+    channel: Optional[str] = None  # channel URL, id or @handle; its latest uploads are used
+    urls: Optional[List[str]] = None
+    max_videos: int = 10
+    content_type: str = "short"  # "short", "long", "thread", "poll", "quote"
+    num_tweets: int = 1
+    additional_context: Optional[str] = None
+    is_premium: bool = False
+
 class ContentGenerationResponse(BaseModel):
     video_title: Optional[str]
     video_summary: Optional[str]
@@ -59,6 +78,7 @@ class ContentGenerationResponse(BaseModel):
 async def youtube_to_twitter(request: ContentGenerationRequest):
     logger.info(f"Received request for URL: {request.url}")
     logger.info(f"Request parameters: {request.dict()}")
+    usage = start_usage_tracking()
     
     try:
         # Extract video ID from URL
@@ -90,13 +110,24 @@ async def youtube_to_twitter(request: ContentGenerationRequest):
         # Generate tweets
         try:
             logger.info(f"Generating tweets. Content type: {request.content_type}, Num tweets: {request.num_tweets}")
-            tweets_content = await generate_twitter_content(
-                transcript=full_transcript,
-                summary=video_summary,
-                content_type=request.content_type,
-                num_tweets=request.num_tweets,
-                additional_context=request.additional_context,
-                is_premium=request.is_premium
+            tweets_content = await run_stage(
+                GENERATE,
+                generation_stage_id(
+                    "youtube",
+                    f"{video_summary}\n{full_transcript}",
+                    content_type=request.content_type,
+                    num_tweets=request.num_tweets,
+                    additional_context=request.additional_context,
+                    is_premium=request.is_premium
+                ),
+                lambda: generate_twitter_content(
+                    transcript=full_transcript,
+                    summary=video_summary,
+                    content_type=request.content_type,
+                    num_tweets=request.num_tweets,
+                    additional_context=request.additional_context,
+                    is_premium=request.is_premium
+                )
             )
             logger.info(f"Successfully generated {len(tweets_content)} tweets")
         except Exception as e:
@@ -118,14 +149,8 @@ async def youtube_to_twitter(request: ContentGenerationRequest):
             for i, text in enumerate(tweets_content)
         ]
 
-        # Calculate costs
-        cost_info = {
-            "input_tokens": len(full_transcript) // 4,
-            "output_tokens": sum(len(tweet.tweet_text) for tweet in generated_tweets) // 4,
-            "input_cost": 0.001,
-            "output_cost": 0.002,
-            "total_cost": 0.003
-        }
+        # Costs of the calls this request actually made
+        cost_info = usage.to_cost_info().model_dump()
 
         response_data = ContentGenerationResponse(
             video_title=video_title,
@@ -254,12 +279,14 @@ async def url_to_twitter(input_data: URLToTwitterInput):
     """Generate X (formerly Twitter) content from any URL"""
     try:
         # Generate cache key
-        cache_key = get_cache_key("url_twitter", f"{input_data.url}_{input_data.content_type}_{input_data.num_tweets}_{input_data.additional_context}_{input_data.generate_image}_{input_data.is_premium}")
+        cache_key = get_cache_key("url_twitter", f"{canonical_source_id(str(input_data.url))}_{input_data.content_type}_{input_data.num_tweets}_{input_data.additional_context}_{input_data.generate_image}_{input_data.is_premium}")
         
         # Check cache first
-        cached_result = get_cached_data(cache_key)
+        cached_result = await get_cached_data(cache_key)
         if cached_result:
             return URLToTwitterResponse(**cached_result)
+        
+        usage = start_usage_tracking()
             
         # Process URL
         result = await process_url_to_twitter(
@@ -271,31 +298,6 @@ async def url_to_twitter(input_data: URLToTwitterInput):
             is_premium=input_data.is_premium
         )
         
-        # Calculate GPT costs
-        input_text = f"{result['full_text']}\nContent type: {input_data.content_type}\nNumber of tweets: {input_data.num_tweets}"
-        if input_data.additional_context:
-            input_text += f"\nAdditional context: {input_data.additional_context}"
-            
-        output_text = result['article_summary'] + "\n" + "\n".join(tweet['tweet_text'] for tweet in result['generated_tweets'])
-        
-        gpt_costs = CostCalculator.calculate_gpt_cost(input_text, output_text)
-        
-        # Calculate image generation costs if applicable
-        image_costs = None
-        num_images = sum(1 for tweet in result['generated_tweets'] if tweet.get('image_url'))
-        if num_images > 0:
-            image_costs = CostCalculator.calculate_image_cost(num_images)
-            
-        # Calculate Firecrawl costs (1 credit per URL)
-        firecrawl_costs = CostCalculator.calculate_firecrawl_cost(1)
-        
-        # Calculate total cost
-        total_cost = CostCalculator.calculate_total_cost(
-            gpt_costs, 
-            image_cost=image_costs,
-            firecrawl_cost=firecrawl_costs
-        )
-        
         # Create response object
         response = URLToTwitterResponse(
             article_title=result.get('article_title'),
@@ -303,21 +305,11 @@ async def url_to_twitter(input_data: URLToTwitterInput):
             full_text=result['full_text'],
             generated_tweets=[TwitterContentSchema(**tweet) for tweet in result['generated_tweets']],
             metadata=result.get('metadata'),
-            cost_info=CostInfo(
-                input_tokens=gpt_costs["input_tokens"],
-                output_tokens=gpt_costs["output_tokens"],
-                input_cost=gpt_costs["input_cost"],
-                output_cost=gpt_costs["output_cost"],
-                total_cost=total_cost,
-                num_images_generated=num_images if num_images > 0 else None,
-                image_generation_cost=image_costs["cost"] if image_costs else None,
-                firecrawl_credits_used=1,
-                firecrawl_cost=firecrawl_costs["cost"]
-            )
+            cost_info=usage.to_cost_info()
         )
         
         # Cache the result as a dictionary
-        set_cached_data(cache_key, response.model_dump())
+        await set_cached_data(cache_key, response.model_dump())
         
         return response
     except ContentProcessingError as e:
@@ -325,6 +317,15 @@ async def url_to_twitter(input_data: URLToTwitterInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+async def receive_upload(spool: Callable[[UploadFile], Awaitable[SpooledUpload]], file: UploadFile) -> SpooledUpload:
+    """Spool an upload in one streamed pass, turning type and size violations into client errors"""
+    try:
+        return await spool(file)
+    except FileSizeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except FileTypeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.post("/audio-to-twitter", response_model=AudioToTwitterResponse)
 async def audio_to_twitter(
     file: UploadFile = File(...),
@@ -335,6 +336,7 @@ async def audio_to_twitter(
     is_premium: bool = Form(False, description="Whether this is a premium post (allows longer content)")
 ):
     """Process audio file and generate Twitter content"""
+    upload = await receive_upload(spool_audio, file)
     try:
         # Convert form data to proper types
         num_tweets = int(num_tweets)  # Ensure num_tweets is an integer
@@ -342,10 +344,11 @@ async def audio_to_twitter(
         is_premium = is_premium.lower() == 'true' if isinstance(is_premium, str) else is_premium
         
         logger.info(f"[audio_to_twitter] Received request with num_tweets={num_tweets} (type: {type(num_tweets)})")
+        start_usage_tracking()
         
         # Process audio file
         result = await process_audio_file(
-            file=file,
+            upload=upload,
             content_type=content_type,
             num_tweets=num_tweets,
             additional_context=additional_context,
@@ -369,6 +372,26 @@ async def audio_to_twitter(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    finally:
+        upload.cleanup()
+
+@router.post("/m3u8-to-twitter", response_model=AudioToTwitterResponse)
+async def m3u8_to_twitter(input_data: URLToTwitterInput):
+    """Transcribe an HLS (m3u8) stream and generate Twitter content"""
+    try:
+        start_usage_tracking()
+        return await process_m3u8_url(
+            url=input_data.url,
+            content_type=input_data.content_type,
+            num_tweets=input_data.num_tweets,
+            additional_context=input_data.additional_context,
+            generate_image=input_data.generate_image,
+            is_premium=input_data.is_premium
+        )
+    except ContentProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/image-to-twitter", response_model=ImageToTwitterResponse)
 async def image_to_twitter(
@@ -380,53 +403,62 @@ async def image_to_twitter(
     is_premium: bool = Form(False, description="Whether this is a premium post (allows longer content)")
 ):
     """Generate X (formerly Twitter) content from an uploaded image"""
+    # One streamed pass spools, size-checks and hashes the upload
+    upload = await receive_upload(spool_image, file)
     try:
-        # Generate cache key
-        cache_key = get_cache_key("image_twitter", f"{file.filename}_{content_type}_{num_tweets}_{additional_context}_{generate_image}_{is_premium}")
-        
-        # Check cache first
-        cached_result = get_cached_data(cache_key)
-        if cached_result:
-            return cached_result
-            
-        # Process image
-        processed_content = await process_image(file)
-        
-        # Generate tweets
-        tweets, gpt_costs = await image_twitter_content(
-            image_analysis=processed_content.full_text,
+        # Generate cache key from the image bytes and generation parameters
+        content_hash = upload.sha256
+        params_hash = hash_params(
             content_type=content_type,
             num_tweets=num_tweets,
             additional_context=additional_context,
             generate_image=generate_image,
             is_premium=is_premium
         )
+        cache_key = get_cache_key("image_twitter", f"{content_hash}:{params_hash}")
         
-        # Calculate costs
-        input_text = f"{processed_content.full_text}\nContent type: {content_type}\nNumber of tweets: {num_tweets}"
-        if additional_context:
-            input_text += f"\nAdditional context: {additional_context}"
+        # Check cache first
+        cached_result = await get_cached_data(cache_key)
+        if cached_result:
+            return ImageToTwitterResponse(**cached_result)
+        
+        usage = start_usage_tracking()
             
-        output_text = "\n".join(tweet["tweet_text"] for tweet in tweets)
+        # Process image
+        processed_content = await process_image(upload)
         
-        gpt_costs = CostCalculator.calculate_gpt_cost(input_text, output_text)
+        # Generate tweets
+        tweets = await run_stage(
+            GENERATE,
+            generation_stage_id(
+                "image",
+                processed_content.full_text,
+                content_type=content_type,
+                num_tweets=num_tweets,
+                additional_context=additional_context,
+                generate_image=generate_image,
+                is_premium=is_premium
+            ),
+            lambda: image_twitter_content(
+                image_analysis=processed_content.full_text,
+                content_type=content_type,
+                num_tweets=num_tweets,
+                additional_context=additional_context,
+                generate_image=generate_image,
+                is_premium=is_premium
+            )
+        )
         
         # Create response
         result = ImageToTwitterResponse(
             image_description=processed_content.full_text,
             generated_tweets=[TwitterContentSchema(**tweet) for tweet in tweets],  # Convert to TwitterContentSchema
             metadata={},
-            cost_info=CostInfo(
-                input_tokens=gpt_costs["input_tokens"],
-                output_tokens=gpt_costs["output_tokens"],
-                input_cost=gpt_costs["input_cost"],
-                output_cost=gpt_costs["output_cost"],
-                total_cost=gpt_costs["total_cost"]
-            )
+            cost_info=usage.to_cost_info()
         )
         
         # Cache the result
-        set_cached_data(cache_key, result)
+        await set_cached_data(cache_key, result.model_dump())
         
         return result
     except ContentProcessingError as e:
@@ -436,6 +468,8 @@ async def image_to_twitter(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    finally:
+        upload.cleanup()
 
 @router.post("/document-to-twitter", response_model=DocumentToTwitterResponse)
 async def document_to_twitter(
@@ -447,53 +481,62 @@ async def document_to_twitter(
     is_premium: bool = Form(False, description="Whether this is a premium post (allows longer content)")
 ):
     """Generate X (formerly Twitter) content from an uploaded document"""
+    # One streamed pass spools, size-checks and hashes the upload
+    upload = await receive_upload(spool_document, file)
     try:
-        # Generate cache key
-        cache_key = get_cache_key("document_twitter", f"{file.filename}_{content_type}_{num_tweets}_{additional_context}_{generate_image}_{is_premium}")
-        
-        # Check cache first
-        cached_result = get_cached_data(cache_key)
-        if cached_result:
-            return cached_result
-            
-        # Process document
-        processed_content = await process_document(file)
-        
-        # Generate tweets
-        tweets, gpt_costs = await document_twitter_content(
-            document_text=processed_content.full_text,  # Use document_text parameter
+        # Generate cache key from the document bytes and generation parameters
+        content_hash = upload.sha256
+        params_hash = hash_params(
             content_type=content_type,
             num_tweets=num_tweets,
             additional_context=additional_context,
             generate_image=generate_image,
             is_premium=is_premium
         )
+        cache_key = get_cache_key("document_twitter", f"{content_hash}:{params_hash}")
+        
+        # Check cache first
+        cached_result = await get_cached_data(cache_key)
+        if cached_result:
+            return DocumentToTwitterResponse(**cached_result)
         
-        # Calculate costs
-        input_text = f"{processed_content.full_text}\nContent type: {content_type}\nNumber of tweets: {num_tweets}"
-        if additional_context:
-            input_text += f"\nAdditional context: {additional_context}"
+        usage = start_usage_tracking()
             
-        output_text = processed_content.summary + "\n" + "\n".join(tweet["tweet_text"] for tweet in tweets)
+        # Process document
+        processed_content = await process_document(upload)
         
-        gpt_costs = CostCalculator.calculate_gpt_cost(input_text, output_text)
+        # Generate tweets
+        tweets = await run_stage(
+            GENERATE,
+            generation_stage_id(
+                "document",
+                processed_content.full_text,
+                content_type=content_type,
+                num_tweets=num_tweets,
+                additional_context=additional_context,
+                generate_image=generate_image,
+                is_premium=is_premium
+            ),
+            lambda: document_twitter_content(
+                document_text=processed_content.full_text,  # Use document_text parameter
+                content_type=content_type,
+                num_tweets=num_tweets,
+                additional_context=additional_context,
+                generate_image=generate_image,
+                is_premium=is_premium
+            )
+        )
         
         # Create response
         result = DocumentToTwitterResponse(
             document_content=processed_content.full_text,
             document_summary=processed_content.summary,
             generated_tweets=tweets,  # Pass raw dictionaries
-            cost_info=CostInfo(
-                input_tokens=gpt_costs["input_tokens"],
-                output_tokens=gpt_costs["output_tokens"],
-                input_cost=gpt_costs["input_cost"],
-                output_cost=gpt_costs["output_cost"],
-                total_cost=gpt_costs["total_cost"]
-            )
+            cost_info=usage.to_cost_info()
         )
         
         # Cache the result
-        set_cached_data(cache_key, result)
+        await set_cached_data(cache_key, result.model_dump())
         
         return result
     except ContentProcessingError as e:
@@ -503,22 +546,32 @@ async def document_to_twitter(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    finally:
+        upload.cleanup()
 
 @router.post("/text-to-twitter", response_model=TextToTwitterResponse)
 async def text_to_twitter(input_data: TextToTwitterInput):
     """Generate X (formerly Twitter) content from text input"""
     try:
-        # Generate cache key with all input parameters as identifier
-        identifier = f"{input_data.text[:50]}_{input_data.content_type}_{input_data.num_tweets}_{input_data.additional_context}_{input_data.generate_image}_{input_data.is_premium}"
-        cache_key = get_cache_key("text_to_twitter", identifier)
+        # Generate cache key from the full text and all generation parameters
+        params_hash = hash_params(
+            content_type=input_data.content_type,
+            num_tweets=input_data.num_tweets,
+            additional_context=input_data.additional_context,
+            generate_image=input_data.generate_image,
+            is_premium=input_data.is_premium
+        )
+        cache_key = get_cache_key("text_to_twitter", f"{hash_text(input_data.text)}:{params_hash}")
         
         # Check cache
-        cached_data = get_cached_data(cache_key)
+        cached_data = await get_cached_data(cache_key)
         if cached_data:
             return TextToTwitterResponse(**cached_data)
         
+        usage = start_usage_tracking()
+        
         # Process text and generate tweets
-        generated_tweets, gpt_costs = await process_text_to_twitter(
+        generated_tweets = await process_text_to_twitter(
             text=input_data.text,
             content_type=input_data.content_type,
             num_tweets=input_data.num_tweets,
@@ -531,17 +584,11 @@ async def text_to_twitter(input_data: TextToTwitterInput):
         result = TextToTwitterResponse(
             generated_tweets=generated_tweets,
             metadata={},
-            cost_info=CostInfo(
-                input_tokens=gpt_costs["input_tokens"],
-                output_tokens=gpt_costs["output_tokens"],
-                input_cost=gpt_costs["input_cost"],
-                output_cost=gpt_costs["output_cost"],
-                total_cost=gpt_costs["total_cost"]
-            )
+            cost_info=usage.to_cost_info()
         )
         
         # Cache the result
-        set_cached_data(cache_key, result.model_dump())
+        await set_cached_data(cache_key, result.model_dump())
         
         return result
     except ContentProcessingError as e:
@@ -552,6 +599,183 @@ async def text_to_twitter(input_data: TextToTwitterInput):
             detail=str(e)
         )
 
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an SSE event generator in a streaming response"""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/text-to-twitter/stream")
+async def text_to_twitter_stream(input_data: TextToTwitterInput):
+    """Stream X (formerly Twitter) content generated from text input as Server-Sent Events"""
+    start_usage_tracking()
+    messages, max_tokens, temperature = await asyncio.to_thread(
+        build_text_twitter_messages,
+        text=input_data.text,
+        content_type=input_data.content_type,
+        num_tweets=input_data.num_tweets,
+        additional_context=input_data.additional_context,
+        is_premium=input_data.is_premium
+    )
+    return sse_response(stream_twitter_content(
+        messages,
+        content_type=input_data.content_type,
+        num_tweets=input_data.num_tweets,
+        is_premium=input_data.is_premium,
+        max_tokens=max_tokens,
+        temperature=temperature
+    ))
+
+@router.post("/url-to-twitter/stream")
+async def url_to_twitter_stream(input_data: URLToTwitterInput):
+    """Stream X (formerly Twitter) content generated from any URL as Server-Sent Events"""
+    start_usage_tracking()
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            article_data = await fetch_article_and_summary(str(input_data.url))
+        except ContentProcessingError as e:
+            yield format_sse("error", {"detail": str(e)})
+            return
+        yield format_sse("source", {
+            "article_summary": article_data["summary"],
+            "metadata": article_data.get("metadata")
+        })
+
+        messages, max_tokens, temperature = await asyncio.to_thread(
+            build_article_twitter_messages,
+            article_data["summary"],
+            input_data.content_type,
+            input_data.num_tweets,
+            input_data.additional_context,
+            input_data.is_premium
+        )
+        async for event in stream_twitter_content(
+            messages,
+            content_type=input_data.content_type,
+            num_tweets=input_data.num_tweets,
+            is_premium=input_data.is_premium,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ):
+            yield event
+
+    return sse_response(events())
+
+@router.post("/youtube-to-twitter/stream")
+async def youtube_to_twitter_stream(request: ContentGenerationRequest):
+    """Stream X (formerly Twitter) content generated from a YouTube video as Server-Sent Events"""
+    start_usage_tracking()
+    video_id = extract_video_id(request.url)
+    if not video_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid YouTube URL: {request.url}"
+        )
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            transcript_data = await fetch_transcript_and_summary(video_id)
+        except Exception as e:
+            logger.error(f"Error fetching transcript: {str(e)}", exc_info=True)
+            yield format_sse("error", {"detail": f"Failed to fetch video transcript: {str(e)}"})
+            return
+        video_summary = transcript_data.get("video_summary", "")
+        yield format_sse("source", {
+            "video_title": transcript_data.get("video_title", ""),
+            "video_summary": video_summary,
+            "metadata": {"video_id": video_id}
+        })
+
+        messages, max_tokens, temperature = await asyncio.to_thread(
+            build_youtube_twitter_messages,
+            transcript=transcript_data.get("full_transcript", ""),
+            summary=video_summary,
+            content_type=request.content_type,
+            num_tweets=request.num_tweets,
+            additional_context=request.additional_context,
+            is_premium=request.is_premium
+        )
+        async for event in stream_twitter_content(
+            messages,
+            content_type=request.content_type,
+            num_tweets=request.num_tweets,
+            is_premium=request.is_premium,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ):
+            yield event
+
+    return sse_response(events())
+
+@router.post("/youtube-batch-to-twitter/stream")
+async def youtube_batch_to_twitter_stream(request: YouTubeBatchRequest):
+    """Stream X (formerly Twitter) content for every video of a playlist, channel or URL list as Server-Sent Events"""
+    usage = start_usage_tracking()
+    try:
+        videos = await resolve_batch_videos(request.playlist, request.channel, request.urls, request.max_videos)
+    except ContentProcessingError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def events() -> AsyncIterator[str]:
+        yield format_sse("videos", {"videos": videos})
+        failed = 0
+        async for result in process_youtube_batch(
+            videos,
+            content_type=request.content_type,
+            num_tweets=request.num_tweets,
+            additional_context=request.additional_context,
+            is_premium=request.is_premium
+        ):
+            if "error" in result:
+                failed += 1
+                yield format_sse("video_error", result)
+            else:
+                yield format_sse("video", result)
+        yield format_sse("done", {
+            "num_videos": len(videos),
+            "failed": failed,
+            "cost_info": usage.to_cost_info().model_dump(exclude_none=True)
+        })
+
+    return sse_response(events())
+
+@router.post("/document-to-twitter/stream")
+async def document_to_twitter_stream(
+    file: UploadFile = File(...),
+    content_type: str = Form("short", description="Type of content to generate (short, long, thread)"),
+    num_tweets: int = Form(1, description="Number of tweets to generate"),
+    additional_context: Optional[str] = Form(None, description="Additional context for tweet generation"),
+    is_premium: bool = Form(False, description="Whether this is a premium post (allows longer content)")
+):
+    """Stream X (formerly Twitter) content generated from an uploaded document as Server-Sent Events"""
+    start_usage_tracking()
+    # Extract before the response starts: the upload is closed once the handler returns
+    upload = await receive_upload(spool_document, file)
+    try:
+        processed_content = await process_document(upload)
+    except ContentProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        upload.cleanup()
+
+    messages, max_tokens, temperature = await asyncio.to_thread(
+        build_document_twitter_messages,
+        processed_content.full_text, content_type, num_tweets, additional_context, is_premium
+    )
+
+    async def events() -> AsyncIterator[str]:
+        yield format_sse("source", {"document_summary": processed_content.summary})
+        async for event in stream_twitter_content(
+            messages,
+            content_type=content_type,
+            num_tweets=num_tweets,
+            is_premium=is_premium,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ):
+            yield event
+
+    return sse_response(events())
+
 @router.post("/generate-image", response_model=ImageGenerationResponse)
 async def generate_image(request: ImageGenerationRequest):
     """Generate an image based on summary, tweet text and aspect ratio."""
@@ -0,0 +1,144 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, status
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+from functools import partial
+import logging
+import os
+from ...core.config import settings
+from ...core.jobs import enqueue_job, get_job
+from ...services.content_processing.audio import spool_audio
+from ...services.content_processing.document import spool_document
+from ...services.content_processing.image import spool_image
+from .content_sources import TextToTwitterInput, URLToTwitterInput, ContentGenerationRequest, receive_upload
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["Jobs"]
+)
+
+class JobSubmittedResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str  # queued, running, completed, failed
+    progress: int
+    stage: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+async def _submit(kind: str, params: Dict[str, Any]) -> JobSubmittedResponse:
+    try:
+        job_id = await enqueue_job(kind, params)
+    except Exception as e:
+        logger.error(f"Failed to enqueue {kind} job: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job queue unavailable")
+    return JobSubmittedResponse(job_id=job_id, status="queued")
+
+UPLOAD_SPOOLERS = {
+    "audio": spool_audio,
+    "image": spool_image,
+    "document": spool_document,
+}
+
+async def _save_upload(kind: str, file: UploadFile) -> Dict[str, str]:
+    """Spool an upload into the directory shared with the workers, with the same limits as the synchronous endpoints"""
+    os.makedirs(settings.JOB_UPLOAD_DIR, exist_ok=True)
+    upload = await receive_upload(partial(UPLOAD_SPOOLERS[kind], directory=settings.JOB_UPLOAD_DIR), file)
+    return {"path": upload.path, "filename": upload.filename, "content_type": upload.content_type}
+
+async def _submit_upload(kind: str, file: UploadFile, options: Dict[str, Any]) -> JobSubmittedResponse:
+    upload = await _save_upload(kind, file)
+    try:
+        return await _submit(kind, {"upload": upload, "options": options})
+    except HTTPException:
+        os.unlink(upload["path"])
+        raise
+
+@router.post("/text-to-twitter", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_text_to_twitter(input_data: TextToTwitterInput):
+    """Queue X (formerly Twitter) content generation from text"""
+    return await _submit("text", input_data.model_dump())
+
+@router.post("/url-to-twitter", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_url_to_twitter(input_data: URLToTwitterInput):
+    """Queue X (formerly Twitter) content generation from a URL"""
+    return await _submit("url", input_data.model_dump())
+
+@router.post("/m3u8-to-twitter", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_m3u8_to_twitter(input_data: URLToTwitterInput):
+    """Queue transcription of an HLS (m3u8) stream and X (formerly Twitter) content generation"""
+    return await _submit("m3u8", input_data.model_dump())
+
+@router.post("/youtube-to-twitter", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_youtube_to_twitter(request: ContentGenerationRequest):
+    """Queue X (formerly Twitter) content generation from a YouTube video"""
+    return await _submit("youtube", request.model_dump())
+
+@router.post("/audio-to-twitter", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_audio_to_twitter(
+    file: UploadFile = File(...),
+    content_type: str = Form("short", description="Type of content to generate (short, thread, quote, poll, long)"),
+    num_tweets: int = Form(1, description="Number of tweets to generate"),
+    additional_context: Optional[str] = Form(None, description="Additional context for tweet generation"),
+    generate_image: bool = Form(False, description="Whether to generate an image for the first tweet"),
+    is_premium: bool = Form(False, description="Whether this is a premium post (allows longer content)")
+):
+    """Queue transcription of an audio file and X (formerly Twitter) content generation"""
+    return await _submit_upload("audio", file, {
+        "content_type": content_type,
+        "num_tweets": num_tweets,
+        "additional_context": additional_context,
+        "generate_image": generate_image,
+        "is_premium": is_premium
+    })
+
+@router.post("/image-to-twitter", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_image_to_twitter(
+    file: UploadFile = File(...),
+    content_type: str = Form("short", description="Type of content to generate (short, long, thread)"),
+    num_tweets: int = Form(1, description="Number of tweets to generate"),
+    additional_context: Optional[str] = Form(None, description="Additional context for tweet generation"),
+    generate_image: bool = Form(False, description="Whether to generate an image for the first tweet"),
+    is_premium: bool = Form(False, description="Whether this is a premium post (allows longer content)")
+):
+    """Queue X (formerly Twitter) content generation from an image"""
+    return await _submit_upload("image", file, {
+        "content_type": content_type,
+        "num_tweets": num_tweets,
+        "additional_context": additional_context,
+        "generate_image": generate_image,
+        "is_premium": is_premium
+    })
+
+@router.post("/document-to-twitter", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_document_to_twitter(
+    file: UploadFile = File(...),
+    content_type: str = Form("short", description="Type of content to generate (short, long, thread)"),
+    num_tweets: int = Form(1, description="Number of tweets to generate"),
+    additional_context: Optional[str] = Form(None, description="Additional context for tweet generation"),
+    generate_image: bool = Form(False, description="Whether to generate an image for the first tweet"),
+    is_premium: bool = Form(False, description="Whether this is a premium post (allows longer content)")
+):
+    """Queue X (formerly Twitter) content generation from a document"""
+    return await _submit_upload("document", file, {
+        "content_type": content_type,
+        "num_tweets": num_tweets,
+        "additional_context": additional_context,
+        "generate_image": generate_image,
+        "is_premium": is_premium
+    })
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Return a job's progress, and its result once it has finished"""
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return JobStatusResponse(**job)
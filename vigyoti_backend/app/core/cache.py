@@ -1,35 +1,149 @@
+import copy
 import json
-from typing import Optional, Any
-import redis
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Tuple
+import redis.asyncio as redis
 from app.core.config import settings as config_settings
 
-# Initialize Redis connection
-redis_client = redis.Redis(
+# Shared, bounded connection pool for the async Redis client
+redis_pool = redis.BlockingConnectionPool(
     host=config_settings.REDIS_HOST,
     port=config_settings.REDIS_PORT,
     db=config_settings.REDIS_DB,
     password=config_settings.REDIS_PASSWORD,
+    max_connections=config_settings.REDIS_MAX_CONNECTIONS,
+    timeout=config_settings.REDIS_POOL_TIMEOUT,
+    socket_timeout=config_settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=config_settings.REDIS_CONNECT_TIMEOUT,
+    health_check_interval=30,
     decode_responses=True
 )
 
+# Initialize Redis connection
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+class LocalCache:
+    """In-process LRU cache bounded by the encoded size of its entries"""
+
+    def __init__(self, max_bytes: int, default_ttl: int):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (value, size in bytes, monotonic expiry)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value), refreshing the entry's LRU position on a hit"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Hand out copies so callers can't mutate the shared entry
+        return True, copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None) -> None:
+        """Store a value, never keeping it longer than the given TTL"""
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0 or size > self.max_bytes:
+            self._remove(key)
+            return
+
+        self._remove(key)
+        self._entries[key] = (copy.deepcopy(value), size, time.monotonic() + ttl)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+# Per-process L1 cache in front of Redis
+local_cache = LocalCache(
+    max_bytes=config_settings.L1_CACHE_MAX_BYTES,
+    default_ttl=config_settings.L1_CACHE_TTL
+)
+
+async def close_redis() -> None:
+    """Close the Redis client and release pooled connections"""
+    await redis_client.aclose()
+    await redis_pool.disconnect()
+
 def get_cache_key(prefix: str, identifier: str) -> str:
     """Generate a cache key with a prefix"""
     return f"{prefix}:{identifier}"
 
-def get_cached_data(key: str) -> Optional[dict]:
-    """Retrieve data from cache"""
+def get_cache_stats() -> Dict[str, Any]:
+    """Return L1 cache counters for this process"""
+    return local_cache.stats()
+
+async def get_cached_data(key: str) -> Optional[Any]:
+    """Retrieve data from cache, reading through the L1 cache to Redis"""
+    found, value = local_cache.get(key)
+    if found:
+        return value
+
     try:
-        data = redis_client.get(key)
-        return json.loads(data) if data else None
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            data, pttl = await pipe.execute()
+        if not data:
+            return None
+
+        value = json.loads(data)
+        # A negative PTTL means the key has no expiry, so the L1 default applies
+        ttl = pttl / 1000 if pttl and pttl > 0 else None
+        local_cache.set(key, value, len(data), ttl)
+        return value
     except Exception as e:
         print(f"Cache retrieval error: {str(e)}")
         return None
 
-def set_cached_data(key: str, data: Any, ttl: int = config_settings.CACHE_TTL) -> bool:
+async def set_cached_data(key: str, data: Any, ttl: int = config_settings.CACHE_TTL) -> bool:
     """Store data in cache with TTL"""
     try:
-        redis_client.setex(key, ttl, json.dumps(data))
+        encoded = json.dumps(data)
+        await redis_client.setex(key, ttl, encoded)
+        local_cache.set(key, data, len(encoded), ttl)
         return True
     except Exception as e:
+        local_cache.delete(key)
         print(f"Cache storage error: {str(e)}")
         return False
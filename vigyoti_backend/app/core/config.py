@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 import firebase_admin
 from firebase_admin import credentials
 
@@ -26,6 +26,72 @@ class Settings(BaseSettings):
     
     # OpenAI Configuration
     OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_TIMEOUT: float = 120.0  # premium long posts can take a while
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_MAX_RETRIES: int = 3
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_RPM_LIMIT: int = 5000
+    OPENAI_TPM_LIMIT: int = 2_000_000
+    OPENAI_RATE_LIMIT_QUEUE_TIMEOUT: float = 30.0  # max time a request waits for budget
+    OPENAI_DEFAULT_OUTPUT_RESERVE: int = 1000  # reserved when a call sets no max_tokens
+    
+    # Prompt Configuration
+    PROMPT_MAX_INPUT_TOKENS: int = 16000  # cap on prompt size, below the model's context window
+    PROMPT_EXCERPT_TOKENS: int = 400  # transcript excerpts quoted alongside a summary
+    IMAGE_PROMPT_SOURCE_TOKENS: int = 120  # source text handed to image generation
+    
+    # Transcription Configuration
+    WHISPER_MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024  # OpenAI's per-request audio limit
+    WHISPER_CONCURRENCY: int = 4  # segments of one file transcribed at once
+    AUDIO_SEGMENT_SECONDS: float = 600.0  # ~5MB per segment at the 64kbps mono we re-encode to
+    AUDIO_SEGMENT_OVERLAP_SECONDS: float = 2.0  # so words on a boundary aren't cut in half
+    TRANSCRIPTION_BACKEND: str = "openai"  # openai, whisper or faster-whisper (local, CPU)
+    AUDIO_SERVICE_TRANSCRIPTION_BACKEND: str = "whisper"  # AudioService has always transcribed locally, for free
+    TRANSCRIPTION_VAD: bool = True  # send only detected speech, not silence
+    VAD_FRAME_SECONDS: float = 0.03
+    VAD_MARGIN_DB: float = 12.0  # above the noise floor to count as speech
+    VAD_MIN_SILENCE_SECONDS: float = 0.6  # shorter pauses stay inside a speech region
+    VAD_MIN_SPEECH_SECONDS: float = 0.25  # shorter blips are dropped
+    VAD_PADDING_SECONDS: float = 0.2  # kept either side of speech so word edges aren't clipped
+    VAD_GAP_SECONDS: float = 0.3  # silence between regions packed into one file
+    CLEANUP_CHUNK_TOKENS: int = 1500  # long transcripts are cleaned in chunks of this size
+    CLEANUP_CONCURRENCY: int = 8
+    LOCAL_WHISPER_MODEL: str = "base"
+    LOCAL_WHISPER_WORKERS: int = 2  # model processes; each holds its own copy of the model
+    LOCAL_WHISPER_QUEUE_SIZE: int = 32  # jobs waiting for a process before new ones are refused
+    FASTER_WHISPER_COMPUTE_TYPE: str = "int8"
+    FASTER_WHISPER_BATCH_SIZE: int = 8  # chunks of one file decoded together
+    FASTER_WHISPER_CPU_THREADS: int = 4  # per model process
+    HLS_DOWNLOAD_CONCURRENCY: int = 8  # media segments of one stream fetched at once
+    HLS_MAX_CONNECTIONS: int = 32
+    HLS_SEGMENT_RETRIES: int = 3
+    HLS_REQUEST_TIMEOUT: float = 30.0
+    
+    # Upload Configuration
+    MAX_REQUEST_BODY_BYTES: int = 512 * 1024 * 1024  # larger bodies are refused before they are read
+    
+    # YouTube Configuration
+    YOUTUBE_TRANSCRIPT_WORKERS: int = 8  # concurrent transcript fetches through the proxy
+    YOUTUBE_TRANSCRIPT_LANGUAGES: List[str] = ["en"]  # in order of preference
+    YOUTUBE_BATCH_CONCURRENCY: int = 4  # videos of one batch summarized and generated at once
+    YOUTUBE_BATCH_MAX_VIDEOS: int = 25
+    YOUTUBE_API_TIMEOUT: float = 15.0
+    
+    # FireCrawl Configuration
+    FIRECRAWL_API_URL: str = "https://api.firecrawl.dev"  # point at a stub server in tests
+    FIRECRAWL_CONCURRENCY: int = 8  # scrapes in flight per process
+    FIRECRAWL_MAX_CONNECTIONS: int = 16
+    FIRECRAWL_REQUEST_TIMEOUT: float = 60.0  # per attempt
+    FIRECRAWL_DEADLINE: float = 150.0  # whole call, retries included
+    FIRECRAWL_MAX_RETRIES: int = 3
+    
+    # Summarization Configuration
+    SUMMARY_SINGLE_PASS_TOKENS: int = 12000  # longer inputs are summarized with map-reduce
+    SUMMARY_CHUNK_TOKENS: int = 4000
+    SUMMARY_CHUNK_OVERLAP_TOKENS: int = 200
+    SUMMARY_MAP_CONCURRENCY: int = 8
     
     # Frontend Configuration
     NEXT_PUBLIC_API_URL: Optional[str] = "http://localhost:8000"
@@ -36,6 +102,23 @@ class Settings(BaseSettings):
     REDIS_DB: Optional[int] = 0
     REDIS_PASSWORD: Optional[str] = None
     CACHE_TTL: Optional[int] = 604800  # 7 days in seconds
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free pooled connection
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_CONNECT_TIMEOUT: float = 2.0
+    L1_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # per-process in-memory cache size
+    L1_CACHE_TTL: int = 300  # upper bound on how long L1 holds an entry
+    SINGLE_FLIGHT_LEASE_SECONDS: float = 30.0  # renewed while the leader is still working
+    SINGLE_FLIGHT_WAIT_TIMEOUT: float = 600.0
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.1
+    
+    # Background Job Configuration
+    JOB_WORKER_CONCURRENCY: int = 4  # jobs run at once by each `python -m app.worker` process
+    JOB_INLINE_WORKERS: int = 0  # jobs run inside the API process; keep 0 behind Lambda
+    JOB_RESULT_TTL: int = 86400  # how long job status and results are kept
+    JOB_UPLOAD_DIR: str = "/tmp/vigyoti-jobs"  # must be shared between the API and workers
+    JOB_HEARTBEAT_SECONDS: float = 10.0
+    JOB_STALE_SECONDS: float = 120.0  # running jobs without a heartbeat this long are requeued
     
     # Proxy Configuration
     SMARTPROXY_USERNAME: Optional[str] = None
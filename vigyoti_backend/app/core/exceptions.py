@@ -18,6 +18,10 @@ class RateLimitError(Exception):
     """Raised when hitting API rate limits"""
     pass
 
+class TranscriptionBusyError(Exception):
+    """Raised when the local transcription queue is full"""
+    pass
+
 class FileSizeError(Exception):
     """Raised when file size exceeds limits"""
     pass
@@ -0,0 +1,133 @@
+import json
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from app.core.cache import redis_client
+from app.core.config import settings as config_settings
+
+logger = logging.getLogger(__name__)
+
+# Job ids waiting to run, and ids claimed by a worker but not yet finished
+QUEUE_KEY = "jobs:queue"
+PROCESSING_KEY = "jobs:processing"
+JOB_PREFIX = "job"
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Blocking pops must return before the client's socket timeout fires
+DEQUEUE_TIMEOUT = 1.0
+
+# The job the current task is running, so deep pipeline code can report progress
+_current_job_id: ContextVar[Optional[str]] = ContextVar("current_job_id", default=None)
+
+# Write fields only while the job hash exists, so a late write can't recreate an expired job without a TTL
+_UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_PREFIX}:{job_id}"
+
+async def enqueue_job(kind: str, params: Dict[str, Any]) -> str:
+    """Store a new job and push it onto the queue"""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    key = _job_key(job_id)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={
+            "job_id": job_id,
+            "kind": kind,
+            "params": json.dumps(params),
+            "status": QUEUED,
+            "progress": 0,
+            "stage": "",
+            "created_at": now,
+            "updated_at": now
+        })
+        pipe.expire(key, config_settings.JOB_RESULT_TTL)
+        pipe.lpush(QUEUE_KEY, job_id)
+        await pipe.execute()
+    return job_id
+
+async def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a job's status, progress and (once finished) result or error"""
+    data = await redis_client.hgetall(_job_key(job_id))
+    if not data:
+        return None
+    return {
+        "job_id": data["job_id"],
+        "kind": data["kind"],
+        "status": data["status"],
+        "progress": int(data.get("progress") or 0),
+        "stage": data.get("stage") or None,
+        "result": json.loads(data["result"]) if data.get("result") else None,
+        "error": data.get("error") or None,
+        "created_at": float(data["created_at"]),
+        "updated_at": float(data["updated_at"])
+    }
+
+async def get_job_params(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the kind and parameters a job was submitted with"""
+    data = await redis_client.hmget(_job_key(job_id), "kind", "params")
+    if data[0] is None:
+        return None
+    return {"kind": data[0], "params": json.loads(data[1])}
+
+async def update_job(job_id: str, **fields: Any) -> None:
+    """Update job fields and bump its heartbeat"""
+    fields["updated_at"] = time.time()
+    if "result" in fields:
+        fields["result"] = json.dumps(fields["result"], default=str)
+    args = [value for pair in fields.items() for value in pair]
+    await redis_client.eval(_UPDATE_SCRIPT, 1, _job_key(job_id), *args)
+
+async def dequeue_job() -> Optional[str]:
+    """Claim the next job id, moving it to the processing list so a crashed worker doesn't lose it"""
+    return await redis_client.blmove(QUEUE_KEY, PROCESSING_KEY, DEQUEUE_TIMEOUT, "RIGHT", "LEFT")
+
+async def ack_job(job_id: str) -> None:
+    """Remove a finished job from the processing list"""
+    await redis_client.lrem(PROCESSING_KEY, 0, job_id)
+
+async def requeue_stale_jobs() -> List[str]:
+    """Put back jobs whose worker stopped heartbeating (e.g. it was killed mid-job)"""
+    requeued = []
+    cutoff = time.time() - config_settings.JOB_STALE_SECONDS
+    for job_id in await redis_client.lrange(PROCESSING_KEY, 0, -1):
+        updated_at = await redis_client.hget(_job_key(job_id), "updated_at")
+        if updated_at is not None and float(updated_at) >= cutoff:
+            continue
+        # Sweeps run periodically in every worker; only the one that removes the job requeues it
+        if not await redis_client.lrem(PROCESSING_KEY, 0, job_id) or updated_at is None:
+            continue
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.eval(_UPDATE_SCRIPT, 1, _job_key(job_id), "status", QUEUED, "updated_at", time.time())
+            pipe.rpush(QUEUE_KEY, job_id)
+            await pipe.execute()
+        requeued.append(job_id)
+    if requeued:
+        logger.warning(f"Requeued {len(requeued)} stale jobs: {requeued}")
+    return requeued
+
+def set_current_job(job_id: Optional[str]) -> None:
+    _current_job_id.set(job_id)
+
+async def report_progress(progress: int, stage: str) -> None:
+    """Record progress of the job being run by this task; a no-op outside jobs"""
+    job_id = _current_job_id.get()
+    if job_id is None:
+        return
+    try:
+        await update_job(job_id, progress=progress, stage=stage)
+    except Exception as e:
+        logger.warning(f"Failed to report progress for job {job_id}: {str(e)}")
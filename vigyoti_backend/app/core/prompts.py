@@ -202,6 +202,8 @@ Clean up and format this audio transcription while:
 4. Removing filler words and repetitions
 5. Preserving important quotes and key points
 
+Return only the cleaned transcription, with no introduction or commentary.
+
 Original transcription:
 {content}
 """
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional
+from app.core.cache import redis_client
+from app.core.config import settings as config_settings
+from app.core.exceptions import RateLimitError
+from app.utils.cost_calculator import CostCalculator
+
+logger = logging.getLogger(__name__)
+
+# Two token buckets (requests and tokens per minute) checked and debited atomically.
+# Buckets refill continuously at capacity/60s and are stored as {tokens, ts} hashes.
+# Returns {1, 0} when both buckets had room, otherwise {0, ms until they will}.
+_ACQUIRE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local wait = 0
+local levels = {}
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[(i - 1) * 2 + 1])
+    local requested = tonumber(ARGV[(i - 1) * 2 + 2])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    local rate = capacity / 60000
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if requested > tokens then
+        wait = math.max(wait, math.ceil((requested - tokens) / rate))
+    end
+end
+if wait > 0 then
+    return {0, wait}
+end
+for i = 1, 2 do
+    local requested = tonumber(ARGV[(i - 1) * 2 + 2])
+    redis.call('HSET', KEYS[i], 'tokens', levels[i] - requested, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+end
+return {1, 0}
+"""
+
+# Return unused reserved tokens to the token bucket, never above capacity
+_REFUND_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens == nil then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'tokens', math.min(tonumber(ARGV[1]), tokens + tonumber(ARGV[2])))
+return 1
+"""
+
+# Approximate per-message and per-image overhead of the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+IMAGE_INPUT_TOKENS = 765
+
+def estimate_prompt_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """Estimate prompt tokens for chat messages with tiktoken"""
+    total = 3
+    texts = []
+    for message in messages:
+        total += MESSAGE_OVERHEAD_TOKENS
+        content = message.get("content") or ""
+        if isinstance(content, str):
+            texts.append(content)
+            continue
+        for part in content:
+            if part.get("type") == "text":
+                texts.append(part.get("text", ""))
+            else:
+                total += IMAGE_INPUT_TOKENS
+    return total + sum(CostCalculator.count_tokens_batch(texts, model))
+
+class OpenAIRateLimiter:
+    """Cluster-wide RPM/TPM limiter for OpenAI requests, coordinated through Redis"""
+
+    PREFIX = "ratelimit:openai"
+
+    def __init__(self, rpm: int, tpm: int, queue_timeout: float):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.queue_timeout = queue_timeout
+
+    def _keys(self, model: str) -> List[str]:
+        return [f"{self.PREFIX}:{model}:rpm", f"{self.PREFIX}:{model}:tpm"]
+
+    async def acquire(self, model: str, tokens: int) -> int:
+        """Wait until one request and `tokens` tokens fit in the budget and return the tokens
+        actually reserved (refund relative to this), or raise RateLimitError"""
+        # A single request larger than the whole minute budget can never be admitted
+        tokens = min(tokens, self.tpm)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout
+
+        while True:
+            try:
+                acquired, wait_ms = await redis_client.eval(
+                    _ACQUIRE_SCRIPT, 2, *self._keys(model), self.rpm, 1, self.tpm, tokens
+                )
+            except Exception as e:
+                # Fail open: without Redis we can't coordinate, and the SDK still backs off on 429s
+                logger.warning(f"Rate limiter unavailable, sending request unthrottled: {str(e)}")
+                return 0
+
+            if acquired:
+                return tokens
+
+            remaining = deadline - loop.time()
+            wait = wait_ms / 1000
+            if wait > remaining:
+                raise RateLimitError(
+                    f"OpenAI rate budget for {model} exhausted; request would wait {wait:.1f}s"
+                )
+            # Jitter so queued requests don't all retry in lockstep
+            await asyncio.sleep(wait + random.uniform(0, min(0.25, remaining - wait)))
+
+    async def refund(self, model: str, tokens: int) -> None:
+        """Return reserved tokens that the request didn't use"""
+        if tokens <= 0:
+            return
+        try:
+            await redis_client.eval(_REFUND_SCRIPT, 1, self._keys(model)[1], self.tpm, tokens)
+        except Exception as e:
+            logger.warning(f"Failed to refund rate limiter tokens: {str(e)}")
+
+rate_limiter = OpenAIRateLimiter(
+    rpm=config_settings.OPENAI_RPM_LIMIT,
+    tpm=config_settings.OPENAI_TPM_LIMIT,
+    queue_timeout=config_settings.OPENAI_RATE_LIMIT_QUEUE_TIMEOUT
+)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.cache import redis_client, get_cached_data, set_cached_data
+from app.core.config import settings as config_settings
+
+logger = logging.getLogger(__name__)
+
+# In-flight computations in this process, keyed by cache key
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+LEASE_PREFIX = "singleflight"
+
+# Only the lease holder may extend or release it
+_RENEW_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def _lease_key(key: str) -> str:
+    return f"{LEASE_PREFIX}:{key}"
+
+async def get_or_compute(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int = config_settings.CACHE_TTL
+) -> Any:
+    """Return the cached value for key, computing it at most once across concurrent callers.
+
+    Callers in the same process share one asyncio future; callers in other
+    workers wait on a Redis lease held by the leader and pick the result up
+    from the cache once it lands.
+    """
+    cached = await get_cached_data(key)
+    if cached is not None:
+        return cached
+
+    while (existing := _inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(existing)
+        except asyncio.CancelledError:
+            # The leader was cancelled (e.g. its client disconnected); take over
+            if existing.cancelled():
+                continue
+            raise
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _compute_with_lease(key, compute, ttl)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved when nobody else is waiting
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
+async def _compute_with_lease(key: str, compute: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+    """Compute under a cross-worker lease, or wait for the worker that holds it"""
+    lease_key = _lease_key(key)
+    token = uuid.uuid4().hex
+    lease_ms = int(config_settings.SINGLE_FLIGHT_LEASE_SECONDS * 1000)
+
+    try:
+        acquired = await redis_client.set(lease_key, token, nx=True, px=lease_ms)
+    except Exception as e:
+        # Without Redis there is nothing to coordinate on; compute locally
+        logger.warning(f"Single-flight lease unavailable for {key}: {str(e)}")
+        return await _compute_and_cache(key, compute, ttl)
+
+    if not acquired:
+        result = await _wait_for_leader(key, lease_key)
+        if result is not None:
+            return result
+        # The leader gave up without caching a result; compute it ourselves
+        return await _compute_and_cache(key, compute, ttl)
+
+    renewer = asyncio.create_task(_renew_lease(lease_key, token, lease_ms))
+    try:
+        return await _compute_and_cache(key, compute, ttl)
+    finally:
+        renewer.cancel()
+        try:
+            await redis_client.eval(_RELEASE_LEASE_SCRIPT, 1, lease_key, token)
+        except Exception as e:
+            logger.warning(f"Failed to release single-flight lease for {key}: {str(e)}")
+
+async def _compute_and_cache(key: str, compute: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+    result = await compute()
+    if result is not None:
+        await set_cached_data(key, result, ttl)
+    return result
+
+async def _renew_lease(lease_key: str, token: str, lease_ms: int) -> None:
+    """Keep the lease alive while a long computation (e.g. transcription) runs"""
+    while True:
+        await asyncio.sleep(lease_ms / 3000)
+        try:
+            if not await redis_client.eval(_RENEW_LEASE_SCRIPT, 1, lease_key, token, lease_ms):
+                return
+        except Exception as e:
+            logger.warning(f"Failed to renew single-flight lease {lease_key}: {str(e)}")
+
+async def _wait_for_leader(key: str, lease_key: str) -> Optional[Any]:
+    """Poll the cache until the leader publishes a result or its lease disappears"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config_settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+    interval = config_settings.SINGLE_FLIGHT_POLL_INTERVAL
+
+    while loop.time() < deadline:
+        await asyncio.sleep(interval)
+        cached = await get_cached_data(key)
+        if cached is not None:
+            return cached
+        try:
+            if not await redis_client.exists(lease_key):
+                # Re-check once: the leader caches before it releases the lease
+                return await get_cached_data(key)
+        except Exception:
+            return None
+        interval = min(interval * 2, 1.0)
+
+    logger.warning(f"Timed out waiting for in-flight computation of {key}")
+    return None
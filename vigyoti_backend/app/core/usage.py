@@ -0,0 +1,107 @@
+"""
+Request-scoped usage accounting.
+
+Each request starts an accumulator in a contextvar; every OpenAI completion,
+Whisper transcription, Replicate image and FireCrawl scrape made while
+handling the request records what it actually consumed, and the response's
+CostInfo is built from the totals. Tasks spawned by the request (gather,
+to_thread, streaming responses) inherit the same accumulator. Results served
+from cache record nothing, so the reported cost is what the request really
+spent.
+"""
+import threading
+from contextvars import ContextVar
+from typing import Any, Optional
+from app.schemas.cost import CostInfo
+from app.utils.cost_calculator import CostCalculator
+
+class UsageAccumulator:
+    """Totals of billable usage for one request"""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.whisper_seconds = 0.0
+        self.images_generated = 0
+        self.firecrawl_credits = 0
+        # Calls may record from worker threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def record_completion(self, usage: Any) -> None:
+        """Record the `usage` block of a chat completion"""
+        if usage is None:
+            return
+        with self._lock:
+            self.input_tokens += usage.prompt_tokens or 0
+            self.output_tokens += usage.completion_tokens or 0
+
+    def record_whisper(self, duration_seconds: float) -> None:
+        with self._lock:
+            self.whisper_seconds += duration_seconds or 0.0
+
+    def record_images(self, count: int = 1) -> None:
+        with self._lock:
+            self.images_generated += count
+
+    def record_firecrawl(self, credits: int = 1) -> None:
+        with self._lock:
+            self.firecrawl_credits += credits
+
+    def to_cost_info(self) -> CostInfo:
+        """Price the recorded usage"""
+        gpt_costs = CostCalculator.cost_from_tokens(self.input_tokens, self.output_tokens)
+        whisper_costs = (
+            CostCalculator.calculate_whisper_cost(self.whisper_seconds) if self.whisper_seconds else None
+        )
+        image_costs = (
+            CostCalculator.calculate_image_cost(self.images_generated) if self.images_generated else None
+        )
+        firecrawl_costs = (
+            CostCalculator.calculate_firecrawl_cost(self.firecrawl_credits) if self.firecrawl_credits else None
+        )
+        return CostInfo(
+            input_tokens=gpt_costs["input_tokens"],
+            output_tokens=gpt_costs["output_tokens"],
+            input_cost=gpt_costs["input_cost"],
+            output_cost=gpt_costs["output_cost"],
+            whisper_duration_minutes=whisper_costs["duration_minutes"] if whisper_costs else None,
+            whisper_cost=whisper_costs["cost"] if whisper_costs else None,
+            num_images_generated=self.images_generated or None,
+            image_generation_cost=image_costs["cost"] if image_costs else None,
+            firecrawl_credits_used=self.firecrawl_credits or None,
+            firecrawl_cost=firecrawl_costs["cost"] if firecrawl_costs else None,
+            total_cost=CostCalculator.calculate_total_cost(
+                gpt_costs,
+                whisper_cost=whisper_costs,
+                image_cost=image_costs,
+                firecrawl_cost=firecrawl_costs
+            )
+        )
+
+_current_usage: ContextVar[Optional[UsageAccumulator]] = ContextVar("usage", default=None)
+
+def start_usage_tracking() -> UsageAccumulator:
+    """Start a fresh accumulator for the current request"""
+    usage = UsageAccumulator()
+    _current_usage.set(usage)
+    return usage
+
+def current_usage() -> Optional[UsageAccumulator]:
+    """Return the current request's accumulator, if tracking was started"""
+    return _current_usage.get()
+
+def record_completion(usage: Any) -> None:
+    if (accumulator := _current_usage.get()) is not None:
+        accumulator.record_completion(usage)
+
+def record_whisper(duration_seconds: float) -> None:
+    if (accumulator := _current_usage.get()) is not None:
+        accumulator.record_whisper(duration_seconds)
+
+def record_images(count: int = 1) -> None:
+    if (accumulator := _current_usage.get()) is not None:
+        accumulator.record_images(count)
+
+def record_firecrawl(credits: int = 1) -> None:
+    if (accumulator := _current_usage.get()) is not None:
+        accumulator.record_firecrawl(credits)
@@ -1,11 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 from dotenv import load_dotenv
 import os
 from phoenix.otel import register
 from openinference.instrumentation.openai import OpenAIInstrumentor
-from .api.v1 import content_sources_router, twitter_router
+from .api.v1 import content_sources_router, twitter_router, jobs_router
+from .core.cache import close_redis, get_cache_stats
+from .services.llm_gateway import close_llm_client
+from .services.firecrawl_client import close_firecrawl_client
+from .services.transcription import close_hls_client, close_local_engine, get_local_engine_stats
+from .services.content_processing.youtube_transcripts import get_transcript_metrics, close_transcript_executor
+from .services.content_processing.youtube_batch import close_youtube_api_client
+from .core.config import settings
+from .worker import run_workers
+from typing import Optional
+import asyncio
 import logging
 
 # Initialize logger
@@ -53,14 +64,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def limit_request_body(request: Request, call_next):
+    # Refuse oversized uploads from their declared length, before the body is spooled.
+    # Per-type limits are enforced while streaming in app.utils.uploads.
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_REQUEST_BODY_BYTES:
+        return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+    return await call_next(request)
+
 # Include routers without prefix (prefix is defined in the routers)
 app.include_router(content_sources_router)
 app.include_router(twitter_router)
+app.include_router(jobs_router)
+
+# Optional in-process job workers; production runs `python -m app.worker` instead
+_inline_workers_stop = asyncio.Event()
+_inline_workers: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_inline_workers():
+    global _inline_workers
+    if settings.JOB_INLINE_WORKERS > 0:
+        _inline_workers = asyncio.create_task(run_workers(settings.JOB_INLINE_WORKERS, _inline_workers_stop))
+
+@app.on_event("shutdown")
+async def shutdown_clients():
+    if _inline_workers is not None:
+        _inline_workers_stop.set()
+        await _inline_workers
+    await close_redis()
+    await close_llm_client()
+    await close_hls_client()
+    await close_firecrawl_client()
+    await close_local_engine()
+    await close_youtube_api_client()
+    close_transcript_executor()
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/cache")
+async def cache_health():
+    return get_cache_stats()
+
+@app.get("/health/youtube")
+async def youtube_health():
+    return get_transcript_metrics()
+
+@app.get("/health/transcription")
+async def transcription_health():
+    return get_local_engine_stats()
+
 # For AWS Lambda
 handler = Mangum(app)
@@ -1,18 +1,18 @@
 import os
 from typing import Optional, BinaryIO
-import whisper
 from fastapi import UploadFile, HTTPException
 from datetime import datetime
 
 from ..schemas.audio import AudioInputCreate, AudioStatus
 from ..models.audio import AudioInput
-from ..core.settings import get_settings
-
-settings = get_settings()
+from ..core.config import settings
+from .transcription import get_transcription_backend
 
 class AudioService:
     def __init__(self):
-        self.model = whisper.load_model("base")
+        # Local models are loaded lazily inside the engine's worker processes, not here.
+        # Kept on a local backend by default rather than following TRANSCRIPTION_BACKEND to the paid API.
+        self.backend = get_transcription_backend(settings.AUDIO_SERVICE_TRANSCRIPTION_BACKEND)
         self.supported_formats = [".mp3", ".wav", ".m4a", ".ogg"]
 
     async def create_audio_input(self, audio_data: AudioInputCreate) -> AudioInput:
@@ -48,10 +48,10 @@ class AudioService:
                 buffer.write(content)
 
             # Transcribe audio
-            result = self.model.transcribe(temp_path)
+            transcription = await self.backend.transcribe(temp_path)
             
             # Update audio input with transcription
-            audio_input.transcription = result["text"]
+            audio_input.transcription = transcription
             audio_input.status = AudioStatus.COMPLETED
             audio_input.updated_at = datetime.utcnow()
 
@@ -77,10 +77,10 @@ class AudioService:
                 buffer.write(audio_stream.read())
 
             # Transcribe audio
-            result = self.model.transcribe(temp_path)
+            transcription = await self.backend.transcribe(temp_path)
             
             # Update audio input with transcription
-            audio_input.transcription = result["text"]
+            audio_input.transcription = transcription
             audio_input.status = AudioStatus.COMPLETED
             audio_input.updated_at = datetime.utcnow()
 
@@ -1,27 +1,22 @@
-import os
-from firecrawl import FirecrawlApp
+import asyncio
 from typing import Dict, Optional, Literal, List, Tuple
 from datetime import datetime
 from urllib.parse import urlparse
-from openai import AsyncOpenAI
+from ..llm_gateway import chat_completion
+from ..firecrawl_client import scrape_url
 from ...schemas.content import ArticleMetadata, ContentProcessingResponse
 from ...schemas.twitter import TwitterContent as TwitterContentSchema
-from ...core.exceptions import ContentProcessingError, InvalidCredentialsError
+from ...core.exceptions import ContentProcessingError
 from ...core.prompts import ARTICLE_SUMMARY_PROMPT, PAPER_SUMMARY_PROMPT
-from ...core.cache import get_cache_key, get_cached_data, set_cached_data
+from .pipeline import run_stage, text_stage_id, generation_stage_id, EXTRACT, SUMMARY, GENERATE
+from .summarization import summarize_long_text
 from ..image_generation import generate_image_from_text
 from ...core.config import settings
-from ...utils.cost_calculator import CostCalculator
+from ...utils.prompt_builder import fit_prompt, truncate_to_tokens
+from ...utils.source_identity import canonical_source_id, arxiv_paper_id, arxiv_source_id
 import re
 import logging
 
-# Initialize clients
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-firecrawl_api_key = os.getenv("FIRECRAWL_API_KEY")
-if not firecrawl_api_key:
-    raise InvalidCredentialsError("FIRECRAWL_API_KEY environment variable is not set")
-firecrawl = FirecrawlApp(api_key=firecrawl_api_key)
-
 # Initialize logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -109,17 +104,43 @@ Guidelines based on content type:
 
     return prompt
 
+def build_article_twitter_messages(
+    summary: str,
+    content_type: str,
+    num_tweets: int,
+    additional_context: Optional[str],
+    is_premium: bool = False
+) -> Tuple[List[Dict[str, str]], int, float]:
+    """Build the chat messages, max_tokens and temperature for an article-to-X generation"""
+    # Use higher max_tokens for premium long content
+    max_tokens = 7000 if is_premium and content_type == "long" else 1000
+    system_prompt = """You are a social media expert who creates engaging Twitter content.
+            For premium users creating long-form content, you should write comprehensive,
+            well-structured posts that are several paragraphs long (at least 1000 words)
+            and make full use of the 25,000 character limit."""
+    prompt = fit_prompt(
+        lambda content: create_twitter_prompt(content, content_type, num_tweets, additional_context),
+        summary,
+        system_prompt,
+        max_tokens
+    )
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    # Slightly higher temperature for more creative responses
+    return messages, max_tokens, 0.8
+
 async def generate_summary(text: str, is_paper: bool = False) -> str:
     """Generate a summary of the text using OpenAI"""
     try:
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": PAPER_SUMMARY_PROMPT if is_paper else ARTICLE_SUMMARY_PROMPT},
-                {"role": "user", "content": text}
-            ]
+        # Long articles and papers are summarized chunk by chunk, then reduced, instead of overflowing the context
+        return await summarize_long_text(
+            text,
+            "paper" if is_paper else "article",
+            PAPER_SUMMARY_PROMPT if is_paper else ARTICLE_SUMMARY_PROMPT,
+            "You are an expert at summarizing content for social media creators."
         )
-        return response.choices[0].message.content.strip()
     except Exception as e:
         raise ContentProcessingError(f"Error generating summary: {str(e)}")
 
@@ -142,63 +163,55 @@ def extract_metadata_from_response(response: Dict) -> ArticleMetadata:
             word_count=None
         )
 
+async def scrape_markdown(url: str) -> Tuple[str, Dict]:
+    """Scrape a URL with FireCrawl and return the cleaned markdown text and raw response"""
+    scrape_result = await scrape_url(url, formats=("markdown",))
+    
+    # The markdown content is directly in the 'markdown' key
+    content = scrape_result.get('markdown')
+    if not content:
+        raise ContentProcessingError("No markdown content found in FireCrawl response")
+        
+    return clean_text(content), scrape_result
+
 async def fetch_article_and_summary(url: str) -> Dict:
     """Fetch article content and generate summary, with caching"""
     try:
-        # Check cache first
-        cache_key = get_cache_key("article", url)
-        logger.info(f"Checking cache for article content with key: {cache_key}")
-        
-        cached_data = get_cached_data(cache_key)
-        if cached_data:
-            logger.info(f"✅ Cache HIT: Found cached article content for URL: {url}")
-            return cached_data
-            
-        logger.info(f"❌ Cache MISS: No cached content found for URL: {url}. Fetching from FireCrawl...")
-
         # Validate URL
         parsed_url = urlparse(url)
         if not all([parsed_url.scheme, parsed_url.netloc]):
             raise ContentProcessingError("Invalid URL format")
 
-        # Scrape the URL with FireCrawl
-        try:
-            scrape_result = firecrawl.scrape_url(
-                url,
-                params={'formats': ['markdown']}  # Only request markdown format as per documentation
-            )
-            logger.info(f"FireCrawl response: {scrape_result}")  # Debug logging
-            
-            if not scrape_result:
-                raise ContentProcessingError("Empty response from FireCrawl")
-            
-            # The markdown content is directly in the 'markdown' key
-            content = scrape_result.get('markdown')
-            if not content:
-                raise ContentProcessingError("No markdown content found in FireCrawl response")
-                
-            full_text = clean_text(content)
-            
-            # Generate summary optimized for social media content
-            summary = await generate_summary(full_text)
-            logger.info("Generated summary from article content")
-            
-            # Cache the results
-            data = {
-                "full_text": full_text,
-                "summary": summary,
-                "metadata": extract_metadata_from_response(scrape_result).dict()
-            }
-            if set_cached_data(cache_key, data):
-                logger.info(f"✅ Successfully cached article content with key: {cache_key}")
-            else:
-                logger.warning(f"⚠️ Failed to cache article content with key: {cache_key}")
-            
-            return data
-
-        except Exception as e:
-            logger.error(f"Error scraping URL with FireCrawl: {str(e)}")
-            raise ContentProcessingError(f"Error processing article: {str(e)}")
+        async def scrape_article() -> Dict:
+            logger.info(f"❌ Cache MISS: No cached content found for URL: {url}. Fetching from FireCrawl...")
+            try:
+                full_text, scrape_result = await scrape_markdown(url)
+                return {
+                    "full_text": full_text,
+                    "metadata": extract_metadata_from_response(scrape_result).dict()
+                }
+            except Exception as e:
+                logger.error(f"Error scraping URL with FireCrawl: {str(e)}")
+                raise ContentProcessingError(f"Error processing article: {str(e)}")
+
+        # Scrape and summary are cached as separate stages; concurrent misses share one call each.
+        # Keyed by canonical id, so tracking parameters, mobile hosts and the like share one scrape.
+        # Namespaced apart from process_arxiv_url, which stores a different shape for the same id.
+        article = await run_stage(EXTRACT, f"article:{canonical_source_id(url)}", scrape_article)
+        full_text = article["full_text"]
+
+        # Generate summary optimized for social media content
+        summary = await run_stage(
+            SUMMARY,
+            text_stage_id("article", full_text),
+            lambda: generate_summary(full_text)
+        )
+        
+        return {
+            "full_text": full_text,
+            "summary": summary,
+            "metadata": article["metadata"]
+        }
 
     except Exception as e:
         raise ContentProcessingError(f"Error processing article: {str(e)}")
@@ -217,34 +230,36 @@ async def process_url_to_twitter(
         article_data = await fetch_article_and_summary(url)
         logger.info(f"Article data fetched successfully for URL: {url}")
         
-        # Use higher max_tokens for premium long content
-        max_tokens = 7000 if is_premium and content_type == "long" else 1000
+        messages, max_tokens, temperature = await asyncio.to_thread(
+            build_article_twitter_messages,
+            article_data["summary"], content_type, num_tweets, additional_context, is_premium
+        )
+        
+        async def generate_tweets() -> str:
+            tweets_response = await chat_completion(
+                model=settings.OPENAI_MODEL,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            return tweets_response.choices[0].message.content.strip()
         
-        # Generate tweets
-        tweets_response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are a social media expert who creates engaging Twitter content.
-                    For premium users creating long-form content, you should write comprehensive,
-                    well-structured posts that are several paragraphs long (at least 1000 words)
-                    and make full use of the 25,000 character limit."""
-                },
-                {"role": "user", "content": create_twitter_prompt(
-                    article_data["summary"],
-                    content_type,
-                    num_tweets,
-                    additional_context
-                )}
-            ],
-            temperature=0.8,  # Slightly higher temperature for more creative responses
-            max_tokens=max_tokens
+        # Generate tweets, reusing an earlier generation from the same summary and parameters
+        generated_content = await run_stage(
+            GENERATE,
+            generation_stage_id(
+                "article",
+                article_data["summary"],
+                content_type=content_type,
+                num_tweets=num_tweets,
+                additional_context=additional_context,
+                is_premium=is_premium
+            ),
+            generate_tweets
         )
         
         # Process the tweets
         tweets = []
-        generated_content = tweets_response.choices[0].message.content.strip()
         
         if content_type == "long" and is_premium:
             # For premium long posts, treat the entire content as one post
@@ -263,7 +278,7 @@ async def process_url_to_twitter(
             # Generate image if requested
             if generate_image:
                 logger.info("Generating image for premium post...")
-                image_url = await generate_image_from_text(article_data["summary"])
+                image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, article_data["summary"], settings.IMAGE_PROMPT_SOURCE_TOKENS))
                 if image_url:
                     tweet_content["image_url"] = image_url
                     logger.info(f"Added image URL to premium post: {image_url}")
@@ -289,7 +304,7 @@ async def process_url_to_twitter(
                 # Generate image for the first tweet if requested
                 if generate_image and i == 0:
                     logger.info("Generating image for first tweet...")
-                    image_url = await generate_image_from_text(article_data["summary"])
+                    image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, article_data["summary"], settings.IMAGE_PROMPT_SOURCE_TOKENS))
                     if image_url:
                         tweet_content["image_url"] = image_url
                         logger.info(f"Added image URL to tweet: {image_url}")
@@ -317,60 +332,15 @@ async def process_article_url(url: str) -> ContentProcessingResponse:
         if not url or not urlparse(url).scheme:
             raise ContentProcessingError("Invalid URL format")
 
-        # Check cache first
-        cache_key = get_cache_key("article", url)
-        cached_data = get_cached_data(cache_key)
-        if cached_data:
-            logger.info(f"Cache hit for URL: {url}")
-            return ContentProcessingResponse(
-                source_id=url,
-                summary=cached_data["summary"],
-                full_text=cached_data["full_text"],
-                metadata=cached_data["metadata"]
-            )
-
-        # If not in cache, scrape the URL with FireCrawl
-        try:
-            scrape_result = firecrawl.scrape_url(
-                url,
-                params={'formats': ['markdown']}
-            )
-            logger.info(f"FireCrawl response: {scrape_result}")
-            
-            if not scrape_result:
-                raise ContentProcessingError("Empty response from FireCrawl")
-            
-            # The markdown content is directly in the 'markdown' key
-            content = scrape_result.get('markdown')
-            if not content:
-                raise ContentProcessingError("No markdown content found in FireCrawl response")
-                
-            full_text = clean_text(content)
-            
-            # Generate summary optimized for social media content
-            summary = await generate_summary(full_text)
-            
-            # Extract metadata
-            metadata = extract_metadata_from_response(scrape_result)
-            
-            # Cache the results
-            data = {
-                "full_text": full_text,
-                "summary": summary,
-                "metadata": metadata.dict()
-            }
-            set_cached_data(cache_key, data)
-            
-            return ContentProcessingResponse(
-                source_id=url,
-                summary=summary,
-                full_text=full_text,
-                metadata=metadata.dict()
-            )
-
-        except Exception as e:
-            logger.error(f"Error scraping URL with FireCrawl: {str(e)}")
-            raise ContentProcessingError(f"Error processing article URL: {str(e)}")
+        # Shares the article cache entry (and any in-flight scrape) with fetch_article_and_summary
+        data = await fetch_article_and_summary(url)
+        
+        return ContentProcessingResponse(
+            source_id=url,
+            summary=data["summary"],
+            full_text=data["full_text"],
+            metadata=data["metadata"]
+        )
 
     except Exception as e:
         error_msg = f"Error processing article URL: {str(e)}"
@@ -380,71 +350,54 @@ async def process_article_url(url: str) -> ContentProcessingResponse:
 async def process_arxiv_url(url: str) -> ContentProcessingResponse:
     """Process Arxiv paper URL and prepare content for social media"""
     try:
-        # Extract Arxiv ID from URL
-        arxiv_id = url.split('/')[-1]
-        if not arxiv_id:
+        # abs, pdf and html URLs of the same paper version share one id
+        paper_ref = arxiv_paper_id(url)
+        if not paper_ref:
             raise ContentProcessingError("Invalid Arxiv URL format")
-
-        # Check cache first
-        cache_key = get_cache_key("arxiv", arxiv_id)
-        cached_data = get_cached_data(cache_key)
-        if cached_data:
-            logger.info(f"Cache hit for Arxiv ID: {arxiv_id}")
-            return ContentProcessingResponse(
-                source_id=arxiv_id,
-                summary=cached_data["summary"],
-                full_text=cached_data["full_text"],
-                metadata=cached_data["metadata"]
-            )
-
-        # If not in cache, use FireCrawl to scrape the Arxiv page
-        try:
-            scrape_result = firecrawl.scrape_url(
-                url,
-                params={'formats': ['markdown']}
-            )
-            logger.info(f"FireCrawl response: {scrape_result}")
-            
-            if not scrape_result:
-                raise ContentProcessingError("Empty response from FireCrawl")
-            
-            # The markdown content is directly in the 'markdown' key
-            content = scrape_result.get('markdown')
-            if not content:
-                raise ContentProcessingError("No markdown content found in FireCrawl response")
+        paper_id, version = paper_ref
+        arxiv_id = f"{paper_id}v{version}" if version else paper_id
+        source_id = arxiv_source_id(paper_id, version)
+
+        async def scrape_paper() -> Dict:
+            # Use FireCrawl to scrape the Arxiv page
+            try:
+                # Scrape the abstract page whichever shape of URL was given
+                full_text, scrape_result = await scrape_markdown(f"https://arxiv.org/abs/{arxiv_id}")
                 
-            full_text = clean_text(content)
-            
-            # Generate summary optimized for social media content
-            summary = await generate_summary(full_text, is_paper=True)
-            
-            # Extract metadata
-            metadata = {
-                'paper_id': arxiv_id,
-                'title': scrape_result.get('title'),
-                'authors': scrape_result.get('authors', '').split(','),
-                'categories': [cat.strip() for cat in scrape_result.get('categories', '').split()],
-                'abstract': scrape_result.get('abstract')
-            }
-            
-            # Cache the results
-            data = {
-                "full_text": full_text,
-                "summary": summary,
-                "metadata": metadata
-            }
-            set_cached_data(cache_key, data)
-            
-            return ContentProcessingResponse(
-                source_id=arxiv_id,
-                summary=summary,
-                full_text=full_text,
-                metadata=metadata
-            )
+                # Extract metadata
+                metadata = {
+                    'paper_id': arxiv_id,
+                    'title': scrape_result.get('title'),
+                    'authors': scrape_result.get('authors', '').split(','),
+                    'categories': [cat.strip() for cat in scrape_result.get('categories', '').split()],
+                    'abstract': scrape_result.get('abstract')
+                }
+                
+                return {
+                    "full_text": full_text,
+                    "metadata": metadata
+                }
 
-        except Exception as e:
-            logger.error(f"Error scraping URL with FireCrawl: {str(e)}")
-            raise ContentProcessingError(f"Error processing Arxiv URL: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error scraping URL with FireCrawl: {str(e)}")
+                raise ContentProcessingError(f"Error processing Arxiv URL: {str(e)}")
+
+        paper = await run_stage(EXTRACT, f"paper:{source_id}", scrape_paper)
+        
+        # Generate summary optimized for social media content
+        summary = await run_stage(
+            SUMMARY,
+            text_stage_id("paper", paper["full_text"]),
+            lambda: generate_summary(paper["full_text"], is_paper=True)
+        )
+        data = {**paper, "summary": summary}
+        
+        return ContentProcessingResponse(
+            source_id=arxiv_id,
+            summary=data["summary"],
+            full_text=data["full_text"],
+            metadata=data["metadata"]
+        )
 
     except Exception as e:
         error_msg = f"Error processing Arxiv URL: {str(e)}"
@@ -1,8 +1,8 @@
+import asyncio
 import os
-import tempfile
 from typing import BinaryIO, List, Optional, Dict, Union
 from pydantic import BaseModel
-from openai import AsyncOpenAI
+from ..llm_gateway import chat_completion
 from fastapi import UploadFile
 from mutagen import File as MutagenFile
 from mutagen.wave import WAVE
@@ -14,9 +14,14 @@ from ...schemas.cost import CostInfo
 from ...core.exceptions import ContentProcessingError, FileTypeError, FileSizeError
 from ...core.prompts import TRANSCRIPTION_CLEANUP_PROMPT, TWITTER_CONTENT_PROMPT, TWITTER_CONTENT_GUIDELINES
 from ...core.config import settings
-from ...core.cache import get_cache_key, get_cached_data, set_cached_data
+from ...core.usage import UsageAccumulator, current_usage, start_usage_tracking
+from ...core.jobs import report_progress
+from .pipeline import run_stage, text_stage_id, generation_stage_id, EXTRACT, CLEAN, GENERATE
+from .summarization import chunk_text
 from ...utils.cost_calculator import CostCalculator
-import hashlib
+from ...utils.prompt_builder import fit_prompt, truncate_to_tokens
+from ...utils.hashing import hash_file
+from ...utils.uploads import SpooledUpload, spool_upload
 from ..image_generation import generate_image_from_text
 import logging
 import aiofiles
@@ -25,9 +30,6 @@ import re
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 ALLOWED_AUDIO_TYPES = {
     'audio/mpeg': 'mp3',
     'audio/mp4': 'mp4',
@@ -39,20 +41,22 @@ ALLOWED_AUDIO_TYPES = {
     'audio/webm': 'webm'
 }
 
-MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
+# Long recordings are split into segments below Whisper's 25MB request limit
+MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
 
-def get_audio_hash(content: bytes) -> str:
-    """Generate a unique hash for the audio content"""
-    return hashlib.sha256(content).hexdigest()
+# Cleaned text is about as long as the input; leave room for added punctuation
+CLEANUP_OUTPUT_RATIO = 1.25
+CLEANUP_OUTPUT_MARGIN = 64
 
-async def clean_transcription(raw_transcript: str) -> str:
-    """Clean and format transcription using OpenAI"""
+async def clean_transcription_chunk(raw_transcript: str) -> str:
+    """Clean and format one token-bounded piece of a transcription using OpenAI"""
     try:
         # Format the cleanup prompt
         cleanup_prompt = TRANSCRIPTION_CLEANUP_PROMPT.format(content=raw_transcript)
+        input_tokens = await asyncio.to_thread(CostCalculator.get_token_count, raw_transcript)
         
         # Call OpenAI API
-        response = await client.chat.completions.create(
+        response = await chat_completion(
             model=settings.OPENAI_MODEL,
             messages=[
                 {
@@ -62,13 +66,35 @@ async def clean_transcription(raw_transcript: str) -> str:
                 {"role": "user", "content": cleanup_prompt}
             ],
             temperature=0.3,  # Lower temperature for more consistent cleanup
-            max_tokens=len(raw_transcript.split()) * 2  # Allow for some expansion
+            max_tokens=int(input_tokens * CLEANUP_OUTPUT_RATIO) + CLEANUP_OUTPUT_MARGIN
         )
         
         return response.choices[0].message.content.strip()
     except Exception as e:
         raise ContentProcessingError(f"Error cleaning transcription: {str(e)}")
 
+async def clean_transcription(raw_transcript: str) -> str:
+    """Clean a transcription of any length, in concurrent chunks split at sentence boundaries"""
+    # No overlap: each sentence must appear exactly once in the reassembled text
+    chunks = await asyncio.to_thread(chunk_text, raw_transcript, settings.CLEANUP_CHUNK_TOKENS, overlap_tokens=0)
+    if len(chunks) <= 1:
+        return await clean_transcription_chunk(raw_transcript)
+    
+    logger.info(f"Cleaning transcription in {len(chunks)} chunks")
+    semaphore = asyncio.Semaphore(settings.CLEANUP_CONCURRENCY)
+    
+    async def clean(chunk: str) -> str:
+        async with semaphore:
+            # Chunks are cached individually, so a transcript that shares most of its text reuses them
+            return await run_stage(
+                CLEAN,
+                text_stage_id("transcript-chunk", chunk),
+                lambda: clean_transcription_chunk(chunk)
+            )
+    
+    cleaned = await asyncio.gather(*(clean(chunk) for chunk in chunks))
+    return "\n\n".join(text for text in cleaned if text)
+
 async def generate_twitter_content(
     text: str,
     content_type: str,
@@ -76,7 +102,7 @@ async def generate_twitter_content(
     additional_context: Optional[str] = None,
     generate_image: bool = False,
     is_premium: bool = False
-) -> tuple[List[Dict], dict]:
+) -> List[Dict]:
     """Generate Twitter content from text"""
     try:
         logger.info(f"[generate_twitter_content] Starting generation with num_tweets={num_tweets}")
@@ -106,11 +132,17 @@ async def generate_twitter_content(
         # Get content type guidelines
         content_type_guidelines = TWITTER_CONTENT_GUIDELINES.get(content_type, TWITTER_CONTENT_GUIDELINES["short"])
         
+        system_prompt = """You are an expert social media content creator who specializes in audio content. 
+                    For premium users creating long-form content, you write comprehensive, well-structured posts 
+                    that are several paragraphs long (at least 1000 words) and make full use of the 25,000 character limit.
+                    For regular users, you create concise, impactful tweets within 280 characters."""
+        
         if content_type == "short":
-            prompt = f"""Generate {num_tweets} impactful and informative tweets from this audio transcription. Each tweet should be a complete, standalone insight.
+            def render(content: str) -> str:
+                return f"""Generate {num_tweets} impactful and informative tweets from this audio transcription. Each tweet should be a complete, standalone insight.
 
 Content:
-{text}
+{content}
 
 Requirements for Each Tweet:
 1. Length and Format:
@@ -141,9 +173,10 @@ Additional Context to Consider:
 Generate EXACTLY {num_tweets} unique, high-quality tweets, each focusing on a different aspect of the content."""
         else:
             # For long-form premium content or threads
-            prompt = f"""Based on this audio transcription, generate {num_tweets} {'tweet' if num_tweets == 1 else 'tweets'}.
+            def render(content: str) -> str:
+                return f"""Based on this audio transcription, generate {num_tweets} {'tweet' if num_tweets == 1 else 'tweets'}.
 
-Content: {text}
+Content: {content}
 
 Content Type: {content_type}
 Number of Tweets: {num_tweets}
@@ -179,17 +212,14 @@ Guidelines:
 
 Generate the content:"""
         
+        # Trim the transcription, not the instructions, to the token budget
+        prompt = await asyncio.to_thread(fit_prompt, render, text, system_prompt, max_tokens)
+        
         # Get response from GPT
-        response = await client.chat.completions.create(
+        response = await chat_completion(
             model=settings.OPENAI_MODEL,
             messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert social media content creator who specializes in audio content. 
-                    For premium users creating long-form content, you write comprehensive, well-structured posts 
-                    that are several paragraphs long (at least 1000 words) and make full use of the 25,000 character limit.
-                    For regular users, you create concise, impactful tweets within 280 characters."""
-                },
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
@@ -200,9 +230,6 @@ Generate the content:"""
         content = response.choices[0].message.content.strip()
         logger.info(f"[generate_twitter_content] Raw GPT response content: {content[:200]}...")
         
-        # Calculate GPT costs using completion object
-        gpt_costs = CostCalculator.calculate_gpt_cost(prompt, content, completion=response)
-        
         tweets = []
         
         # Handle premium long-form content
@@ -247,7 +274,7 @@ Generate the content:"""
                 # Generate image for the first tweet if requested
                 if generate_image and i == 0:
                     logger.info("Generating image for first tweet...")
-                    image_url = await generate_image_from_text(text[:500])
+                    image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, text, settings.IMAGE_PROMPT_SOURCE_TOKENS))
                     if image_url:
                         tweet_dict["image_url"] = image_url
                         logger.info(f"Added image URL to tweet: {image_url}")
@@ -255,7 +282,7 @@ Generate the content:"""
                 tweets.append(tweet_dict)
         
         logger.info(f"Generated {len(tweets)} tweets")
-        return tweets, gpt_costs
+        return tweets
     
     except Exception as e:
         logger.error(f"Error generating X content: {str(e)}")
@@ -286,40 +313,30 @@ def get_audio_metadata(file_path: str) -> AudioMetadata:
         logger.error(f"Error extracting audio metadata: {str(e)}")
         return AudioMetadata()
 
-def calculate_whisper_cost(duration_seconds: float) -> float:
-    """Calculate cost for Whisper transcription"""
-    # Convert seconds to minutes and round up to nearest minute
-    duration_minutes = (duration_seconds + 59) // 60
-    # Whisper cost is $0.006 per minute
-    return duration_minutes * 0.006
-
-async def transcribe_audio(file_path: str, content_type: str = None) -> str:
-    """Transcribe audio using OpenAI's Whisper API"""
+async def transcribe_audio(file_path: str, content_type: str = None, file_hash: Optional[str] = None) -> str:
+    """Transcribe audio with the configured transcription backend"""
     try:
-        # Generate cache key based on file content
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            file_hash = get_audio_hash(content)
-            cache_key = get_cache_key("whisper-transcription", file_hash)
+        # Cache key is the file content; callers that spooled the upload already have it
+        file_hash = file_hash or hash_file(file_path)
         
-        # Check cache for transcription
-        cached_transcript = get_cached_data(cache_key)
-        if cached_transcript:
-            logger.info("Using cached Whisper transcription")
-            return cached_transcript
+        # Imported here: the transcription package caches segments through this package's pipeline
+        from ..transcription import get_transcription_backend, transcribe_speech
+        backend = get_transcription_backend()
+        use_vad = settings.TRANSCRIPTION_VAD
         
-        # If not in cache, transcribe using Whisper
-        logger.info("Transcribing audio with Whisper API")
-        with open(file_path, 'rb') as audio_file:
-            transcript = await client.audio.transcriptions.create(
-                file=audio_file,
-                model="whisper-1"
-            )
-            
-        # Cache the transcription result
-        set_cached_data(cache_key, transcript.text)
+        async def run_whisper() -> str:
+            logger.info(f"Transcribing audio with the {backend.name} backend")
+            if use_vad:
+                try:
+                    # Only detected speech is sent, so silence isn't transcribed or billed
+                    return (await transcribe_speech(file_path, file_hash, backend)).text
+                except Exception as e:
+                    logger.warning(f"Voice activity detection failed, transcribing the whole file: {str(e)}")
+            return await backend.transcribe(file_path, file_hash)
         
-        return transcript.text
+        # Identical uploads transcribed concurrently share one transcription
+        mode = f"{backend.name}:vad" if use_vad else backend.name
+        return await run_stage(EXTRACT, f"audio:{mode}:{file_hash}", run_whisper)
         
     except Exception as e:
         logger.error(f"Error transcribing audio: {str(e)}")
@@ -332,101 +349,148 @@ class AudioProcessingResult(BaseModel):
     metadata: Optional[Dict] = None
     cost_info: CostInfo
 
+async def transcript_to_twitter(
+    transcript: str,
+    usage: UsageAccumulator,
+    metadata: Optional[Dict] = None,
+    content_type: str = "short",
+    num_tweets: int = 1,
+    additional_context: Optional[str] = None,
+    generate_image: bool = False,
+    is_premium: bool = False
+) -> AudioToTwitterResponse:
+    """Clean a raw transcript and generate posts from it"""
+    # Clean up transcription
+    await report_progress(50, "cleaning transcript")
+    cleaned_transcript = await run_stage(
+        CLEAN,
+        text_stage_id("audio", transcript),
+        lambda: clean_transcription(transcript)
+    )
+    
+    # Generate tweets
+    await report_progress(70, "generating posts")
+    logger.info(f"[transcript_to_twitter] Calling generate_twitter_content with num_tweets={num_tweets}")
+    tweets = await run_stage(
+        GENERATE,
+        generation_stage_id(
+            "audio",
+            cleaned_transcript,
+            content_type=content_type,
+            num_tweets=num_tweets,
+            additional_context=additional_context,
+            generate_image=generate_image,
+            is_premium=is_premium
+        ),
+        lambda: generate_twitter_content(
+            text=cleaned_transcript,
+            content_type=content_type,
+            num_tweets=num_tweets,
+            additional_context=additional_context,
+            generate_image=generate_image,
+            is_premium=is_premium
+        )
+    )
+    logger.info(f"[transcript_to_twitter] Received {len(tweets)} tweets from generate_twitter_content")
+    
+    # Create TwitterContent objects from dictionaries
+    tweet_objects = []
+    for tweet_dict in tweets:
+        tweet_obj = TwitterContentSchema(
+            tweet_text=tweet_dict["tweet_text"],
+            is_thread=tweet_dict["is_thread"],
+            thread_position=tweet_dict["thread_position"],
+            image_url=tweet_dict["image_url"],
+            is_premium_content=tweet_dict["is_premium_content"]
+        )
+        tweet_objects.append(tweet_obj.model_dump())
+    
+    # Create response
+    response = AudioToTwitterResponse(
+        audio_transcript=transcript,
+        cleaned_transcript=cleaned_transcript,
+        generated_tweets=tweet_objects,
+        metadata=metadata,
+        cost_info=usage.to_cost_info()
+    )
+    
+    return response
+
+async def spool_audio(file: UploadFile, directory: Optional[str] = None) -> SpooledUpload:
+    """Check an audio upload's type, then stream it to disk, enforcing the size limit and hashing it on the way"""
+    if file.content_type not in ALLOWED_AUDIO_TYPES:
+        logger.error(f"Invalid file type: {file.content_type}. Allowed types: {list(ALLOWED_AUDIO_TYPES.keys())}")
+        raise FileTypeError(f"Unsupported file type. Allowed types: {', '.join(ALLOWED_AUDIO_TYPES.values())}")
+    return await spool_upload(file, MAX_FILE_SIZE, suffix=os.path.splitext(file.filename or "")[1], directory=directory)
+
 async def process_audio_file(
-    file: UploadFile,
+    upload: SpooledUpload,
     content_type: str = "short",
     num_tweets: int = 1,
     additional_context: Optional[str] = None,
     generate_image: bool = False,
     is_premium: bool = False
 ) -> AudioToTwitterResponse:
+    """Transcribe a spooled audio file and generate Twitter content; the caller owns the upload's cleanup"""
     try:
         logger.info(f"[process_audio_file] Received request with num_tweets={num_tweets}, content_type={content_type}")
-        # Validate file type
-        if file.content_type not in ALLOWED_AUDIO_TYPES:
-            logger.error(f"Invalid file type: {file.content_type}. Allowed types: {list(ALLOWED_AUDIO_TYPES.keys())}")
-            raise FileTypeError(f"Unsupported file type. Allowed types: {', '.join(ALLOWED_AUDIO_TYPES.values())}")
-        
-        # Create a temporary file to store the uploaded content
-        content = await file.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-            temp_file.write(content)
-            temp_file.flush()
+        # Whisper, cleanup and generation calls below record into the request's usage
+        usage = current_usage() or start_usage_tracking()
         
         # Get file metadata
-        metadata = get_audio_metadata(temp_file.name)
+        metadata = get_audio_metadata(upload.path)
         logger.info(f"Audio metadata: {metadata}")
         
-        # Calculate Whisper cost
-        whisper_duration_minutes = metadata.duration / 60 if metadata.duration else None
-        whisper_cost = calculate_whisper_cost(metadata.duration) if metadata.duration else None
-        logger.info(f"Whisper cost calculation: duration={metadata.duration}s, cost=${whisper_cost}")
-        
         # Transcribe audio using Whisper
-        transcript = await transcribe_audio(temp_file.name, content_type=file.content_type)
-        
-        # Clean up temporary file
-        os.unlink(temp_file.name)
+        await report_progress(10, "transcribing")
+        transcript = await transcribe_audio(upload.path, content_type=upload.content_type, file_hash=upload.sha256)
         
-        # Clean up transcription
-        cleaned_transcript = await clean_transcription(transcript)
-        
-        # Generate tweets
-        logger.info(f"[process_audio_file] Calling generate_twitter_content with num_tweets={num_tweets}")
-        tweets, gpt_costs = await generate_twitter_content(
-            text=cleaned_transcript,
+        return await transcript_to_twitter(
+            transcript,
+            usage,
+            metadata=metadata.dict() if metadata else None,
             content_type=content_type,
             num_tweets=num_tweets,
             additional_context=additional_context,
             generate_image=generate_image,
             is_premium=is_premium
         )
-        logger.info(f"[process_audio_file] Received {len(tweets)} tweets from generate_twitter_content")
-        
-        # Create TwitterContent objects from dictionaries
-        tweet_objects = []
-        for tweet_dict in tweets:
-            tweet_obj = TwitterContentSchema(
-                tweet_text=tweet_dict["tweet_text"],
-                is_thread=tweet_dict["is_thread"],
-                thread_position=tweet_dict["thread_position"],
-                image_url=tweet_dict["image_url"],
-                is_premium_content=tweet_dict["is_premium_content"]
-            )
-            tweet_objects.append(tweet_obj.model_dump())
-        
-        # Create response
-        response = AudioToTwitterResponse(
-            audio_transcript=transcript,
-            cleaned_transcript=cleaned_transcript,
-            generated_tweets=tweet_objects,
-            metadata=metadata.dict() if metadata else None,
-            cost_info=CostInfo(
-                input_tokens=gpt_costs["input_tokens"],
-                output_tokens=gpt_costs["output_tokens"],
-                input_cost=gpt_costs["input_cost"],
-                output_cost=gpt_costs["output_cost"],
-                whisper_duration_minutes=whisper_duration_minutes,
-                whisper_cost=whisper_cost,
-                total_cost=(gpt_costs["total_cost"] or 0) + (whisper_cost or 0)
-            )
-        )
-        
-        return response
     
     except Exception as e:
         logger.error(f"Error processing audio file: {str(e)}")
         raise ContentProcessingError(f"Error processing audio file: {str(e)}")
 
-async def process_m3u8_url(url: str) -> AudioToTwitterResponse:
+async def process_m3u8_url(
+    url: str,
+    content_type: str = "short",
+    num_tweets: int = 1,
+    additional_context: Optional[str] = None,
+    generate_image: bool = False,
+    is_premium: bool = False
+) -> AudioToTwitterResponse:
     """Process M3U8 URL and prepare content for social media"""
     try:
-        # TODO: Implement M3U8 processing
-        # 1. Download M3U8 stream
-        # 2. Convert to audio
-        # 3. Process with Whisper
-        # For now, raise not implemented
-        raise NotImplementedError("M3U8 processing not yet implemented")
+        # Imported here: the transcription package caches segments through this package's pipeline
+        from ..transcription import transcribe_hls
+        
+        usage = current_usage() or start_usage_tracking()
+        
+        # Segments are fetched and transcribed window by window; see transcription.hls
+        await report_progress(10, "transcribing")
+        transcript = await transcribe_hls(url)
+        if not transcript:
+            raise ContentProcessingError("No speech found in the stream")
+        
+        return await transcript_to_twitter(
+            transcript,
+            usage,
+            metadata={"source_url": url},
+            content_type=content_type,
+            num_tweets=num_tweets,
+            additional_context=additional_context,
+            generate_image=generate_image,
+            is_premium=is_premium
+        )
         
     except Exception as e:
         error_msg = f"Error processing M3U8 URL: {str(e)}"
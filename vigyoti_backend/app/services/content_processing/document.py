@@ -1,24 +1,24 @@
-import os
-import tempfile
+import asyncio
 from typing import BinaryIO, Optional, List, Tuple, Dict
 from fastapi import UploadFile
 import PyPDF2
 import docx
 import mammoth
-from openai import OpenAI
+from ..llm_gateway import chat_completion
 from ...schemas.twitter import TwitterContent as TwitterContentSchema
 from ...schemas.content import DocumentMetadata, ContentProcessingResponse
 from ...core.exceptions import ContentProcessingError, FileTypeError, FileSizeError
 from ...core.prompts import DOCUMENT_EXTRACTION_PROMPT
 from ...core.config import settings
-from ...utils.cost_calculator import CostCalculator
+from ...core.jobs import report_progress
+from .pipeline import run_stage, text_stage_id, EXTRACT, SUMMARY
+from .summarization import summarize_long_text
+from ...utils.uploads import SpooledUpload, spool_upload
+from ...utils.prompt_builder import fit_prompt, truncate_to_tokens
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 ALLOWED_DOCUMENT_TYPES = {
     'application/pdf': 'pdf',
     'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
@@ -58,39 +58,22 @@ async def extract_text_from_doc(file_path: str) -> str:
     except Exception as e:
         raise ContentProcessingError(f"Error extracting text from DOC: {str(e)}")
 
-async def extract_key_information(text: str) -> Tuple[str, Dict]:
+async def extract_key_information(text: str) -> str:
     """Extract key information from document text using OpenAI"""
     try:
-        # Format the extraction prompt
-        extraction_prompt = DOCUMENT_EXTRACTION_PROMPT.format(content=text[:4000])
-        
-        # Call OpenAI API
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at extracting key information from documents and preparing it for social media content creation."
-                },
-                {"role": "user", "content": extraction_prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1000
+        # Long documents are extracted chunk by chunk and then merged, instead of truncated
+        return await summarize_long_text(
+            text,
+            "document",
+            DOCUMENT_EXTRACTION_PROMPT,
+            "You are an expert at extracting key information from documents and preparing it for social media content creation.",
+            max_tokens=1000,
+            temperature=0.3
         )
-        
-        extracted_text = response.choices[0].message.content.strip()
-        
-        # Calculate extraction costs
-        extraction_costs = CostCalculator.calculate_gpt_cost(extraction_prompt, extracted_text, completion=response)
-        
-        return extracted_text, extraction_costs
     except Exception as e:
         raise ContentProcessingError(f"Error extracting key information: {str(e)}")
 
-async def generate_social_summary(text: str) -> str:
-    """Generate a summary optimized for social media content"""
-    try:
-        summary_prompt = """
+SOCIAL_SUMMARY_PROMPT = """
 Create a concise summary of this document that would be engaging on social media:
 1. Identify the most shareable insights or findings
 2. Extract quotable statistics or facts
@@ -100,25 +83,60 @@ Create a concise summary of this document that would be engaging on social media
 
 Content:
 {content}
-""".format(content=text[:2000])  # Use first 2000 chars for summary
+"""
 
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at creating engaging social media content from documents."
-                },
-                {"role": "user", "content": summary_prompt}
-            ],
-            temperature=0.5,
-            max_tokens=300
+async def generate_social_summary(text: str) -> str:
+    """Generate a summary optimized for social media content"""
+    try:
+        summary = await summarize_long_text(
+            text,
+            "document",
+            SOCIAL_SUMMARY_PROMPT,
+            "You are an expert at creating engaging social media content from documents.",
+            max_tokens=300,
+            temperature=0.5
         )
-        
-        return response.choices[0].message.content.strip()
+        return summary
     except Exception as e:
         raise ContentProcessingError(f"Error generating social summary: {str(e)}")
 
+def build_document_twitter_messages(
+    document_text: str,
+    content_type: str,
+    num_tweets: int = 1,
+    additional_context: Optional[str] = None,
+    is_premium: bool = False
+) -> Tuple[List[Dict[str, str]], int, float]:
+    """Build the chat messages, max_tokens and temperature for a document-to-X generation"""
+    system_prompt = "You are an expert at creating engaging X (formerly Twitter) content."
+    
+    # Use higher max_tokens for premium long content
+    max_tokens = 7000 if is_premium and content_type == "long" else 1000
+    
+    def render(content: str) -> str:
+        return f"""Based on the following document content, generate {num_tweets} engaging Twitter post{'s' if num_tweets > 1 else ''} that {'are' if num_tweets > 1 else 'is'} {content_type} in nature.
+    
+    Document Content:
+    {content}
+    
+    Additional Context:
+    {additional_context or 'No additional context provided.'}
+    
+    Guidelines:
+    1. For premium long posts, create comprehensive content up to 25,000 characters
+    2. For regular posts, stay within 280 characters
+    3. Use engaging language and appropriate hashtags
+    4. Include relevant emojis for visual appeal
+    5. Format content for optimal readability
+    """
+    
+    twitter_prompt = fit_prompt(render, document_text, system_prompt, max_tokens)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": twitter_prompt}
+    ]
+    return messages, max_tokens, 0.8
+
 async def generate_twitter_content(
     document_text: str,  # Keep the original parameter name
     content_type: str,
@@ -126,49 +144,24 @@ async def generate_twitter_content(
     additional_context: Optional[str] = None,
     generate_image: bool = False,
     is_premium: bool = False
-) -> Tuple[List[Dict], Dict]:
+) -> List[Dict]:
     """Generate X (formerly Twitter) content from document text"""
     try:
-        # Format the prompt
-        twitter_prompt = f"""Based on the following document content, generate {num_tweets} engaging Twitter post{'s' if num_tweets > 1 else ''} that {'are' if num_tweets > 1 else 'is'} {content_type} in nature.
-        
-        Document Content:
-        {document_text}
-        
-        Additional Context:
-        {additional_context or 'No additional context provided.'}
-        
-        Guidelines:
-        1. For premium long posts, create comprehensive content up to 25,000 characters
-        2. For regular posts, stay within 280 characters
-        3. Use engaging language and appropriate hashtags
-        4. Include relevant emojis for visual appeal
-        5. Format content for optimal readability
-        """
-        
-        # Use higher max_tokens for premium long content
-        max_tokens = 7000 if is_premium and content_type == "long" else 1000
-        
+        messages, max_tokens, temperature = await asyncio.to_thread(
+            build_document_twitter_messages,
+            document_text, content_type, num_tweets, additional_context, is_premium
+        )
         # Generate content using OpenAI
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model=settings.OPENAI_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at creating engaging X (formerly Twitter) content."
-                },
-                {"role": "user", "content": twitter_prompt}
-            ],
-            temperature=0.8,
+            messages=messages,
+            temperature=temperature,
             max_tokens=max_tokens
         )
         
         # Parse the generated content
         generated_content = response.choices[0].message.content.strip()
         
-        # Calculate Twitter content generation costs
-        twitter_costs = CostCalculator.calculate_gpt_cost(twitter_prompt, generated_content, completion=response)
-        
         tweets = []
         
         # Process content based on type and premium status
@@ -190,7 +183,7 @@ async def generate_twitter_content(
                 logger.info("Generating image for premium post...")
                 try:
                     from ..image_generation import generate_image_from_text
-                    image_url = await generate_image_from_text(document_text[:500])
+                    image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, document_text, settings.IMAGE_PROMPT_SOURCE_TOKENS))
                     if image_url:
                         tweet_content["image_url"] = image_url
                         logger.info(f"Added image URL to premium post: {image_url}")
@@ -215,7 +208,7 @@ async def generate_twitter_content(
                         logger.info("Generating image for first tweet...")
                         try:
                             from ..image_generation import generate_image_from_text
-                            image_url = await generate_image_from_text(document_text[:500])
+                            image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, document_text, settings.IMAGE_PROMPT_SOURCE_TOKENS))
                             if image_url:
                                 tweet_content["image_url"] = image_url
                                 logger.info(f"Added image URL to tweet: {image_url}")
@@ -224,73 +217,74 @@ async def generate_twitter_content(
                     
                     tweets.append(tweet_content)
         
-        return tweets[:num_tweets], twitter_costs
+        return tweets[:num_tweets]
     
     except Exception as e:
         logger.error(f"Error processing document to Twitter content: {str(e)}", exc_info=True)
         raise ContentProcessingError(f"Error processing document to Twitter content: {str(e)}")
 
-async def process_document(file: UploadFile) -> ContentProcessingResponse:
-    """Process document file and prepare content for social media"""
+async def extract_document_text(file_path: str, content_type: str) -> str:
+    """Extract the text of a document on disk"""
+    if content_type == 'application/pdf':
+        return await extract_text_from_pdf(file_path)
+    if content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
+        return await extract_text_from_docx(file_path)
+    if content_type == 'application/msword':
+        return await extract_text_from_doc(file_path)
+    if content_type == 'text/plain':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    return ""
+
+async def spool_document(file: UploadFile, directory: Optional[str] = None) -> SpooledUpload:
+    """Check a document upload's type, then stream it to disk, enforcing the size limit and hashing it on the way"""
+    if file.content_type not in ALLOWED_DOCUMENT_TYPES:
+        raise FileTypeError(f"Unsupported file type. Allowed types: {', '.join(ALLOWED_DOCUMENT_TYPES.values())}")
+    return await spool_upload(file, MAX_FILE_SIZE, suffix=f".{ALLOWED_DOCUMENT_TYPES[file.content_type]}", directory=directory)
+
+async def process_document(upload: SpooledUpload) -> ContentProcessingResponse:
+    """Process a spooled document and prepare content for social media; the caller owns the upload's cleanup"""
     try:
-        # Validate file type
-        if file.content_type not in ALLOWED_DOCUMENT_TYPES:
-            raise FileTypeError(f"Unsupported file type. Allowed types: {', '.join(ALLOWED_DOCUMENT_TYPES.values())}")
-        
-        # Validate file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to start
-        
-        if file_size > MAX_FILE_SIZE:
-            raise FileSizeError(f"File size exceeds maximum limit of {MAX_FILE_SIZE/1024/1024}MB")
-        
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ALLOWED_DOCUMENT_TYPES[file.content_type]}") as temp_file:
-            # Write uploaded file to temporary file
-            content = await file.read()
-            temp_file.write(content)
-            temp_file.flush()
-            
-            # Extract text based on file type
-            if file.content_type == 'application/pdf':
-                text = await extract_text_from_pdf(temp_file.name)
-            elif file.content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
-                text = await extract_text_from_docx(temp_file.name)
-            elif file.content_type == 'application/msword':
-                text = await extract_text_from_doc(temp_file.name)
-            elif file.content_type == 'text/plain':
-                with open(temp_file.name, 'r', encoding='utf-8') as f:
-                    text = f.read().strip()
-            else:
-                text = ""
-        
-        # Clean up temporary file
-        os.unlink(temp_file.name)
+        # Extraction results are keyed on the document bytes, so re-uploads skip parsing entirely
+        content_hash = upload.sha256
+        await report_progress(10, "extracting text")
+        text = await run_stage(
+            EXTRACT,
+            f"document:{content_hash}",
+            lambda: extract_document_text(upload.path, upload.content_type)
+        )
         
         if not text:
             raise ContentProcessingError("No text could be extracted from the document")
         
-        # Extract key information and prepare for social media
-        processed_text, extraction_costs = await extract_key_information(text)
+        async def summarize() -> Dict:
+            # Extract key information and prepare for social media
+            processed_text = await extract_key_information(text)
+            
+            # Generate social media optimized summary
+            summary = await generate_social_summary(processed_text)
+            
+            return {
+                "processed_text": processed_text,
+                "summary": summary
+            }
         
-        # Generate social media optimized summary
-        summary = await generate_social_summary(processed_text)
+        await report_progress(30, "summarizing")
+        extraction = await run_stage(SUMMARY, text_stage_id("document", text), summarize)
         
         # Create metadata
         metadata = DocumentMetadata(
-            file_name=file.filename,
-            file_size=file_size,
-            file_type=ALLOWED_DOCUMENT_TYPES[file.content_type],
+            file_name=upload.filename,
+            file_size=upload.size,
+            file_type=ALLOWED_DOCUMENT_TYPES[upload.content_type],
             word_count=len(text.split())
         )
         
         return ContentProcessingResponse(
-            source_id=file.filename,
-            summary=summary,
-            full_text=processed_text,
-            metadata=metadata.dict(),
-            costs=extraction_costs
+            source_id=content_hash,
+            summary=extraction["summary"],
+            full_text=extraction["processed_text"],
+            metadata=metadata.dict()
         )
     
     except Exception as e:
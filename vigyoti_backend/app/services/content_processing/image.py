@@ -1,21 +1,22 @@
+import asyncio
 import os
 import base64
-from typing import BinaryIO, List, Optional, Dict, Tuple
+from typing import BinaryIO, List, Optional, Dict
 from fastapi import UploadFile
-from openai import OpenAI
+from ..llm_gateway import chat_completion
 from ...schemas.twitter import TwitterContent as TwitterContentSchema
 from ...schemas.content import ImageMetadata, ContentProcessingResponse
 from ...core.exceptions import ContentProcessingError, FileTypeError, FileSizeError
 from ...core.prompts import DEFAULT_IMAGE_ANALYSIS_PROMPT, TWITTER_CONTENT_PROMPT, IMAGE_TWITTER_PROMPT, TWITTER_CONTENT_GUIDELINES
 from ...core.config import settings
+from .pipeline import run_stage, EXTRACT
+from ...utils.hashing import hash_text
+from ...utils.uploads import SpooledUpload, spool_upload
 from ...services.image_generation import generate_image_from_text
-from ...utils.cost_calculator import CostCalculator
+from ...utils.prompt_builder import fit_prompt, truncate_to_tokens
 import logging
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 ALLOWED_IMAGE_TYPES = {
     'image/jpeg': 'jpg',
     'image/png': 'png',
@@ -25,7 +26,7 @@ ALLOWED_IMAGE_TYPES = {
 
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB
 
-async def analyze_image_with_vision(image_data: bytes, prompt: str = None) -> Tuple[str, Dict]:
+async def analyze_image_with_vision(image_data: bytes, prompt: str = None) -> str:
     """Analyze image using OpenAI Vision API"""
     try:
         # Encode image to base64
@@ -36,7 +37,7 @@ async def analyze_image_with_vision(image_data: bytes, prompt: str = None) -> Tu
             prompt = DEFAULT_IMAGE_ANALYSIS_PROMPT
         
         # Call Vision API
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model=settings.OPENAI_MODEL,
             messages=[
                 {
@@ -55,42 +56,40 @@ async def analyze_image_with_vision(image_data: bytes, prompt: str = None) -> Tu
             max_tokens=500
         )
         
-        analysis = response.choices[0].message.content
-        
-        # Calculate vision API costs
-        vision_costs = CostCalculator.calculate_gpt_cost(prompt, analysis, completion=response)
-        
-        return analysis, vision_costs
+        return response.choices[0].message.content
         
     except Exception as e:
         raise ContentProcessingError(f"Error analyzing image with Vision API: {str(e)}")
 
-async def process_image(file: UploadFile, analysis_prompt: str = None) -> ContentProcessingResponse:
-    """Process image file using OpenAI Vision"""
+async def spool_image(file: UploadFile, directory: Optional[str] = None) -> SpooledUpload:
+    """Check an image upload's type, then stream it to disk, enforcing the size limit and hashing it on the way"""
+    if file.content_type not in ALLOWED_IMAGE_TYPES:
+        raise FileTypeError(f"Unsupported file type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES.values())}")
+    return await spool_upload(file, MAX_FILE_SIZE, suffix=f".{ALLOWED_IMAGE_TYPES[file.content_type]}", directory=directory)
+
+async def process_image(
+    upload: SpooledUpload,
+    analysis_prompt: str = None
+) -> ContentProcessingResponse:
+    """Process a spooled image with OpenAI Vision; the caller owns the upload's cleanup"""
     try:
-        # Validate file type
-        if file.content_type not in ALLOWED_IMAGE_TYPES:
-            raise FileTypeError(f"Unsupported file type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES.values())}")
-        
-        # Validate file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to start
+        # Vision results are keyed on the image bytes and the prompt, not the file name
+        content_hash = upload.sha256
+        prompt_hash = hash_text(analysis_prompt or DEFAULT_IMAGE_ANALYSIS_PROMPT)[:16]
         
-        if file_size > MAX_FILE_SIZE:
-            raise FileSizeError(f"File size exceeds maximum limit of {MAX_FILE_SIZE/1024/1024}MB")
+        async def analyze() -> Dict:
+            # Encode straight from the mapped file rather than a copy of the upload
+            with upload.view() as image_data:
+                return {"analysis": await analyze_image_with_vision(image_data, analysis_prompt)}
         
-        # Read image data
-        image_data = await file.read()
-        
-        # Analyze image
-        analysis, vision_costs = await analyze_image_with_vision(image_data, analysis_prompt)
+        vision_result = await run_stage(EXTRACT, f"image:{content_hash}:{prompt_hash}", analyze)
+        analysis = vision_result["analysis"]
         
         # Create metadata
         metadata = ImageMetadata(
-            file_name=file.filename,
-            file_size=file_size,
-            file_type=ALLOWED_IMAGE_TYPES[file.content_type],
+            file_name=upload.filename,
+            file_size=upload.size,
+            file_type=ALLOWED_IMAGE_TYPES[upload.content_type],
             dimensions=None  # Would need additional library like Pillow to get dimensions
         )
         
@@ -98,11 +97,10 @@ async def process_image(file: UploadFile, analysis_prompt: str = None) -> Conten
         summary = analysis[:500] + "..." if len(analysis) > 500 else analysis
         
         return ContentProcessingResponse(
-            source_id=file.filename,
+            source_id=content_hash,
             summary=summary,
             full_text=analysis,
-            metadata=metadata.dict(),
-            costs=vision_costs
+            metadata=metadata.dict()
         )
     
     except Exception as e:
@@ -116,7 +114,7 @@ async def generate_twitter_content(
     additional_context: Optional[str] = None,
     generate_image: bool = False,
     is_premium: bool = False
-) -> Tuple[List[Dict], Dict]:
+) -> List[Dict]:
     """Generate X (formerly Twitter) content inspired by the image analysis"""
     try:
         # Format the Twitter content prompt
@@ -142,28 +140,33 @@ async def generate_twitter_content(
             7. Aims for at least 1000 words of engaging content
             """
         
-        twitter_prompt = IMAGE_TWITTER_PROMPT.format(
-            content=image_analysis,
-            num_tweets=num_tweets,
-            plural_suffix=plural_suffix,
-            is_are=is_are,
-            additional_context=additional_context or "",
-            content_type_guidelines=content_type_guidelines
-        )
-        
         # Use higher max_tokens for premium long content
         max_tokens = 7000 if is_premium and content_type == "long" else 1000
         
+        system_prompt = """You are an expert at creating engaging X (formerly Twitter) content that draws creative insights and ideas from images. 
+                    For premium users creating long-form content, you should write comprehensive, well-structured posts that are several paragraphs long (at least 1000 words) and make full use of the 25,000 character limit.
+                    For regular users, limit posts to 280 characters."""
+        
+        twitter_prompt = await asyncio.to_thread(
+            fit_prompt,
+            lambda content: IMAGE_TWITTER_PROMPT.format(
+                content=content,
+                num_tweets=num_tweets,
+                plural_suffix=plural_suffix,
+                is_are=is_are,
+                additional_context=additional_context or "",
+                content_type_guidelines=content_type_guidelines
+            ),
+            image_analysis,
+            system_prompt,
+            max_tokens
+        )
+        
         # Call OpenAI API
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model=settings.OPENAI_MODEL,
             messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert at creating engaging X (formerly Twitter) content that draws creative insights and ideas from images. 
-                    For premium users creating long-form content, you should write comprehensive, well-structured posts that are several paragraphs long (at least 1000 words) and make full use of the 25,000 character limit.
-                    For regular users, limit posts to 280 characters."""
-                },
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": twitter_prompt}
             ],
             temperature=0.8,  # Slightly higher temperature for more creative responses
@@ -173,9 +176,6 @@ async def generate_twitter_content(
         # Parse the generated tweets
         generated_content = response.choices[0].message.content.strip()
         
-        # Calculate Twitter content generation costs
-        twitter_costs = CostCalculator.calculate_gpt_cost(twitter_prompt, generated_content, completion=response)
-        
         tweets = []
         
         # Parsing logic based on content type and premium status
@@ -200,7 +200,7 @@ async def generate_twitter_content(
             if generate_image:
                 logger.info("Generating image for premium post...")
                 try:
-                    image_url = await generate_image_from_text(image_analysis[:500])
+                    image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, image_analysis, settings.IMAGE_PROMPT_SOURCE_TOKENS))
                     if image_url:
                         tweet_content["image_url"] = image_url
                         logger.info(f"Added image URL to premium post: {image_url}")
@@ -227,7 +227,7 @@ async def generate_twitter_content(
                     if generate_image and i == 0:
                         logger.info("Generating image for first tweet...")
                         try:
-                            image_url = await generate_image_from_text(image_analysis[:500])
+                            image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, image_analysis, settings.IMAGE_PROMPT_SOURCE_TOKENS))
                             if image_url:
                                 tweet_content["image_url"] = image_url
                                 logger.info(f"Added image URL to tweet: {image_url}")
@@ -237,7 +237,7 @@ async def generate_twitter_content(
                     tweets.append(tweet_content)
                     logger.info(f"Generated regular content with length: {len(tweet_text)}")
         
-        return tweets[:num_tweets], twitter_costs
+        return tweets[:num_tweets]
         
     except Exception as e:
         logger.error(f"Error generating X content: {str(e)}")
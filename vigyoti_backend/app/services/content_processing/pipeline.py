@@ -0,0 +1,46 @@
+"""
+Stage-level caching for the ingest → clean → summarize → generate pipeline.
+
+Each stage is cached under its own key so that a request which only changes
+the generation parameters (tone, tweet count, content type) reuses the
+extraction and summary of an earlier request and pays for the final
+generation call alone.
+"""
+from typing import Any, Awaitable, Callable
+from ...core.cache import get_cache_key
+from ...core.singleflight import get_or_compute
+from ...utils.hashing import hash_text, hash_params
+
+# Pipeline stages
+EXTRACT = "extract"      # raw content keyed by source id or content hash
+CLEAN = "clean"          # cleaned text keyed by raw text hash
+SUMMARY = "summary"      # summaries keyed by text hash
+GENERATE = "generate"    # generated posts keyed by input hash and parameters
+
+# Bump a stage's version whenever its prompt or output format changes
+STAGE_VERSIONS = {
+    EXTRACT: "v1",
+    CLEAN: "v1",
+    SUMMARY: "v2",
+    GENERATE: "v2",
+}
+
+def stage_cache_key(stage: str, identifier: str) -> str:
+    """Build the cache key for a stage result"""
+    return get_cache_key(f"pipeline:{stage}:{STAGE_VERSIONS[stage]}", identifier)
+
+def text_stage_id(kind: str, text: str) -> str:
+    """Identifier for stages whose input is a block of text"""
+    return f"{kind}:{hash_text(text)}"
+
+def generation_stage_id(kind: str, source_text: str, **params: Any) -> str:
+    """Identifier for the generation stage: the prompt input plus all generation parameters"""
+    return f"{kind}:{hash_text(source_text)}:{hash_params(**params)}"
+
+async def run_stage(
+    stage: str,
+    identifier: str,
+    compute: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Return the cached result of a stage, computing it once on a miss"""
+    return await get_or_compute(stage_cache_key(stage, identifier), compute)
@@ -0,0 +1,115 @@
+"""
+Server-Sent Events streaming for tweet generation.
+
+Streams LLM deltas to the client as they arrive, emits a `post` event as soon
+as each separator-delimited post is complete, and finishes with a `done`
+event carrying the cost info, so premium long posts show their first words in
+well under a second instead of after the whole completion.
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List
+from ..llm_gateway import stream_chat_completion
+from ...core.config import settings
+from ...core.usage import current_usage, start_usage_tracking
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # stop nginx from buffering the stream
+}
+
+PREMIUM_POST_LIMIT = 25000
+POST_LIMIT = 280
+
+# Posts are split the same way for every source: premium long pieces on the marker the
+# prompts ask for (output without it stays a single post), everything else on blank lines
+PREMIUM_POST_SEPARATOR = "[NEW_CONTENT]"
+POST_SEPARATOR = "\n\n"
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def build_post(text: str, position: int, num_tweets: int, is_premium_long: bool) -> Dict[str, Any]:
+    """Shape a completed post the same way the non-streaming endpoints do"""
+    if is_premium_long:
+        return {
+            "tweet_text": text[:PREMIUM_POST_LIMIT],
+            "is_thread": False,
+            "thread_position": None,
+            "image_url": None,
+            "is_premium_content": True
+        }
+    return {
+        "tweet_text": text[:POST_LIMIT],
+        "is_thread": num_tweets > 1,
+        "thread_position": position if num_tweets > 1 else None,
+        "image_url": None,
+        "is_premium_content": False
+    }
+
+async def stream_twitter_content(
+    messages: List[Dict[str, str]],
+    content_type: str,
+    num_tweets: int,
+    is_premium: bool,
+    max_tokens: int,
+    temperature: float
+) -> AsyncIterator[str]:
+    """Generate posts with a streamed completion, yielding SSE-encoded events.
+
+    Events: `delta` ({"text"}) for every content chunk, `post` for each
+    completed post, `error` if generation fails and `done` with `cost_info`
+    and the number of posts.
+    """
+    is_premium_long = is_premium and content_type == "long"
+    separator = PREMIUM_POST_SEPARATOR if is_premium_long else POST_SEPARATOR
+    # Endpoints start tracking before scraping or summarizing; this covers direct callers
+    usage = current_usage() or start_usage_tracking()
+    buffer = ""
+    posts_sent = 0
+
+    def complete_posts(final: bool) -> List[Dict[str, Any]]:
+        nonlocal buffer, posts_sent
+        parts = buffer.split(separator)
+        # The last part may still be growing unless the stream has ended
+        buffer = "" if final else parts.pop()
+        posts = []
+        for part in parts:
+            text = part.strip()
+            if not text or posts_sent >= num_tweets:
+                continue
+            posts_sent += 1
+            posts.append(build_post(text, posts_sent, num_tweets, is_premium_long))
+        return posts
+
+    try:
+        async for chunk in stream_chat_completion(
+            messages,
+            model=settings.OPENAI_MODEL,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            buffer += delta
+            yield format_sse("delta", {"text": delta})
+            if separator in buffer:
+                for post in complete_posts(final=False):
+                    yield format_sse("post", post)
+
+        for post in complete_posts(final=True):
+            yield format_sse("post", post)
+    except Exception as e:
+        logger.error(f"Error streaming Twitter content: {str(e)}", exc_info=True)
+        yield format_sse("error", {"detail": f"Error generating Twitter content: {str(e)}"})
+        return
+
+    # Everything this request spent, including scraping and summarization before the stream
+    cost_info = usage.to_cost_info().model_dump(exclude_none=True)
+    yield format_sse("done", {"num_posts": posts_sent, "cost_info": cost_info})
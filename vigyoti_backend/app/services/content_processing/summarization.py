@@ -0,0 +1,128 @@
+"""
+Map-reduce summarization for inputs too long for a single prompt.
+
+Long transcripts and documents are split into token-bounded chunks on
+sentence boundaries, each chunk is summarized concurrently (bounded by
+SUMMARY_MAP_CONCURRENCY) and cached by its hash, and the chunk summaries are
+then reduced with the caller's prompt. Short inputs still take a single call.
+Costs are recorded by the gateway into the request's usage accumulator.
+"""
+import asyncio
+import logging
+import re
+from typing import List, Optional, Tuple
+from ..llm_gateway import chat_completion
+from ...core.config import settings
+from ...utils.cost_calculator import CostCalculator, get_encoder
+from .pipeline import run_stage, text_stage_id, SUMMARY
+
+logger = logging.getLogger(__name__)
+
+# Split after sentence punctuation or at paragraph breaks
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+MAP_SYSTEM_PROMPT = "You are an expert at condensing long content without losing the important details."
+
+MAP_PROMPT = """The following is one section of a longer {kind}. Summarize this section so it can be combined with summaries of the other sections:
+- Keep concrete facts, figures, names and notable quotes
+- Keep the order in which ideas are presented
+- Do not add an introduction or conclusion
+
+Section:
+{content}
+"""
+
+def chunk_text(
+    text: str,
+    max_tokens: int = settings.SUMMARY_CHUNK_TOKENS,
+    overlap_tokens: int = settings.SUMMARY_CHUNK_OVERLAP_TOKENS
+) -> List[str]:
+    """Split text into chunks of at most max_tokens, breaking on sentence boundaries where possible"""
+    encoding = get_encoder(settings.OPENAI_MODEL)
+    units = [unit for unit in _BOUNDARY.split(text) if unit.strip()]
+
+    # Sentences longer than a whole chunk (e.g. unpunctuated transcripts) fall back to token windows
+    pieces: List[Tuple[str, int]] = []
+    for unit, tokens in zip(units, encoding.encode_batch(units)):
+        if len(tokens) <= max_tokens:
+            pieces.append((unit, len(tokens)))
+            continue
+        for start in range(0, len(tokens), max_tokens):
+            window = tokens[start:start + max_tokens]
+            pieces.append((encoding.decode(window), len(window)))
+
+    chunks: List[str] = []
+    current: List[Tuple[str, int]] = []
+    current_tokens = 0
+    for piece, count in pieces:
+        if current and current_tokens + count > max_tokens:
+            chunks.append(" ".join(p for p, _ in current))
+            # Carry the tail of the previous chunk over so ideas spanning the cut keep their context
+            carried: List[Tuple[str, int]] = []
+            carried_tokens = 0
+            for p, c in reversed(current):
+                if carried_tokens + c > overlap_tokens:
+                    break
+                carried.insert(0, (p, c))
+                carried_tokens += c
+            if carried_tokens + count > max_tokens:
+                carried, carried_tokens = [], 0
+            current, current_tokens = carried, carried_tokens
+        current.append((piece, count))
+        current_tokens += count
+    if current:
+        chunks.append(" ".join(p for p, _ in current))
+    return chunks
+
+async def _summarize(
+    prompt: str,
+    system_prompt: str,
+    max_tokens: Optional[int],
+    temperature: Optional[float]
+) -> str:
+    kwargs = {}
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    response = await chat_completion(
+        model=settings.OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        **kwargs
+    )
+    return response.choices[0].message.content.strip()
+
+async def summarize_long_text(
+    text: str,
+    kind: str,
+    prompt_template: str,
+    system_prompt: str,
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None
+) -> str:
+    """Summarize text of any length with prompt_template (which takes {content})"""
+    token_count = await asyncio.to_thread(CostCalculator.get_token_count, text, settings.OPENAI_MODEL)
+    if token_count <= settings.SUMMARY_SINGLE_PASS_TOKENS:
+        return await _summarize(prompt_template.format(content=text), system_prompt, max_tokens, temperature)
+
+    chunks = await asyncio.to_thread(chunk_text, text)
+    logger.info(f"Summarizing {kind} of {token_count} tokens in {len(chunks)} chunks")
+    semaphore = asyncio.Semaphore(settings.SUMMARY_MAP_CONCURRENCY)
+
+    async def summarize_chunk(chunk: str) -> str:
+        async def compute() -> str:
+            return await _summarize(MAP_PROMPT.format(kind=kind, content=chunk), MAP_SYSTEM_PROMPT, 1000, 0.3)
+
+        async with semaphore:
+            # Keyed by chunk hash only, so an edited document re-summarizes just the chunks that changed
+            return await run_stage(SUMMARY, text_stage_id(f"{kind}-chunk", chunk), compute)
+
+    summaries = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+
+    # Reduce; if the chunk summaries are themselves too long this recurses into another map step
+    return await summarize_long_text(
+        "\n\n".join(summaries), kind, prompt_template, system_prompt, max_tokens, temperature
+    )
@@ -1,17 +1,57 @@
+import asyncio
 import os
-from typing import List, Optional, Literal
-from openai import OpenAI
+from typing import Dict, List, Optional, Literal, Tuple
+from ..llm_gateway import chat_completion
 from ...core.exceptions import ContentProcessingError
 from ...schemas.twitter import TwitterContent as TwitterContentSchema
 from ...core.config import settings
 from ...services.image_generation import generate_image_from_text
-from ...utils.cost_calculator import CostCalculator
+from ...utils.prompt_builder import fit_prompt, truncate_to_tokens
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def build_text_twitter_messages(
+    text: str,
+    content_type: Literal["short", "thread", "quote", "poll", "long"],
+    num_tweets: int = 1,
+    additional_context: Optional[str] = None,
+    is_premium: bool = False
+) -> Tuple[List[Dict[str, str]], int, float]:
+    """Build the chat messages, max_tokens and temperature for a text-to-X generation"""
+    plural_suffix = "s" if num_tweets > 1 else ""
+    is_are = "are" if num_tweets > 1 else "is"
+    system_prompt = "You are an expert at creating engaging X (formerly Twitter) content."
+    
+    # Use higher max_tokens for premium long content
+    max_tokens = 7000 if is_premium and content_type == "long" else 1000
+    
+    prompt = fit_prompt(
+        lambda content: f"""Based on the following text, generate {num_tweets} engaging Twitter post{plural_suffix} that {is_are} {content_type} in nature.
+    
+    Text Content:
+    {content}
+    
+    Additional Context:
+    {additional_context or 'No additional context provided.'}
+    
+    Guidelines:
+    1. For premium long posts, create comprehensive content up to 25,000 characters
+    2. For regular posts, stay within 280 characters
+    3. Use engaging language and appropriate hashtags
+    4. Include relevant emojis for visual appeal
+    5. Format content for optimal readability
+    """,
+        text,
+        system_prompt,
+        max_tokens
+    )
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, max_tokens, 0.8
 
 async def process_text_to_twitter(
     text: str,
@@ -20,60 +60,30 @@ async def process_text_to_twitter(
     additional_context: Optional[str] = None,
     generate_image: bool = False,
     is_premium: bool = False
-) -> tuple[List[TwitterContentSchema], dict]:
+) -> List[TwitterContentSchema]:
     """Generate X (formerly Twitter) content from input text"""
     try:
-        # Format the prompt
-        plural_suffix = "s" if num_tweets > 1 else ""
-        is_are = "are" if num_tweets > 1 else "is"
-        
-        prompt = f"""Based on the following text, generate {num_tweets} engaging Twitter post{plural_suffix} that {is_are} {content_type} in nature.
-        
-        Text Content:
-        {text}
-        
-        Additional Context:
-        {additional_context or 'No additional context provided.'}
-        
-        Guidelines:
-        1. For premium long posts, create comprehensive content up to 25,000 characters
-        2. For regular posts, stay within 280 characters
-        3. Use engaging language and appropriate hashtags
-        4. Include relevant emojis for visual appeal
-        5. Format content for optimal readability
-        """
-        
-        # Use higher max_tokens for premium long content
-        max_tokens = 7000 if is_premium and content_type == "long" else 1000
-        
+        messages, max_tokens, temperature = await asyncio.to_thread(
+            build_text_twitter_messages,
+            text, content_type, num_tweets, additional_context, is_premium
+        )
         # Generate content using OpenAI
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model=settings.OPENAI_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at creating engaging X (formerly Twitter) content."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.8,
+            messages=messages,
+            temperature=temperature,
             max_tokens=max_tokens
         )
         
         # Parse the generated content
         generated_content = response.choices[0].message.content.strip()
         
-        # Calculate costs
-        input_text = prompt
-        output_text = generated_content
-        gpt_costs = CostCalculator.calculate_gpt_cost(input_text, output_text, completion=response)
-        
         # Generate image if requested
         image_url = None
         if generate_image:
             logger.info("Generating image for tweet...")
             try:
-                image_url = await generate_image_from_text(text[:500])
+                image_url = await generate_image_from_text(await asyncio.to_thread(truncate_to_tokens, text, settings.IMAGE_PROMPT_SOURCE_TOKENS))
                 if image_url:
                     logger.info(f"Successfully generated image URL: {image_url}")
             except Exception as e:
@@ -107,7 +117,7 @@ async def process_text_to_twitter(
                     }
                     tweets.append(TwitterContentSchema(**tweet_content))
         
-        return tweets[:num_tweets], gpt_costs
+        return tweets[:num_tweets]
     
     except Exception as e:
         logger.error(f"Error in process_text_to_twitter: {str(e)}")
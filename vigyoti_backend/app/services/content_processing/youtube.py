@@ -1,38 +1,26 @@
-from youtube_transcript_api import YouTubeTranscriptApi
-from typing import Optional, Dict, List, Literal, Tuple
+import asyncio
+from typing import Optional, Dict, List, Literal, Sequence, Tuple
 import re
-from openai import AsyncOpenAI
+from ..llm_gateway import chat_completion
 import os
 from ...schemas.content import YouTubeMetadata
 from ...core.exceptions import ContentProcessingError
-from ...core.cache import get_cache_key, get_cached_data, set_cached_data
+from .pipeline import run_stage, SUMMARY
+from .summarization import summarize_long_text
+from .youtube_transcripts import get_transcript_index, language_key
 from ...core.config import settings
 from ..image_generation import generate_image_from_prompt
 import logging
-from ...utils.cost_calculator import CostCalculator
-from ...core.settings import settings
+from ...utils.prompt_builder import fit_prompt, truncate_to_tokens
+from ...utils.source_identity import youtube_video_id, youtube_source_id
 
 # Initialize logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Configure proxy settings for YouTube transcript API
-YOUTUBE_PROXIES = {"https": settings.SMARTPROXY_URL}
-
 def extract_video_id(url: str) -> Optional[str]:
     """Extract YouTube video ID from URL."""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu.be\/)([^&\n?#]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    return youtube_video_id(url)
 
 def create_twitter_prompt(
     transcript: str,
@@ -95,23 +83,26 @@ Guidelines based on content type:
 
     return prompt
 
-async def fetch_transcript_and_summary(video_id: str) -> Dict[str, str]:
+async def fetch_transcript_and_summary(
+    video_id: str,
+    languages: Sequence[str] = settings.YOUTUBE_TRANSCRIPT_LANGUAGES
+) -> Dict[str, str]:
     """Fetch video transcript and generate summary."""
     try:
-        # Get transcript from YouTube
-        transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-        full_transcript = " ".join([entry["text"] for entry in transcript_list])
-        
-        # Generate summary using OpenAI
-        summary_response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that creates concise summaries."},
-                {"role": "user", "content": f"Please summarize this video transcript:\n\n{full_transcript}"}
-            ]
-        )
-        
-        summary = summary_response.choices[0].message.content
+        async def summarize() -> str:
+            # Multi-hour transcripts are summarized chunk by chunk, then reduced
+            summary = await summarize_long_text(
+                full_transcript,
+                "transcript",
+                "Please summarize this video transcript:\n\n{content}",
+                "You are a helpful assistant that creates concise summaries."
+            )
+            return summary
+
+        # Segments and summary are cached as separate stages, both keyed by canonical video id and language
+        transcript = await get_transcript_index(video_id, languages)
+        full_transcript = transcript.text
+        summary = await run_stage(SUMMARY, f"{youtube_source_id(video_id)}:{language_key(languages)}", summarize)
         
         return {
             "video_title": "Video Title",  # You can get this from YouTube API if needed
@@ -122,7 +113,7 @@ async def fetch_transcript_and_summary(video_id: str) -> Dict[str, str]:
         logger.error(f"Error in fetch_transcript_and_summary: {str(e)}")
         raise ContentProcessingError(f"Failed to process video: {str(e)}")
 
-async def generate_summary(transcript: str) -> Tuple[str, Dict]:
+async def generate_summary(transcript: str) -> str:
     """Generate a summary of the YouTube video transcript"""
     try:
         # Format the prompt for summary generation
@@ -137,7 +128,7 @@ async def generate_summary(transcript: str) -> Tuple[str, Dict]:
         """
 
         # Generate summary using OpenAI
-        summary_response = await client.chat.completions.create(
+        summary_response = await chat_completion(
             model=settings.OPENAI_MODEL,
             messages=[
                 {
@@ -149,12 +140,7 @@ async def generate_summary(transcript: str) -> Tuple[str, Dict]:
             temperature=0.7,
             max_tokens=1000
         )
-        summary = summary_response.choices[0].message.content.strip()
-        
-        # Calculate token costs with completion object for accuracy
-        gpt_costs = CostCalculator.calculate_gpt_cost(prompt, summary, completion=summary_response)
-        
-        return summary, gpt_costs
+        return summary_response.choices[0].message.content.strip()
     except Exception as e:
         raise ContentProcessingError(f"Error generating summary: {str(e)}")
 
@@ -165,7 +151,7 @@ async def process_youtube_url(
     additional_context: Optional[str] = None,
     generate_image: bool = False,
     is_premium: bool = False
-) -> Tuple[List[Dict], Dict]:
+) -> List[Dict]:
     """Process YouTube URL and generate Twitter content"""
     try:
         # Extract video ID from URL
@@ -176,10 +162,9 @@ async def process_youtube_url(
         # Get transcript and summary
         data = await fetch_transcript_and_summary(video_id)
         summary = data["video_summary"]
-        summary_costs = data["gpt_costs"]
         
         # Generate tweets
-        tweets, tweet_costs = await process_text_to_twitter(
+        return await process_text_to_twitter(
             text=summary,
             content_type=content_type,
             num_tweets=num_tweets,
@@ -187,37 +172,31 @@ async def process_youtube_url(
             generate_image=generate_image,
             is_premium=is_premium
         )
-        
-        # Combine costs from summary and tweet generation
-        total_costs = {}
-        for key in ["input_tokens", "output_tokens", "input_cost", "output_cost", "total_cost"]:
-            total_costs[key] = summary_costs.get(key, 0) + tweet_costs.get(key, 0)
-        
-        return tweets, total_costs
     
     except Exception as e:
         logger.error(f"Error processing YouTube URL: {str(e)}")
         raise ContentProcessingError(f"Error processing YouTube URL: {str(e)}")
 
-async def generate_twitter_content(
+def build_youtube_twitter_messages(
     transcript: str,
     summary: str,
     content_type: str,
     num_tweets: int,
     additional_context: Optional[str] = None,
     is_premium: bool = False
-) -> List[str]:
-    """Generate Twitter content from video transcript."""
-    try:
-        # Use higher max_tokens for premium long content
-        max_tokens = 7000 if is_premium and content_type == "long" else 1000
+) -> Tuple[List[Dict[str, str]], int, float]:
+    """Build the chat messages, max_tokens and temperature for a video-to-X generation"""
+    # Use higher max_tokens for premium long content
+    max_tokens = 7000 if is_premium and content_type == "long" else 1000
+    system_prompt = "You are an expert at creating engaging Twitter content."
 
-        if content_type == "long" and is_premium:
-            # For premium long posts, create original content inspired by the video
-            prompt = f"""Using the ideas and concepts from this video content as inspiration, create {num_tweets} engaging, comprehensive, and conversational {'piece' if num_tweets == 1 else 'pieces'}. Don't describe or reference the video itself - instead, create original content that explores the topics, concepts, and ideas presented.
+    if content_type == "long" and is_premium:
+        # For premium long posts, create original content inspired by the video
+        def render(content: str) -> str:
+            return f"""Using the ideas and concepts from this video content as inspiration, create {num_tweets} engaging, comprehensive, and conversational {'piece' if num_tweets == 1 else 'pieces'}. Don't describe or reference the video itself - instead, create original content that explores the topics, concepts, and ideas presented.
 
 The content should be your own original take on these topics:
-{summary}
+{content}
 
 Title Guidelines:
 - Each title MUST follow this EXACT format: "Title Text Here"
@@ -253,63 +232,20 @@ Additional Context:
 
 Please generate {num_tweets} separate {'piece' if num_tweets == 1 else 'pieces'}, each exploring different aspects of these topics. Start each piece with the title format specified above, then separate pieces with [NEW_CONTENT] marker."""
 
-            response = await client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at creating engaging, conversational long-form content that feels natural and flowing, while being informative and valuable."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=max_tokens
-            )
+        content = summary
+        system_prompt = "You are an expert at creating engaging, conversational long-form content that feels natural and flowing, while being informative and valuable."
 
-            # Get the content and clean it up
-            content = response.choices[0].message.content.strip()
-            
-            # Split content into separate pieces
-            pieces = content.split('[NEW_CONTENT]')
-            
-            # Clean and process each piece
-            processed_pieces = []
-            for piece in pieces:
-                if piece.strip():
-                    # Clean up the piece
-                    cleaned_piece = piece.strip()
-                    # Remove any "Analysis:" or similar prefixes
-                    cleaned_piece = re.sub(r'^(Analysis|Section|Part)\s*\d*:?\s*', '', cleaned_piece, flags=re.MULTILINE)
-                    
-                    # Ensure minimum length
-                    if len(cleaned_piece) >= 1000:
-                        # Enforce maximum length while keeping content coherent
-                        if len(cleaned_piece) > 25000:
-                            cleaned_piece = cleaned_piece[:25000]
-                            # Try to find a proper sentence ending to cut at
-                            last_period = cleaned_piece.rfind('.')
-                            if last_period > 1000:  # Only cut at period if we still have >1000 chars
-                                cleaned_piece = cleaned_piece[:last_period + 1]
-                        processed_pieces.append(cleaned_piece)
-            
-            # Ensure we have the requested number of pieces
-            if len(processed_pieces) < num_tweets:
-                logger.warning(f"Generated only {len(processed_pieces)} pieces, regenerating...")
-                return await generate_twitter_content(transcript, summary, content_type, num_tweets, additional_context, is_premium)
-            
-            # If we have too many pieces, take only the requested number
-            processed_pieces = processed_pieces[:num_tweets]
-            
-            return processed_pieces
+    elif content_type == "short":
+        excerpt = truncate_to_tokens(transcript, settings.PROMPT_EXCERPT_TOKENS)
 
-        elif content_type == "short":
-            prompt = f"""Generate {num_tweets} impactful and informative tweets from this video content. Each tweet should be a complete, standalone insight.
+        def render(content: str) -> str:
+            return f"""Generate {num_tweets} impactful and informative tweets from this video content. Each tweet should be a complete, standalone insight.
 
 Summary of the Content:
-{summary}
+{content}
 
 Key Points from Transcript:
-{transcript[:1500]}...
+{excerpt}...
 
 Requirements for Each Tweet:
 1. Length and Format:
@@ -338,15 +274,18 @@ Additional Context to Consider:
 {additional_context if additional_context else 'Focus on the most impactful insights from the content.'}
 
 Generate {num_tweets} unique, high-quality tweets, each focusing on a different aspect of the content."""
+        content = summary
 
-        else:
-            # For threads and other types
-            is_thread = content_type == "thread"
-            prompt = f"""Based on this video content, generate {num_tweets} {'tweet' if num_tweets == 1 else 'tweets'}.
+    else:
+        # For threads and other types
+        is_thread = content_type == "thread"
+
+        def render(content: str) -> str:
+            return f"""Based on this video content, generate {num_tweets} {'tweet' if num_tweets == 1 else 'tweets'}.
 
 Summary: {summary}
 
-Full Transcript: {transcript}
+Full Transcript: {content}
 
 Content Type: {content_type}
 Number of Tweets: {num_tweets}
@@ -375,22 +314,76 @@ Guidelines:
 - Use distinct emoji sets for each tweet'''}
 
 Generate the tweets:"""
+        content = transcript
 
-        # Generate content for non-premium long posts
-        if not (content_type == "long" and is_premium):
-            response = await client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at creating engaging Twitter content."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=max_tokens
-            )
+    # Whatever the branch, the variable part of the prompt is trimmed to the token budget
+    prompt = fit_prompt(render, content, system_prompt, max_tokens)
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, max_tokens, 0.7
+
+async def generate_twitter_content(
+    transcript: str,
+    summary: str,
+    content_type: str,
+    num_tweets: int,
+    additional_context: Optional[str] = None,
+    is_premium: bool = False
+) -> List[str]:
+    """Generate Twitter content from video transcript."""
+    try:
+        messages, max_tokens, temperature = await asyncio.to_thread(
+            build_youtube_twitter_messages,
+            transcript, summary, content_type, num_tweets, additional_context, is_premium
+        )
+        response = await chat_completion(
+            model=settings.OPENAI_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
 
+        if content_type == "long" and is_premium:
+            # Get the content and clean it up
+            content = response.choices[0].message.content.strip()
+            
+            # Split content into separate pieces
+            pieces = content.split('[NEW_CONTENT]')
+            
+            # Clean and process each piece
+            processed_pieces = []
+            for piece in pieces:
+                if piece.strip():
+                    # Clean up the piece
+                    cleaned_piece = piece.strip()
+                    # Remove any "Analysis:" or similar prefixes
+                    cleaned_piece = re.sub(r'^(Analysis|Section|Part)\s*\d*:?\s*', '', cleaned_piece, flags=re.MULTILINE)
+                    
+                    # Ensure minimum length
+                    if len(cleaned_piece) >= 1000:
+                        # Enforce maximum length while keeping content coherent
+                        if len(cleaned_piece) > 25000:
+                            cleaned_piece = cleaned_piece[:25000]
+                            # Try to find a proper sentence ending to cut at
+                            last_period = cleaned_piece.rfind('.')
+                            if last_period > 1000:  # Only cut at period if we still have >1000 chars
+                                cleaned_piece = cleaned_piece[:last_period + 1]
+                        processed_pieces.append(cleaned_piece)
+            
+            # Ensure we have the requested number of pieces
+            if len(processed_pieces) < num_tweets:
+                logger.warning(f"Generated only {len(processed_pieces)} pieces, regenerating...")
+                return await generate_twitter_content(transcript, summary, content_type, num_tweets, additional_context, is_premium)
+            
+            # If we have too many pieces, take only the requested number
+            processed_pieces = processed_pieces[:num_tweets]
+            
+            return processed_pieces
+
+        else:
             content = response.choices[0].message.content.strip()
             
             # Split content into tweets
@@ -421,13 +414,13 @@ async def process_text_to_twitter(
     additional_context: Optional[str],
     generate_image: bool,
     is_premium: bool
-) -> Tuple[List[Dict], Dict]:
+) -> List[Dict]:
     """Process text to Twitter content"""
     try:
         # Generate Twitter content
         tweets_content = await generate_twitter_content(
             transcript=text,
-            summary=text[:1000],  # Use first 1000 chars as summary
+            summary=await asyncio.to_thread(truncate_to_tokens, text, settings.PROMPT_EXCERPT_TOKENS),
             content_type=content_type,
             num_tweets=num_tweets,
             additional_context=additional_context,
@@ -458,7 +451,7 @@ async def process_text_to_twitter(
             
             tweets_list.append(tweet_content)
         
-        return tweets_list, {"total_cost": 0.001}  # Add proper cost calculation
+        return tweets_list
 
     except Exception as e:
         logger.error(f"Error in process_text_to_twitter: {str(e)}")
@@ -470,21 +463,16 @@ async def generate_additional_tweets(
     remaining_tweets: int,
     previous_content: str,
     additional_context: Optional[str]
-) -> Tuple[str, Dict]:
+) -> str:
     """Generate additional tweets if needed"""
     try:
-        additional_response = await client.chat.completions.create(
+        additional_response = await chat_completion(
             model=settings.OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": "You are a social media expert who creates engaging Twitter content."},
                 {"role": "user", "content": f"Generate {remaining_tweets} more tweets in the same style, focusing on different aspects of the content that haven't been covered yet."}
             ]
         )
-        additional_tweets = additional_response.choices[0].message.content.strip()
-        
-        # Calculate token costs
-        gpt_costs = CostCalculator.calculate_gpt_cost(transcript, additional_tweets, completion=additional_response)
-        
-        return additional_tweets, gpt_costs
+        return additional_response.choices[0].message.content.strip()
     except Exception as e:
         raise ContentProcessingError(f"Error generating additional tweets: {str(e)}")
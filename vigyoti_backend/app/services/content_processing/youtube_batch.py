@@ -0,0 +1,202 @@
+"""
+Batch ingestion of YouTube playlists, channels and URL lists.
+
+A playlist or channel is resolved to video ids through the YouTube Data API,
+then every video goes through the same cached transcript -> summary ->
+generation stages as a single-video request, a bounded number at a time.
+Results are yielded in completion order, and a failing video is reported on
+its own without affecting the rest of the batch.
+"""
+import asyncio
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+import httpx
+from ...core.config import settings
+from ...core.exceptions import ContentProcessingError
+from .pipeline import run_stage, generation_stage_id, GENERATE
+from .streaming import build_post
+from .youtube import extract_video_id, fetch_transcript_and_summary, generate_twitter_content
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3"
+PAGE_SIZE = 50  # the Data API's maximum
+UNAVAILABLE_TITLES = {"Private video", "Deleted video"}
+
+PLAYLIST_ID_PATTERN = re.compile(r"^[\w-]{10,}$")
+CHANNEL_ID_PATTERN = re.compile(r"(?:youtube\.com/channel/)?(UC[\w-]{22})")
+CHANNEL_HANDLE_PATTERN = re.compile(r"(?:youtube\.com/)?(@[\w.-]+)")
+
+# One pooled client for Data API calls in this process
+http_client = httpx.AsyncClient(timeout=httpx.Timeout(settings.YOUTUBE_API_TIMEOUT))
+
+def parse_playlist_id(reference: str) -> Optional[str]:
+    """Playlist id from a playlist URL (or watch URL with a list) or a bare id"""
+    match = re.search(r"[?&]list=([\w-]+)", reference)
+    if match:
+        return match.group(1)
+    reference = reference.strip()
+    return reference if PLAYLIST_ID_PATTERN.match(reference) else None
+
+async def _api_get(resource: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    if not settings.YOUTUBE_API_KEY:
+        raise ContentProcessingError("YOUTUBE_API_KEY is required to read playlists and channels")
+    try:
+        response = await http_client.get(
+            f"{YOUTUBE_API_URL}/{resource}",
+            params={**params, "key": settings.YOUTUBE_API_KEY}
+        )
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise ContentProcessingError(f"YouTube API {resource} request failed: {e.response.status_code}")
+    except httpx.HTTPError as e:
+        raise ContentProcessingError(f"YouTube API {resource} request failed: {str(e)}")
+    return response.json()
+
+async def resolve_uploads_playlist(channel: str) -> str:
+    """Uploads playlist id of a channel given by URL, channel id or @handle"""
+    channel = channel.strip()
+    match = CHANNEL_ID_PATTERN.search(channel)
+    if match:
+        # A channel's uploads playlist id is its channel id with the UC prefix swapped for UU
+        return "UU" + match.group(1)[2:]
+    match = CHANNEL_HANDLE_PATTERN.search(channel)
+    if not match:
+        raise ContentProcessingError(f"Invalid YouTube channel: {channel}")
+    data = await _api_get("channels", {"part": "contentDetails", "forHandle": match.group(1)})
+    items = data.get("items") or []
+    if not items:
+        raise ContentProcessingError(f"YouTube channel not found: {channel}")
+    return items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+
+async def list_playlist_videos(playlist_id: str, max_videos: int) -> List[Dict[str, str]]:
+    """The first max_videos available videos of a playlist as {video_id, video_title}"""
+    videos: List[Dict[str, str]] = []
+    page_token = None
+    while len(videos) < max_videos:
+        params = {"part": "snippet", "playlistId": playlist_id, "maxResults": PAGE_SIZE}
+        if page_token:
+            params["pageToken"] = page_token
+        data = await _api_get("playlistItems", params)
+        for item in data.get("items", []):
+            snippet = item["snippet"]
+            if snippet.get("title") in UNAVAILABLE_TITLES:
+                continue
+            videos.append({"video_id": snippet["resourceId"]["videoId"], "video_title": snippet.get("title", "")})
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break
+    return videos[:max_videos]
+
+async def resolve_batch_videos(
+    playlist: Optional[str] = None,
+    channel: Optional[str] = None,
+    urls: Optional[List[str]] = None,
+    max_videos: int = 10
+) -> List[Dict[str, str]]:
+    """Turn exactly one of a playlist, a channel or a list of video URLs into distinct videos"""
+    if sum(bool(source) for source in (playlist, channel, urls)) != 1:
+        raise ContentProcessingError("Provide exactly one of playlist, channel or urls")
+    max_videos = min(max_videos, settings.YOUTUBE_BATCH_MAX_VIDEOS)
+
+    if playlist:
+        playlist_id = parse_playlist_id(playlist)
+        if not playlist_id:
+            raise ContentProcessingError(f"Invalid YouTube playlist: {playlist}")
+        videos = await list_playlist_videos(playlist_id, max_videos)
+    elif channel:
+        videos = await list_playlist_videos(await resolve_uploads_playlist(channel), max_videos)
+    else:
+        videos = []
+        for url in urls:
+            video_id = extract_video_id(url)
+            if not video_id:
+                raise ContentProcessingError(f"Invalid YouTube URL: {url}")
+            videos.append({"video_id": video_id, "video_title": ""})
+
+    # The same video twice in one batch would only repeat cached work
+    seen = set()
+    distinct = []
+    for video in videos:
+        if video["video_id"] not in seen:
+            seen.add(video["video_id"])
+            distinct.append(video)
+    if not distinct:
+        raise ContentProcessingError("No available videos found")
+    return distinct[:max_videos]
+
+async def process_batch_video(
+    video: Dict[str, str],
+    content_type: str,
+    num_tweets: int,
+    additional_context: Optional[str] = None,
+    is_premium: bool = False
+) -> Dict[str, Any]:
+    """Summarize one video and generate its posts through the cached pipeline stages"""
+    video_id = video["video_id"]
+    data = await fetch_transcript_and_summary(video_id)
+    summary, transcript = data["video_summary"], data["full_transcript"]
+    tweets = await run_stage(
+        GENERATE,
+        generation_stage_id(
+            "youtube",
+            f"{summary}\n{transcript}",
+            content_type=content_type,
+            num_tweets=num_tweets,
+            additional_context=additional_context,
+            is_premium=is_premium
+        ),
+        lambda: generate_twitter_content(
+            transcript=transcript,
+            summary=summary,
+            content_type=content_type,
+            num_tweets=num_tweets,
+            additional_context=additional_context,
+            is_premium=is_premium
+        )
+    )
+    is_premium_long = is_premium and content_type == "long"
+    return {
+        "video_id": video_id,
+        "video_title": video["video_title"] or data["video_title"],
+        "video_summary": summary,
+        "generated_tweets": [
+            build_post(text, position, num_tweets, is_premium_long)
+            for position, text in enumerate(tweets, start=1)
+        ]
+    }
+
+async def process_youtube_batch(
+    videos: List[Dict[str, str]],
+    content_type: str,
+    num_tweets: int,
+    additional_context: Optional[str] = None,
+    is_premium: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """Process videos concurrently, yielding each result as it completes.
+
+    Failed videos are yielded as {video_id, error}. Work still running is
+    cancelled if the consumer stops early.
+    """
+    semaphore = asyncio.Semaphore(settings.YOUTUBE_BATCH_CONCURRENCY)
+
+    async def run(video: Dict[str, str]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await process_batch_video(video, content_type, num_tweets, additional_context, is_premium)
+            except Exception as e:
+                logger.error(f"Batch video {video['video_id']} failed: {str(e)}")
+                return {"video_id": video["video_id"], "error": str(e)}
+
+    tasks = [asyncio.create_task(run(video)) for video in videos]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def close_youtube_api_client() -> None:
+    """Close the pooled Data API client; call on application shutdown"""
+    await http_client.aclose()
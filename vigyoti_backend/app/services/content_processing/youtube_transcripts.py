@@ -0,0 +1,87 @@
+"""
+Async access to YouTube transcripts.
+
+youtube-transcript-api is synchronous and goes through the paid proxy, so
+fetches run in a small dedicated thread pool and the transcripts are cached,
+as serialized TranscriptIndex blobs, by video id and language. A popular video
+is fetched once; every later request is served from the cache.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Deque, Dict, List, Sequence
+from youtube_transcript_api import YouTubeTranscriptApi
+from ...core.config import settings
+from ...utils.source_identity import youtube_source_id
+from ...utils.transcript_index import TranscriptIndex
+from .pipeline import run_stage, EXTRACT
+
+logger = logging.getLogger(__name__)
+
+RECENT_FETCHES = 100  # latencies kept for metrics
+
+# Bounded so a burst of new videos can't open unlimited proxy connections
+_executor = ThreadPoolExecutor(
+    max_workers=settings.YOUTUBE_TRANSCRIPT_WORKERS,
+    thread_name_prefix="youtube-transcript"
+)
+
+_metrics: Dict[str, int] = {"requests": 0, "fetches": 0, "failures": 0}
+_latencies: Deque[float] = deque(maxlen=RECENT_FETCHES)
+
+def language_key(languages: Sequence[str]) -> str:
+    """Cache identifier for a language preference list"""
+    return ",".join(languages)
+
+def _fetch_segments(video_id: str, languages: Sequence[str]) -> List[Dict[str, Any]]:
+    return YouTubeTranscriptApi.get_transcript(
+        video_id,
+        languages=list(languages),
+        proxies=settings.SMARTPROXY_PROXIES or None
+    )
+
+async def get_transcript_index(
+    video_id: str,
+    languages: Sequence[str] = settings.YOUTUBE_TRANSCRIPT_LANGUAGES
+) -> TranscriptIndex:
+    """Return the timestamped transcript, fetching it only on a cache miss"""
+    _metrics["requests"] += 1
+
+    async def fetch() -> str:
+        _metrics["fetches"] += 1
+        started = time.perf_counter()
+        try:
+            segments = await asyncio.get_running_loop().run_in_executor(
+                _executor, partial(_fetch_segments, video_id, languages)
+            )
+        except Exception:
+            _metrics["failures"] += 1
+            raise
+        finally:
+            _latencies.append(time.perf_counter() - started)
+        logger.info(f"Fetched transcript for {video_id}: {len(segments)} segments in {_latencies[-1]:.2f}s")
+        return TranscriptIndex.from_segments(segments).to_base64()
+
+    encoded = await run_stage(EXTRACT, f"{youtube_source_id(video_id)}:{language_key(languages)}", fetch)
+    return TranscriptIndex.from_base64(encoded)
+
+def get_transcript_metrics() -> Dict[str, Any]:
+    """Cache hit/miss counts and fetch latency for this process"""
+    requests, fetches = _metrics["requests"], _metrics["fetches"]
+    latencies = sorted(_latencies)
+    return {
+        **_metrics,
+        "cache_hits": requests - fetches,
+        "cache_misses": fetches,
+        "hit_rate": (requests - fetches) / requests if requests else None,
+        "fetch_latency_avg": sum(latencies) / len(latencies) if latencies else None,
+        "fetch_latency_p95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        "fetch_latency_max": latencies[-1] if latencies else None,
+    }
+
+def close_transcript_executor() -> None:
+    """Stop the transcript fetch threads; call on application shutdown"""
+    _executor.shutdown(wait=False, cancel_futures=True)
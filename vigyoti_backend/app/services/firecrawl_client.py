@@ -0,0 +1,94 @@
+"""
+Async FireCrawl scraping over a pooled HTTP client.
+
+Scrapes call FireCrawl's REST API directly so they never block the event
+loop. A process-wide semaphore caps concurrent scrapes, every attempt has a
+timeout and the whole call a deadline, and transient failures are retried
+with jittered exponential backoff. FIRECRAWL_API_URL can point at a local
+stub server.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Sequence
+import httpx
+from ..core.config import settings
+from ..core.exceptions import ContentProcessingError, InvalidCredentialsError
+from ..core.usage import record_firecrawl
+
+logger = logging.getLogger(__name__)
+
+# One pooled client shared by every scrape in this process
+http_client = httpx.AsyncClient(
+    base_url=settings.FIRECRAWL_API_URL,
+    limits=httpx.Limits(max_connections=settings.FIRECRAWL_MAX_CONNECTIONS),
+    timeout=httpx.Timeout(settings.FIRECRAWL_REQUEST_TIMEOUT)
+)
+
+_semaphore = asyncio.Semaphore(settings.FIRECRAWL_CONCURRENCY)
+
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code in (408, 429) or code >= 500
+    return isinstance(error, httpx.TransportError)
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Full-jitter backoff, or the server's Retry-After when it sends one"""
+    if isinstance(error, httpx.HTTPStatusError):
+        retry_after = error.response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), RETRY_MAX_SECONDS)
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+async def _post_scrape(url: str, formats: Sequence[str]) -> Dict[str, Any]:
+    for attempt in range(settings.FIRECRAWL_MAX_RETRIES + 1):
+        try:
+            response = await http_client.post(
+                "/v1/scrape",
+                json={"url": url, "formats": list(formats)},
+                headers={"Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}"}
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            if attempt == settings.FIRECRAWL_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _retry_delay(attempt, e)
+            logger.warning(f"Retrying FireCrawl scrape in {delay:.1f}s: {type(e).__name__}")
+            await asyncio.sleep(delay)
+
+async def scrape_url(url: str, formats: Sequence[str] = ("markdown",)) -> Dict[str, Any]:
+    """Scrape a page and return FireCrawl's data object (formats plus metadata)"""
+    # Checked here rather than at import so the module loads without credentials
+    if not settings.FIRECRAWL_API_KEY:
+        raise InvalidCredentialsError("FIRECRAWL_API_KEY environment variable is not set")
+    started = time.perf_counter()
+    try:
+        async with _semaphore:
+            result = await asyncio.wait_for(_post_scrape(url, formats), settings.FIRECRAWL_DEADLINE)
+    except asyncio.TimeoutError:
+        raise ContentProcessingError(f"FireCrawl scrape timed out after {settings.FIRECRAWL_DEADLINE:.0f}s")
+    except httpx.HTTPStatusError as e:
+        raise ContentProcessingError(f"FireCrawl scrape failed: HTTP {e.response.status_code}")
+    except httpx.HTTPError as e:
+        raise ContentProcessingError(f"FireCrawl scrape failed: {type(e).__name__}")
+
+    if not result.get("success") or not result.get("data"):
+        raise ContentProcessingError(f"FireCrawl scrape failed: {result.get('error', 'empty response')}")
+    data = result["data"]
+    # FireCrawl bills one credit per scraped page
+    record_firecrawl(1)
+    logger.info(
+        f"FireCrawl scrape: {sum(len(data.get(name) or '') for name in formats)} chars "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return data
+
+async def close_firecrawl_client() -> None:
+    """Close the pooled HTTP client; call on application shutdown"""
+    await http_client.aclose()
@@ -2,8 +2,9 @@ import os
 import replicate
 import logging
 from typing import Optional, Dict, Literal
-from openai import OpenAI
+from .llm_gateway import chat_completion
 from ..core.exceptions import ContentProcessingError, InvalidCredentialsError
+from ..core.usage import record_images
 from ..core.settings import settings
 from dotenv import load_dotenv
 
@@ -17,9 +18,6 @@ logger = logging.getLogger(__name__)
 # Set Replicate API token
 os.environ["REPLICATE_API_TOKEN"] = settings.REPLICATE_API_TOKEN
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
 async def generate_image_prompt(summary: str, tweet_text: str) -> str:
     """Generate an appropriate image prompt using GPT-4o-mini."""
     try:
@@ -40,7 +38,7 @@ async def generate_image_prompt(summary: str, tweet_text: str) -> str:
 
         Generate an image prompt:"""
 
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model=settings.OPENAI_MODEL,
             messages=[
                 {
@@ -108,6 +106,7 @@ async def generate_image_from_prompt(
         
         if not image_url:
             raise ContentProcessingError("No image URL generated")
+        record_images(1)
 
         # Return the URL string and the prompt used
         return {
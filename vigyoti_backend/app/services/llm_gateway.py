@@ -0,0 +1,117 @@
+"""
+Shared async gateway for all OpenAI calls.
+
+Every service goes through the single pooled AsyncOpenAI client defined here so
+that connection reuse, timeouts and retry/backoff behave the same everywhere
+and no LLM call blocks the event loop.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+import httpx
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from ..core.config import settings
+from ..core.rate_limiter import rate_limiter, estimate_prompt_tokens
+from ..core.usage import record_completion, record_whisper
+
+logger = logging.getLogger(__name__)
+
+# One pooled HTTP client shared by every OpenAI request in this process
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+    ),
+    timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+)
+
+# The SDK retries connection errors, 408/409/429 and 5xx with exponential backoff and jitter
+client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    http_client=http_client,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    timeout=settings.OPENAI_TIMEOUT
+)
+
+async def chat_completion(
+    messages: List[Dict[str, Any]],
+    model: Optional[str] = None,
+    **kwargs: Any
+) -> ChatCompletion:
+    """Create a chat completion through the shared client, within the RPM/TPM budget"""
+    model = model or settings.OPENAI_MODEL
+
+    # Reserve the prompt plus the maximum possible output before sending
+    prompt_tokens = await asyncio.to_thread(estimate_prompt_tokens, messages, model)
+    reserved = await rate_limiter.acquire(
+        model, prompt_tokens + (kwargs.get("max_tokens") or settings.OPENAI_DEFAULT_OUTPUT_RESERVE)
+    )
+
+    try:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **kwargs
+        )
+    except BaseException:
+        # Failed or cancelled calls give their whole reservation back
+        await rate_limiter.refund(model, reserved)
+        raise
+
+    if response.usage:
+        record_completion(response.usage)
+        await rate_limiter.refund(model, reserved - response.usage.total_tokens)
+    return response
+
+async def stream_chat_completion(
+    messages: List[Dict[str, Any]],
+    model: Optional[str] = None,
+    **kwargs: Any
+) -> AsyncIterator[ChatCompletionChunk]:
+    """Stream a chat completion; the final chunk carries the usage for the whole call"""
+    model = model or settings.OPENAI_MODEL
+
+    prompt_tokens = await asyncio.to_thread(estimate_prompt_tokens, messages, model)
+    reserved = await rate_limiter.acquire(
+        model, prompt_tokens + (kwargs.get("max_tokens") or settings.OPENAI_DEFAULT_OUTPUT_RESERVE)
+    )
+
+    try:
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+    except BaseException:
+        await rate_limiter.refund(model, reserved)
+        raise
+
+    total_tokens = None
+    try:
+        async for chunk in stream:
+            if chunk.usage:
+                record_completion(chunk.usage)
+                total_tokens = chunk.usage.total_tokens
+            yield chunk
+    finally:
+        await stream.close()
+        # A stream that broke off before its usage chunk still had its prompt processed
+        used = total_tokens if total_tokens is not None else prompt_tokens
+        await rate_limiter.refund(model, reserved - used)
+
+async def create_transcription(file: Any, model: str = "whisper-1", **kwargs: Any) -> Any:
+    """Transcribe audio through the shared client"""
+    response = await client.audio.transcriptions.create(file=file, model=model, **kwargs)
+    # Only the verbose_json format reports the billed duration
+    duration = getattr(response, "duration", None)
+    if duration:
+        record_whisper(float(duration))
+    return response
+
+async def close_llm_client() -> None:
+    """Close the shared client and its pooled connections"""
+    await client.close()
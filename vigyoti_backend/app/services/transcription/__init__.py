@@ -0,0 +1,22 @@
+from .chunked import transcribe_audio_file, transcribe_segments, whisper_transcribe
+from .hls import transcribe_hls, close_hls_client
+from .local_engine import get_local_engine, get_local_engine_stats, close_local_engine
+from .backends import TranscriptionBackend, get_transcription_backend
+from .speech import TimedTranscript, transcribe_speech
+from .stitching import stitch_transcripts
+
+__all__ = [
+    'transcribe_audio_file',
+    'transcribe_segments',
+    'whisper_transcribe',
+    'transcribe_hls',
+    'close_hls_client',
+    'get_local_engine',
+    'get_local_engine_stats',
+    'close_local_engine',
+    'TranscriptionBackend',
+    'get_transcription_backend',
+    'TimedTranscript',
+    'transcribe_speech',
+    'stitch_transcripts'
+]
@@ -0,0 +1,65 @@
+"""
+Interchangeable speech-to-text backends.
+
+TRANSCRIPTION_BACKEND selects which one every transcription path uses:
+
+- openai: the Whisper API, with long files split into parallel segments
+- whisper: the reference whisper package in local model processes
+- faster-whisper: int8-quantized, batched CTranslate2 inference on CPU
+"""
+from typing import Dict, List, Optional
+from ...core.config import settings
+from ...core.exceptions import ContentProcessingError
+from ...utils.hashing import hash_file
+from .chunked import transcribe_audio_file, whisper_transcribe_timed
+from .local_engine import get_local_engine, WHISPER, FASTER_WHISPER
+
+class TranscriptionBackend:
+    """Turns an audio file into text"""
+    name: str
+
+    async def transcribe(self, path: str, source_hash: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+    async def transcribe_timed(self, path: str) -> List[Dict]:
+        """Transcribe a file short enough for one pass into {start, end, text} segments"""
+        raise NotImplementedError
+
+class OpenAITranscriptionBackend(TranscriptionBackend):
+    name = "openai"
+
+    async def transcribe(self, path: str, source_hash: Optional[str] = None) -> str:
+        # The hash identifies the file's segments in the cache
+        return await transcribe_audio_file(path, source_hash or hash_file(path))
+
+    async def transcribe_timed(self, path: str) -> List[Dict]:
+        return await whisper_transcribe_timed(path)
+
+class LocalTranscriptionBackend(TranscriptionBackend):
+    def __init__(self, kind: str):
+        self.name = kind
+
+    async def transcribe(self, path: str, source_hash: Optional[str] = None) -> str:
+        result = await get_local_engine(self.name).transcribe(path)
+        return result["text"].strip()
+
+    async def transcribe_timed(self, path: str) -> List[Dict]:
+        result = await get_local_engine(self.name).transcribe(path)
+        return [
+            {"start": segment["start"], "end": segment["end"], "text": segment["text"]}
+            for segment in result["segments"]
+        ]
+
+_backends: Dict[str, TranscriptionBackend] = {}
+
+def get_transcription_backend(name: Optional[str] = None) -> TranscriptionBackend:
+    """The configured backend, or the one named"""
+    name = name or settings.TRANSCRIPTION_BACKEND
+    if name not in _backends:
+        if name == OpenAITranscriptionBackend.name:
+            _backends[name] = OpenAITranscriptionBackend()
+        elif name in (WHISPER, FASTER_WHISPER):
+            _backends[name] = LocalTranscriptionBackend(name)
+        else:
+            raise ContentProcessingError(f"Unknown transcription backend: {name}")
+    return _backends[name]
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+import tempfile
+from typing import Dict, List, Tuple
+from ..llm_gateway import create_transcription
+from ..content_processing.pipeline import run_stage, EXTRACT
+from ...core.config import settings
+from .segmenter import probe_duration, plan_segments, extract_segment, SEGMENT_FORMAT
+from .stitching import stitch_transcripts
+
+logger = logging.getLogger(__name__)
+
+async def whisper_transcribe(path: str) -> str:
+    """Transcribe one file within Whisper's limits in a single request"""
+    with open(path, "rb") as audio_file:
+        # verbose_json reports the billed duration alongside the text
+        transcript = await create_transcription(
+            file=audio_file,
+            model="whisper-1",
+            response_format="verbose_json"
+        )
+    return transcript.text
+
+async def whisper_transcribe_timed(path: str) -> List[Dict]:
+    """Transcribe one file in a single request, keeping Whisper's segment timestamps"""
+    with open(path, "rb") as audio_file:
+        transcript = await create_transcription(
+            file=audio_file,
+            model="whisper-1",
+            response_format="verbose_json"
+        )
+    return [
+        {"start": segment.start, "end": segment.end, "text": segment.text}
+        for segment in transcript.segments or []
+    ]
+
+async def transcribe_segments(
+    path: str,
+    source_hash: str,
+    segments: List[Tuple[float, float]]
+) -> List[str]:
+    """Cut and transcribe segments concurrently, returning their transcripts in order"""
+    semaphore = asyncio.Semaphore(settings.WHISPER_CONCURRENCY)
+
+    with tempfile.TemporaryDirectory(prefix="whisper-") as work_dir:
+        async def transcribe_segment(index: int, start: float, length: float) -> str:
+            async def compute() -> str:
+                # Segments are cut lazily so at most WHISPER_CONCURRENCY exist on disk at once
+                segment_path = os.path.join(work_dir, f"{index}.{SEGMENT_FORMAT}")
+                await extract_segment(path, start, length, segment_path)
+                try:
+                    return await whisper_transcribe(segment_path)
+                finally:
+                    os.unlink(segment_path)
+
+            async with semaphore:
+                # A segment is identified by the source's content hash and its time window
+                return await run_stage(
+                    EXTRACT,
+                    f"audio-segment:{source_hash}:{start:.3f}+{length:.3f}",
+                    compute
+                )
+
+        return await asyncio.gather(*(
+            transcribe_segment(index, start, length)
+            for index, (start, length) in enumerate(segments)
+        ))
+
+async def transcribe_audio_file(path: str, source_hash: str) -> str:
+    """Transcribe an audio file of any length with Whisper.
+
+    Files within Whisper's limits go up in one request; longer or larger ones
+    are split into overlapping segments that are transcribed in parallel and
+    stitched back together.
+    """
+    size = os.path.getsize(path)
+    try:
+        duration = await probe_duration(path)
+    except Exception as e:
+        if size > settings.WHISPER_MAX_UPLOAD_BYTES:
+            raise
+        # Without ffmpeg we can still send files Whisper accepts as they are
+        logger.warning(f"Could not probe audio duration, transcribing in one request: {str(e)}")
+        return await whisper_transcribe(path)
+
+    segment_seconds = settings.AUDIO_SEGMENT_SECONDS
+    if size <= settings.WHISPER_MAX_UPLOAD_BYTES and duration <= segment_seconds:
+        return await whisper_transcribe(path)
+
+    segments = plan_segments(duration, segment_seconds, settings.AUDIO_SEGMENT_OVERLAP_SECONDS)
+    logger.info(f"Transcribing {duration:.0f}s of audio in {len(segments)} segments")
+    texts = await transcribe_segments(path, source_hash, segments)
+    return stitch_transcripts(texts, settings.AUDIO_SEGMENT_OVERLAP_SECONDS)
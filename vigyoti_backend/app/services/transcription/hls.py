@@ -0,0 +1,181 @@
+"""
+Transcription of HLS (m3u8) streams.
+
+The playlist is split into windows of consecutive media segments. Windows are
+transcribed in parallel: each one downloads its segments concurrently, appends
+them to a window file in playlist order as they arrive, re-encodes the result
+for speech and sends it to the configured transcription backend. Window transcripts are cached by the
+hashes of their segment URIs, so re-processing a stream only fetches what
+hasn't been transcribed before.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+import aiofiles
+import httpx
+from ..content_processing.pipeline import run_stage, EXTRACT
+from ...core.config import settings
+from ...core.exceptions import ContentProcessingError
+from ...utils.hashing import hash_text
+from .backends import get_transcription_backend
+from .playlist import HlsPlaylist, HlsSegment, parse_playlist, select_media_playlist, plan_windows
+from .segmenter import convert_for_speech
+from .stitching import stitch_transcripts
+
+logger = logging.getLogger(__name__)
+
+# One pooled client for every playlist and segment request in this process
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=settings.HLS_MAX_CONNECTIONS),
+    timeout=httpx.Timeout(settings.HLS_REQUEST_TIMEOUT),
+    follow_redirects=True
+)
+
+RETRY_BACKOFF_SECONDS = 0.5
+MAX_PLAYLIST_DEPTH = 2  # master -> media
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code in (408, 429) or code >= 500
+    return isinstance(error, httpx.TransportError)
+
+async def _with_retries(description: str, attempt_fn):
+    for attempt in range(settings.HLS_SEGMENT_RETRIES + 1):
+        try:
+            return await attempt_fn()
+        except Exception as e:
+            if attempt == settings.HLS_SEGMENT_RETRIES or not _is_retryable(e):
+                raise ContentProcessingError(f"Failed to fetch {description}: {str(e)}")
+            delay = RETRY_BACKOFF_SECONDS * 2 ** attempt
+            logger.warning(f"Retrying {description} in {delay:.1f}s: {str(e)}")
+            await asyncio.sleep(delay)
+
+async def fetch_playlist(url: str) -> HlsPlaylist:
+    """Fetch a playlist, following a master playlist to its cheapest audio-carrying media playlist"""
+    for _ in range(MAX_PLAYLIST_DEPTH):
+        async def get() -> httpx.Response:
+            response = await http_client.get(url)
+            response.raise_for_status()
+            return response
+
+        response = await _with_retries(f"playlist {url}", get)
+        playlist = parse_playlist(response.text, str(response.url))
+        if not playlist.is_master:
+            if not playlist.segments:
+                raise ContentProcessingError("HLS playlist has no media segments")
+            return playlist
+        url = select_media_playlist(playlist)
+    raise ContentProcessingError("HLS master playlist does not lead to a media playlist")
+
+class SegmentFetcher:
+    """Downloads media segments to a work directory, at most once per segment"""
+
+    def __init__(self, work_dir: str):
+        self.work_dir = work_dir
+        self.semaphore = asyncio.Semaphore(settings.HLS_DOWNLOAD_CONCURRENCY)
+        self.downloads: Dict[str, asyncio.Task] = {}
+        self.users: Dict[str, int] = {}
+
+    def retain(self, segment: HlsSegment) -> None:
+        """Register one more window that will read this segment"""
+        key = hash_text(segment.key)
+        self.users[key] = self.users.get(key, 0) + 1
+
+    def fetch(self, segment: HlsSegment) -> asyncio.Task:
+        """Start (or join) the download of a segment; the task resolves to its local path"""
+        # Windows share their overlap segment, so downloads are keyed by the segment's URI hash
+        key = hash_text(segment.key)
+        if key not in self.downloads:
+            self.downloads[key] = asyncio.create_task(self._download(segment, os.path.join(self.work_dir, key)))
+        return self.downloads[key]
+
+    def release(self, segment: HlsSegment) -> None:
+        """Delete a downloaded segment once every window that needs it has read it"""
+        key = hash_text(segment.key)
+        self.users[key] = self.users.get(key, 1) - 1
+        if self.users[key] <= 0:
+            path = os.path.join(self.work_dir, key)
+            if os.path.exists(path):
+                os.unlink(path)
+
+    async def _download(self, segment: HlsSegment, path: str) -> str:
+        headers = {}
+        if segment.byte_range is not None:
+            offset, length = segment.byte_range
+            headers["Range"] = f"bytes={offset}-{offset + length - 1}"
+
+        async def get() -> str:
+            async with http_client.stream("GET", segment.uri, headers=headers) as response:
+                response.raise_for_status()
+                async with aiofiles.open(path, "wb") as out:
+                    async for chunk in response.aiter_bytes():
+                        await out.write(chunk)
+            return path
+
+        async with self.semaphore:
+            return await _with_retries(f"segment {segment.uri}", get)
+
+    def cancel(self) -> None:
+        for task in self.downloads.values():
+            task.cancel()
+
+async def _assemble(fetcher: SegmentFetcher, init: Optional[HlsSegment], segments: List[HlsSegment], path: str) -> None:
+    # All downloads start at once; each is appended as soon as everything before it is written
+    parts = ([init] if init else []) + segments
+    downloads = [fetcher.fetch(segment) for segment in parts]
+    async with aiofiles.open(path, "wb") as out:
+        for segment, download in zip(parts, downloads):
+            async with aiofiles.open(await download, "rb") as part:
+                while chunk := await part.read(1024 * 1024):
+                    await out.write(chunk)
+            fetcher.release(segment)
+
+async def transcribe_hls(url: str) -> str:
+    """Transcribe the audio of an HLS stream"""
+    playlist = await fetch_playlist(url)
+    windows = plan_windows(playlist.segments, settings.AUDIO_SEGMENT_SECONDS)
+    logger.info(f"Transcribing {playlist.duration:.0f}s HLS stream: {len(playlist.segments)} segments in {len(windows)} windows")
+    semaphore = asyncio.Semaphore(settings.WHISPER_CONCURRENCY)
+    backend = get_transcription_backend()
+
+    with tempfile.TemporaryDirectory(prefix="hls-") as work_dir:
+        fetcher = SegmentFetcher(work_dir)
+        for segments in windows:
+            for segment in ([playlist.init_segment] if playlist.init_segment else []) + segments:
+                fetcher.retain(segment)
+
+        async def transcribe_window(index: int, segments: List[HlsSegment]) -> str:
+            async def compute() -> str:
+                assembled = os.path.join(work_dir, f"window-{index}")
+                speech = os.path.join(work_dir, f"window-{index}.mp3")
+                await _assemble(fetcher, playlist.init_segment, segments, assembled)
+                try:
+                    await convert_for_speech(assembled, speech)
+                    return await backend.transcribe(speech)
+                finally:
+                    for path in (assembled, speech):
+                        if os.path.exists(path):
+                            os.unlink(path)
+
+            window_id = hash_text("\n".join(segment.key for segment in segments))
+            async with semaphore:
+                return await run_stage(EXTRACT, f"hls-window:{backend.name}:{window_id}", compute)
+
+        try:
+            texts = await asyncio.gather(*(
+                transcribe_window(index, segments)
+                for index, segments in enumerate(windows)
+            ))
+        finally:
+            fetcher.cancel()
+
+    # Each window repeats the first segment of the next one
+    overlap = max((window[0].duration for window in windows[1:]), default=0.0)
+    return stitch_transcripts(texts, overlap)
+
+async def close_hls_client() -> None:
+    """Close the pooled HTTP client; call on application shutdown"""
+    await http_client.aclose()
@@ -0,0 +1,204 @@
+"""
+Local Whisper transcription off the event loop.
+
+Two engines are available: the reference `whisper` package, and
+`faster-whisper` (CTranslate2), which runs int8-quantized on CPU and batches a
+file's chunks through the model.
+
+Transcription is CPU-bound, so it runs in a dedicated ProcessPoolExecutor.
+Each pool process loads the model the first time it is given a job and keeps
+it for the life of the process; nothing is loaded when the engine is created.
+Jobs wait in a bounded queue in front of the pool, and the engine reports the
+queue depth and per-job timings.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from ...core.config import settings
+from ...core.exceptions import TranscriptionBusyError
+
+logger = logging.getLogger(__name__)
+
+RECENT_JOBS = 100  # timings kept for stats
+
+# Engines the pool processes can run; both are imported only inside the pool process
+WHISPER = "whisper"
+FASTER_WHISPER = "faster-whisper"
+
+# Models loaded in this pool process, by (engine, model name)
+_models: Dict[Tuple[str, str], Any] = {}
+
+def _load_model(kind: str, model_name: str) -> Any:
+    if kind == FASTER_WHISPER:
+        from faster_whisper import WhisperModel, BatchedInferencePipeline
+        model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=settings.FASTER_WHISPER_COMPUTE_TYPE,
+            cpu_threads=settings.FASTER_WHISPER_CPU_THREADS
+        )
+        # Batches VAD-split chunks of one file through the model together
+        return BatchedInferencePipeline(model=model)
+    import whisper
+    return whisper.load_model(model_name)
+
+def _run_model(kind: str, model: Any, path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    if kind == FASTER_WHISPER:
+        options = {"batch_size": settings.FASTER_WHISPER_BATCH_SIZE, **options}
+        segments, info = model.transcribe(path, **options)
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "segments": segments,
+            "language": info.language,
+            "duration": info.duration
+        }
+    return model.transcribe(path, **options)
+
+def _transcribe_in_worker(kind: str, model_name: str, path: str, options: Dict[str, Any]) -> Tuple[Dict[str, Any], float, float]:
+    """Runs inside a pool process: load the model once, then transcribe"""
+    load_seconds = 0.0
+    if (kind, model_name) not in _models:
+        started = time.perf_counter()
+        _models[(kind, model_name)] = _load_model(kind, model_name)
+        load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    result = _run_model(kind, _models[(kind, model_name)], path, options)
+    return result, load_seconds, time.perf_counter() - started
+
+@dataclass
+class JobTiming:
+    path: str
+    queued_seconds: float
+    run_seconds: float
+    load_seconds: float
+    succeeded: bool
+
+@dataclass
+class _Job:
+    path: str
+    options: Dict[str, Any]
+    future: asyncio.Future
+    enqueued_at: float
+
+class LocalTranscriptionEngine:
+    """Queue of local Whisper jobs served by a pool of model processes"""
+
+    def __init__(self, kind: str, model_name: str, workers: int, max_queue: int):
+        self.kind = kind
+        self.model_name = model_name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._recent: Deque[JobTiming] = deque(maxlen=RECENT_JOBS)
+
+    def _start(self) -> None:
+        # Created on first use, inside the running loop; spawn avoids forking the API's threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        logger.info(f"Started local {self.kind} engine: model={self.model_name}, workers={self.workers}")
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.future.cancelled():
+                continue
+            started = time.perf_counter()
+            self._running += 1
+            try:
+                result, load_seconds, run_seconds = await loop.run_in_executor(
+                    self._executor, _transcribe_in_worker, self.kind, self.model_name, job.path, job.options
+                )
+            except Exception as e:
+                self._failed += 1
+                self._recent.append(JobTiming(job.path, started - job.enqueued_at, time.perf_counter() - started, 0.0, False))
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self._completed += 1
+                self._recent.append(JobTiming(job.path, started - job.enqueued_at, run_seconds, load_seconds, True))
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._running -= 1
+
+    async def transcribe(self, path: str, **options: Any) -> Dict[str, Any]:
+        """Queue a file for transcription and wait for Whisper's result dict"""
+        if self._executor is None:
+            self._start()
+        job = _Job(
+            path=os.path.abspath(path),
+            options=options,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=time.perf_counter()
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise TranscriptionBusyError(f"Local transcription queue is full ({self.max_queue} jobs waiting)")
+        return await job.future
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and recent per-job timings"""
+        finished = [timing for timing in self._recent if timing.succeeded]
+        return {
+            "engine": self.kind,
+            "model": self.model_name,
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "avg_queued_seconds": sum(t.queued_seconds for t in finished) / len(finished) if finished else None,
+            "avg_run_seconds": sum(t.run_seconds for t in finished) / len(finished) if finished else None,
+            "recent_jobs": [asdict(timing) for timing in list(self._recent)[-10:]]
+        }
+
+    async def shutdown(self) -> None:
+        """Stop the dispatchers and the model processes"""
+        for task in self._dispatchers:
+            task.cancel()
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+            self._executor = None
+            self._queue = None
+
+_engines: Dict[str, LocalTranscriptionEngine] = {}
+
+def get_local_engine(kind: str = WHISPER) -> LocalTranscriptionEngine:
+    """The process-wide engine of a kind; creating it does not load the model"""
+    if kind not in _engines:
+        _engines[kind] = LocalTranscriptionEngine(
+            kind=kind,
+            model_name=settings.LOCAL_WHISPER_MODEL,
+            workers=settings.LOCAL_WHISPER_WORKERS,
+            max_queue=settings.LOCAL_WHISPER_QUEUE_SIZE
+        )
+    return _engines[kind]
+
+def get_local_engine_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every engine created in this process"""
+    return {kind: engine.stats() for kind, engine in _engines.items()}
+
+async def close_local_engine() -> None:
+    """Shut down every engine that was created; call on application shutdown"""
+    for engine in _engines.values():
+        await engine.shutdown()
@@ -0,0 +1,135 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+from ...core.exceptions import ContentProcessingError
+
+_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+@dataclass
+class HlsSegment:
+    uri: str
+    duration: float
+    byte_range: Optional[Tuple[int, int]] = None  # (offset, length)
+
+    @property
+    def key(self) -> str:
+        """Identity of the bytes this segment refers to"""
+        if self.byte_range is None:
+            return self.uri
+        offset, length = self.byte_range
+        return f"{self.uri}@{offset}+{length}"
+
+@dataclass
+class HlsVariant:
+    uri: str
+    bandwidth: int = 0
+
+@dataclass
+class HlsPlaylist:
+    segments: List[HlsSegment] = field(default_factory=list)
+    init_segment: Optional[HlsSegment] = None  # EXT-X-MAP, for fragmented MP4 streams
+    variants: List[HlsVariant] = field(default_factory=list)
+    audio_uri: Optional[str] = None  # default audio-only rendition of a master playlist
+
+    @property
+    def is_master(self) -> bool:
+        return bool(self.variants or self.audio_uri)
+
+    @property
+    def duration(self) -> float:
+        return sum(segment.duration for segment in self.segments)
+
+def _attributes(value: str) -> Dict[str, str]:
+    return {key: raw.strip('"') for key, raw in _ATTRIBUTE.findall(value)}
+
+def _byte_range(value: str, next_offset: int) -> Tuple[int, int]:
+    length, _, offset = value.partition("@")
+    return (int(offset) if offset else next_offset, int(length))
+
+def parse_playlist(text: str, base_url: str) -> HlsPlaylist:
+    """Parse a master or media m3u8 playlist, resolving URIs against base_url"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines or not lines[0].startswith("#EXTM3U"):
+        raise ContentProcessingError("Not an HLS playlist")
+
+    playlist = HlsPlaylist()
+    pending_duration: Optional[float] = None
+    pending_range: Optional[str] = None
+    pending_variant: Optional[Dict[str, str]] = None
+    next_offset = 0
+
+    for line in lines[1:]:
+        if line.startswith("#EXTINF:"):
+            pending_duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+        elif line.startswith("#EXT-X-BYTERANGE:"):
+            pending_range = line[len("#EXT-X-BYTERANGE:"):]
+        elif line.startswith("#EXT-X-STREAM-INF:"):
+            pending_variant = _attributes(line[len("#EXT-X-STREAM-INF:"):])
+        elif line.startswith("#EXT-X-MEDIA:"):
+            attrs = _attributes(line[len("#EXT-X-MEDIA:"):])
+            if attrs.get("TYPE") == "AUDIO" and attrs.get("URI"):
+                if playlist.audio_uri is None or attrs.get("DEFAULT") == "YES":
+                    playlist.audio_uri = urljoin(base_url, attrs["URI"])
+        elif line.startswith("#EXT-X-MAP:"):
+            attrs = _attributes(line[len("#EXT-X-MAP:"):])
+            playlist.init_segment = HlsSegment(
+                uri=urljoin(base_url, attrs["URI"]),
+                duration=0.0,
+                byte_range=_byte_range(attrs["BYTERANGE"], 0) if "BYTERANGE" in attrs else None
+            )
+        elif line.startswith("#EXT-X-KEY:"):
+            method = _attributes(line[len("#EXT-X-KEY:"):]).get("METHOD", "NONE")
+            if method != "NONE":
+                raise ContentProcessingError(f"Encrypted HLS streams are not supported ({method})")
+        elif line.startswith("#"):
+            continue
+        elif pending_variant is not None:
+            playlist.variants.append(HlsVariant(
+                uri=urljoin(base_url, line),
+                bandwidth=int(pending_variant.get("BANDWIDTH", 0))
+            ))
+            pending_variant = None
+        elif pending_duration is not None:
+            byte_range = None
+            if pending_range is not None:
+                byte_range = _byte_range(pending_range, next_offset)
+                next_offset = byte_range[0] + byte_range[1]
+            playlist.segments.append(HlsSegment(
+                uri=urljoin(base_url, line),
+                duration=pending_duration,
+                byte_range=byte_range
+            ))
+            pending_duration = None
+            pending_range = None
+
+    return playlist
+
+def select_media_playlist(playlist: HlsPlaylist) -> str:
+    """Pick the cheapest playlist of a master that still carries the audio"""
+    if playlist.audio_uri:
+        return playlist.audio_uri
+    return min(playlist.variants, key=lambda variant: variant.bandwidth).uri
+
+def plan_windows(segments: List[HlsSegment], window_seconds: float) -> List[List[HlsSegment]]:
+    """Group consecutive segments into windows of about window_seconds.
+
+    Each window also carries the first segment of the next one, so words on a
+    boundary are heard whole and the duplicate can be stitched away.
+    """
+    groups: List[List[HlsSegment]] = []
+    current: List[HlsSegment] = []
+    elapsed = 0.0
+    for segment in segments:
+        current.append(segment)
+        elapsed += segment.duration
+        if elapsed >= window_seconds:
+            groups.append(current)
+            current, elapsed = [], 0.0
+    if current:
+        groups.append(current)
+
+    return [
+        group + groups[index + 1][:1] if index + 1 < len(groups) else group
+        for index, group in enumerate(groups)
+    ]
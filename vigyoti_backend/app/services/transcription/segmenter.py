@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import List, Tuple
+from ...core.exceptions import ContentProcessingError
+
+logger = logging.getLogger(__name__)
+
+# Speech-quality re-encode: mono 16kHz at 64kbps keeps a 10 minute segment around 5MB
+SEGMENT_FORMAT = "mp3"
+SEGMENT_ARGS = ["-vn", "-ac", "1", "-ar", "16000", "-b:a", "64k"]
+
+async def _run(*args: str) -> bytes:
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise ContentProcessingError(f"{args[0]} failed: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+async def probe_duration(path: str) -> float:
+    """Return the duration of a media file in seconds using ffprobe"""
+    output = await _run(
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path
+    )
+    try:
+        return float(output.decode().strip())
+    except ValueError:
+        raise ContentProcessingError(f"Could not determine duration of {path}")
+
+def plan_segments(
+    duration: float,
+    segment_seconds: float,
+    overlap_seconds: float
+) -> List[Tuple[float, float]]:
+    """Split [0, duration) into (start, length) windows that overlap the next one by overlap_seconds"""
+    segments = []
+    start = 0.0
+    while start < duration:
+        length = min(segment_seconds + overlap_seconds, duration - start)
+        segments.append((start, length))
+        start += segment_seconds
+    # Don't send a sliver that lies entirely inside the previous segment's overlap
+    if len(segments) > 1 and segments[-1][1] <= overlap_seconds:
+        segments.pop()
+    return segments
+
+async def extract_segment(source_path: str, start: float, length: float, output_path: str) -> None:
+    """Cut one time window out of the source, re-encoded for speech recognition"""
+    await _run(
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        "-ss", f"{start:.3f}",
+        "-t", f"{length:.3f}",
+        "-i", source_path,
+        *SEGMENT_ARGS,
+        output_path
+    )
+
+async def convert_for_speech(source_path: str, output_path: str) -> None:
+    """Re-encode a whole media file for speech recognition"""
+    await _run(
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        "-i", source_path,
+        *SEGMENT_ARGS,
+        output_path
+    )
+
+async def decode_to_pcm(source_path: str, output_path: str, sample_rate: int) -> None:
+    """Decode any media file to headerless mono 16-bit PCM"""
+    await _run(
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        "-i", source_path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        output_path
+    )
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from ..content_processing.pipeline import run_stage, EXTRACT
+from ...core.config import settings
+from ...core.exceptions import ContentProcessingError
+from ...utils.hashing import hash_text
+from .backends import TranscriptionBackend
+from .segmenter import decode_to_pcm
+from .vad import (
+    PcmAudio, SpeechChunk, read_pcm_wav, read_pcm_raw, frame_energies, speech_threshold,
+    detect_speech, split_long_regions, pack_chunks, write_chunk_wav
+)
+
+logger = logging.getLogger(__name__)
+
+VAD_SAMPLE_RATE = 16000  # what Whisper resamples to anyway
+WHISPER_UPLOAD_HEADROOM = 0.95
+
+@dataclass
+class TimedTranscript:
+    text: str
+    segments: List[Dict]  # {start, end, text}, timed against the original recording
+    duration: float
+    speech_seconds: float
+
+async def load_pcm(path: str, work_dir: str) -> PcmAudio:
+    """Memory-map a file's samples, decoding it to 16kHz mono PCM first unless it already is PCM WAV"""
+    try:
+        return read_pcm_wav(path)
+    except ContentProcessingError:
+        raw_path = os.path.join(work_dir, "audio.pcm")
+        await decode_to_pcm(path, raw_path, VAD_SAMPLE_RATE)
+        return read_pcm_raw(raw_path, VAD_SAMPLE_RATE)
+
+def find_speech(audio: PcmAudio, max_chunk_seconds: float) -> List[SpeechChunk]:
+    """Detect speech and pack it into chunks of at most max_chunk_seconds"""
+    frame = settings.VAD_FRAME_SECONDS
+    energies = frame_energies(audio, frame)
+    regions = detect_speech(
+        energies,
+        frame,
+        speech_threshold(energies, settings.VAD_MARGIN_DB),
+        settings.VAD_MIN_SILENCE_SECONDS,
+        settings.VAD_MIN_SPEECH_SECONDS,
+        settings.VAD_PADDING_SECONDS
+    )
+    regions = split_long_regions(regions, energies, frame, max_chunk_seconds)
+    return pack_chunks(regions, max_chunk_seconds, settings.VAD_GAP_SECONDS)
+
+def _chunk_id(chunk: SpeechChunk) -> str:
+    return hash_text(",".join(f"{start:.2f}-{end:.2f}" for start, end in chunk.regions))[:16]
+
+async def transcribe_speech(path: str, source_hash: str, backend: TranscriptionBackend) -> TimedTranscript:
+    """Transcribe only the speech in a recording, in parallel chunks split at pauses.
+
+    Silence is never sent to the backend, and every segment is timed against
+    the original recording.
+    """
+    with tempfile.TemporaryDirectory(prefix="vad-") as work_dir:
+        audio = await load_pcm(path, work_dir)
+        # A WAV chunk must stay under Whisper's upload limit
+        max_chunk_seconds = min(
+            settings.AUDIO_SEGMENT_SECONDS,
+            settings.WHISPER_MAX_UPLOAD_BYTES * WHISPER_UPLOAD_HEADROOM / (2 * audio.sample_rate)
+        )
+        chunks = await asyncio.to_thread(find_speech, audio, max_chunk_seconds)
+        speech_seconds = sum(chunk.speech_seconds for chunk in chunks)
+        logger.info(
+            f"Voice activity: {speech_seconds:.0f}s of speech in {audio.duration:.0f}s, "
+            f"transcribing {len(chunks)} chunks"
+        )
+        semaphore = asyncio.Semaphore(settings.WHISPER_CONCURRENCY)
+
+        async def transcribe_chunk(index: int, chunk: SpeechChunk) -> List[Dict]:
+            async def compute() -> List[Dict]:
+                chunk_path = os.path.join(work_dir, f"chunk-{index}.wav")
+                await asyncio.to_thread(write_chunk_wav, audio, chunk, chunk_path)
+                try:
+                    segments = await backend.transcribe_timed(chunk_path)
+                finally:
+                    os.unlink(chunk_path)
+                return [
+                    {
+                        "start": round(chunk.to_original(segment["start"]), 3),
+                        "end": round(chunk.to_original(segment["end"]), 3),
+                        "text": segment["text"].strip()
+                    }
+                    for segment in segments
+                ]
+
+            async with semaphore:
+                return await run_stage(
+                    EXTRACT,
+                    f"vad-chunk:{backend.name}:{source_hash}:{_chunk_id(chunk)}",
+                    compute
+                )
+
+        results = await asyncio.gather(*(
+            transcribe_chunk(index, chunk) for index, chunk in enumerate(chunks)
+        ))
+        duration = audio.duration
+
+    segments = [segment for result in results for segment in result if segment["text"]]
+    return TimedTranscript(
+        text=" ".join(segment["text"] for segment in segments),
+        segments=segments,
+        duration=duration,
+        speech_seconds=speech_seconds
+    )
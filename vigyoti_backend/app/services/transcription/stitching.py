@@ -0,0 +1,54 @@
+import math
+import re
+from typing import Iterable, List
+
+# Fast speech runs at about three words a second; the slack absorbs words cut at either edge
+WORDS_PER_SECOND = 3.0
+OVERLAP_SLACK_WORDS = 2
+# A run at the very start of the segment needs fewer words than one found further in
+MIN_MATCH_WORDS = 2
+MIN_OFFSET_MATCH_WORDS = 3
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def overlap_words(overlap_seconds: float) -> int:
+    """Most words the shared audio between two segments can hold"""
+    return math.ceil(overlap_seconds * WORDS_PER_SECOND) + OVERLAP_SLACK_WORDS
+
+def trim_overlap(previous: str, current: str, overlap_seconds: float) -> str:
+    """Drop the words at the start of `current` that repeat the end of `previous`.
+
+    Adjacent segments share overlap_seconds of audio, so both transcripts
+    contain the same few words around the boundary. Whisper may start the
+    next segment mid-phrase, so the repeated run may begin a little way in,
+    but it has to lie within the words the overlap can hold; a phrase that
+    merely recurs later in the segment is real content and is kept.
+    """
+    window = overlap_words(overlap_seconds)
+    previous_words = [_normalize(w) for w in previous.split()[-window:]]
+    current_raw = current.split()
+    current_words = [_normalize(w) for w in current_raw[:window]]
+
+    for length in range(min(len(previous_words), len(current_words)), MIN_MATCH_WORDS - 1, -1):
+        tail = previous_words[-length:]
+        for offset in range(len(current_words) - length + 1):
+            if offset and length < MIN_OFFSET_MATCH_WORDS:
+                break
+            if current_words[offset:offset + length] == tail:
+                return " ".join(current_raw[offset + length:])
+    return current
+
+def stitch_transcripts(texts: Iterable[str], overlap_seconds: float) -> str:
+    """Join segment transcripts in order, removing text duplicated by the overlaps"""
+    stitched: List[str] = []
+    previous = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        trimmed = trim_overlap(previous, text, overlap_seconds) if previous else text
+        if trimmed:
+            stitched.append(trimmed)
+        previous = text
+    return " ".join(stitched)
@@ -0,0 +1,215 @@
+"""
+Energy-based voice activity detection over 16-bit PCM.
+
+Audio is memory-mapped rather than loaded, frame energies are computed block
+by block, and speech is packed into chunks that carry a map from chunk time
+back to the original recording so timestamps survive transcription.
+"""
+import struct
+import wave
+from dataclasses import dataclass, field
+from typing import List, Tuple
+import numpy as np
+from ...core.exceptions import ContentProcessingError
+
+ENERGY_BLOCK_FRAMES = 4096  # frames reduced at once, bounding memory on long recordings
+SILENCE_DB = -90.0  # energy of digital silence, keeps log10 finite
+NOISE_FLOOR_PERCENTILE = 10
+SPEECH_LEVEL_PERCENTILE = 90
+MIN_THRESHOLD_DB = -55.0
+SPLIT_SEARCH_FRACTION = 0.2  # long regions are cut at the quietest frame in this tail of the chunk
+
+@dataclass
+class PcmAudio:
+    samples: np.ndarray  # int16, mono
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+@dataclass
+class SpeechChunk:
+    """Speech regions packed into one file, with the offsets needed to undo the packing"""
+    regions: List[Tuple[float, float]]  # (start, end) in the original recording
+    gap_seconds: float
+    offsets: List[Tuple[float, float]] = field(default_factory=list)  # (chunk start, original start)
+
+    def __post_init__(self):
+        position = 0.0
+        for index, (start, end) in enumerate(self.regions):
+            position += self.gap_before(index)
+            self.offsets.append((position, start))
+            position += end - start
+
+    def gap_before(self, index: int) -> float:
+        """Silence inserted before a region; none between pieces of one force-split region"""
+        if index == 0:
+            return 0.0
+        return _gap_between(self.regions[index - 1], self.regions[index], self.gap_seconds)
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(end - start for start, end in self.regions)
+
+    def to_original(self, chunk_time: float) -> float:
+        """Map a time in the packed chunk back to the original recording"""
+        chunk_start, original_start = self.offsets[0]
+        for candidate in self.offsets:
+            if candidate[0] > chunk_time:
+                break
+            chunk_start, original_start = candidate
+        return original_start + (chunk_time - chunk_start)
+
+def _gap_between(previous: Tuple[float, float], region: Tuple[float, float], gap_seconds: float) -> float:
+    # split_long_regions leaves the pieces of one region touching, and they must stay continuous
+    return 0.0 if region[0] <= previous[1] else gap_seconds
+
+def read_pcm_wav(path: str) -> PcmAudio:
+    """Memory-map the samples of a mono 16-bit PCM WAV file"""
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ContentProcessingError("Not a WAV file")
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ContentProcessingError("WAV file has no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size & 1), 1)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+    if fmt is None:
+        raise ContentProcessingError("WAV file has no format chunk")
+    audio_format, channels, sample_rate, _, _, bits = fmt
+    if audio_format != 1 or channels != 1 or bits != 16:
+        raise ContentProcessingError("Only mono 16-bit PCM WAV can be read directly")
+    count = min(chunk_size, _file_size(path) - data_offset) // 2
+    samples = np.memmap(path, dtype="<i2", mode="r", offset=data_offset, shape=(count,))
+    return PcmAudio(samples=samples, sample_rate=sample_rate)
+
+def read_pcm_raw(path: str, sample_rate: int) -> PcmAudio:
+    """Memory-map headerless mono s16le samples"""
+    count = _file_size(path) // 2
+    if count == 0:
+        return PcmAudio(samples=np.zeros(0, dtype="<i2"), sample_rate=sample_rate)
+    return PcmAudio(samples=np.memmap(path, dtype="<i2", mode="r", shape=(count,)), sample_rate=sample_rate)
+
+def _file_size(path: str) -> int:
+    with open(path, "rb") as f:
+        return f.seek(0, 2)
+
+def frame_energies(audio: PcmAudio, frame_seconds: float) -> np.ndarray:
+    """RMS energy of each frame in dBFS"""
+    frame = max(1, int(audio.sample_rate * frame_seconds))
+    count = len(audio.samples) // frame
+    energies = np.empty(count, dtype=np.float32)
+    for first in range(0, count, ENERGY_BLOCK_FRAMES):
+        last = min(first + ENERGY_BLOCK_FRAMES, count)
+        block = np.asarray(audio.samples[first * frame:last * frame], dtype=np.float32) / 32768.0
+        rms = np.sqrt(np.mean(block.reshape(-1, frame) ** 2, axis=1))
+        energies[first:last] = 20 * np.log10(np.maximum(rms, 10 ** (SILENCE_DB / 20)))
+    return energies
+
+def speech_threshold(energies: np.ndarray, margin_db: float) -> float:
+    """Adaptive threshold: a margin above the noise floor, capped halfway to the speech level.
+
+    The cap matters for recordings with little silence, where the "floor" is
+    already quiet speech.
+    """
+    if len(energies) == 0:
+        return MIN_THRESHOLD_DB
+    floor, level = np.percentile(energies, [NOISE_FLOOR_PERCENTILE, SPEECH_LEVEL_PERCENTILE])
+    return max(MIN_THRESHOLD_DB, min(float(floor) + margin_db, float(floor + level) / 2))
+
+def detect_speech(
+    energies: np.ndarray,
+    frame_seconds: float,
+    threshold_db: float,
+    min_silence_seconds: float,
+    min_speech_seconds: float,
+    padding_seconds: float
+) -> List[Tuple[float, float]]:
+    """Return (start, end) seconds of speech, with short pauses bridged and blips dropped"""
+    voiced = np.concatenate(([False], energies > threshold_db, [False]))
+    edges = np.flatnonzero(np.diff(voiced.astype(np.int8)))
+    runs = (edges.reshape(-1, 2) * frame_seconds).tolist()  # [start, end) of each voiced run
+
+    regions: List[List[float]] = []
+    for start, end in runs:
+        if regions and start - regions[-1][1] < min_silence_seconds:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    total = len(energies) * frame_seconds
+    padded = []
+    for start, end in regions:
+        if end - start < min_speech_seconds:
+            continue
+        start, end = max(0.0, start - padding_seconds), min(total, end + padding_seconds)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return padded
+
+def split_long_regions(
+    regions: List[Tuple[float, float]],
+    energies: np.ndarray,
+    frame_seconds: float,
+    max_seconds: float
+) -> List[Tuple[float, float]]:
+    """Cut regions longer than max_seconds at their quietest point near the limit"""
+    result = []
+    for start, end in regions:
+        while end - start > max_seconds:
+            search_from = int((start + max_seconds * (1 - SPLIT_SEARCH_FRACTION)) / frame_seconds)
+            search_to = int((start + max_seconds) / frame_seconds)
+            cut = (search_from + int(np.argmin(energies[search_from:search_to]))) * frame_seconds
+            if cut <= start:
+                cut = start + max_seconds
+            result.append((start, cut))
+            start = cut
+        result.append((start, end))
+    return result
+
+def pack_chunks(
+    regions: List[Tuple[float, float]],
+    max_seconds: float,
+    gap_seconds: float
+) -> List[SpeechChunk]:
+    """Group consecutive speech regions into chunks of at most max_seconds of packed audio"""
+    chunks: List[SpeechChunk] = []
+    current: List[Tuple[float, float]] = []
+    length = 0.0
+    for start, end in regions:
+        added = end - start + (_gap_between(current[-1], (start, end), gap_seconds) if current else 0.0)
+        if current and length + added > max_seconds:
+            chunks.append(SpeechChunk(current, gap_seconds))
+            current, length, added = [], 0.0, end - start
+        current.append((start, end))
+        length += added
+    if current:
+        chunks.append(SpeechChunk(current, gap_seconds))
+    return chunks
+
+def write_chunk_wav(audio: PcmAudio, chunk: SpeechChunk, path: str) -> None:
+    """Write a chunk's speech regions, separated by short silences, as mono 16-bit WAV"""
+    gap = np.zeros(int(chunk.gap_seconds * audio.sample_rate), dtype="<i2").tobytes()
+    with wave.open(path, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(audio.sample_rate)
+        for index, (start, end) in enumerate(chunk.regions):
+            if chunk.gap_before(index):
+                out.writeframes(gap)
+            first, last = int(start * audio.sample_rate), int(end * audio.sample_rate)
+            out.writeframes(np.asarray(audio.samples[first:last], dtype="<i2").tobytes())
@@ -1,13 +1,7 @@
 from typing import List, Optional
 from ...core.prompts import TWEET_GENERATION_PROMPT, CONTENT_IMPROVEMENT_PROMPT
 from ...core.exceptions import ContentProcessingError
-from openai import OpenAI
-import os
-import time
-from tenacity import retry, stop_after_attempt, wait_exponential
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from ..llm_gateway import chat_completion
 
 def create_tweet_prompt(
     source_text: str,
@@ -34,15 +28,10 @@ Additional Parameters:
     
     return base_prompt + custom_params
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=60),
-    retry_error_callback=lambda retry_state: None
-)
-def _generate_content_with_retry(prompt: str, max_tokens: int = 280) -> str:
-    """Generate content with retry logic for rate limits"""
+async def _generate_content(prompt: str, max_tokens: int = 280) -> str:
+    """Generate content; rate-limit retries and backoff are handled by the LLM gateway"""
     try:
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=max_tokens,
@@ -50,13 +39,9 @@ def _generate_content_with_retry(prompt: str, max_tokens: int = 280) -> str:
         )
         return response.choices[0].message.content
     except Exception as e:
-        if "rate limit" in str(e).lower():
-            # If we hit rate limit, sleep for a bit before retry
-            time.sleep(5)
-            raise e
         raise ContentProcessingError(f"Error generating content: {str(e)}")
 
-def generate_tweet_content(
+async def generate_tweet_content(
     source_text: str,
     tweet_type: str,
     tone: str,
@@ -66,7 +51,7 @@ def generate_tweet_content(
     custom_instructions: Optional[str] = None,
     num_tweets: int = 1
 ) -> List[str]:
-    """Generate tweet content with retry logic for rate limits"""
+    """Generate tweet content"""
     prompt = create_tweet_prompt(
         source_text=source_text,
         tweet_type=tweet_type,
@@ -80,14 +65,14 @@ def generate_tweet_content(
     variations = []
     for _ in range(num_tweets):
         try:
-            content = _generate_content_with_retry(prompt)
+            content = await _generate_content(prompt)
             if content:
                 # Try to improve the content
                 improvement_prompt = CONTENT_IMPROVEMENT_PROMPT.format(
                     platform="Twitter",
                     content=content
                 )
-                improved_content = _generate_content_with_retry(improvement_prompt, max_tokens=280)
+                improved_content = await _generate_content(improvement_prompt, max_tokens=280)
                 variations.append(improved_content or content)
             else:
                 raise ContentProcessingError("Failed to generate content")
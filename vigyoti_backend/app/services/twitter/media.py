@@ -2,17 +2,20 @@ from typing import Optional
 import httpx
 from fastapi import UploadFile
 from ...core.exceptions import ContentProcessingError
+from ...utils.uploads import spool_upload
 import logging
 
 logger = logging.getLogger(__name__)
 
 TWITTER_UPLOAD_API = "https://upload.twitter.com/1.1/media/upload.json"
+MAX_MEDIA_SIZE = 512 * 1024 * 1024  # 512MB, Twitter's limit for video
 
 async def upload_media_to_twitter(file: UploadFile, auth_token: str) -> str:
     """Upload media to Twitter"""
+    upload = None
     try:
-        # Read file content
-        content = await file.read()
+        # Stream the upload to disk instead of holding it in memory
+        upload = await spool_upload(file, MAX_MEDIA_SIZE)
         
         headers = {
             "Authorization": f"Bearer {auth_token}",
@@ -21,11 +24,11 @@ async def upload_media_to_twitter(file: UploadFile, auth_token: str) -> str:
         # INIT command
         init_data = {
             "command": "INIT",
-            "total_bytes": len(content),
+            "total_bytes": upload.size,
             "media_type": file.content_type,
         }
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient() as client, open(upload.path, "rb") as media:
             init_response = await client.post(
                 TWITTER_UPLOAD_API,
                 headers=headers,
@@ -44,7 +47,7 @@ async def upload_media_to_twitter(file: UploadFile, auth_token: str) -> str:
                 "segment_index": 0
             }
             files = {
-                "media": content
+                "media": media
             }
             
             append_response = await client.post(
@@ -76,4 +79,7 @@ async def upload_media_to_twitter(file: UploadFile, auth_token: str) -> str:
             
     except Exception as e:
         logger.error(f"Error uploading media: {str(e)}")
-        raise ContentProcessingError(f"Failed to upload media: {str(e)}") 
\ No newline at end of file
+        raise ContentProcessingError(f"Failed to upload media: {str(e)}")
+    finally:
+        if upload is not None:
+            upload.cleanup() 
@@ -3,6 +3,9 @@ from datetime import timedelta
 import json
 from ...core.cache import redis_client
 from ...schemas.twitter_auth import TwitterAuthState
+import logging
+
+logger = logging.getLogger(__name__)
 
 class TwitterAuthStorage:
     """Storage for Twitter OAuth2 state and PKCE verifier"""
@@ -1,5 +1,5 @@
 from typing import Optional, List
-import openai
+from .llm_gateway import client as openai_client, chat_completion
 from ..schemas.audio import AudioToTwitterRequest, TwitterContent
 from ..core.settings import get_settings
 
@@ -7,7 +7,7 @@ settings = get_settings()
 
 class TwitterContentService:
     def __init__(self):
-        self.openai_client = openai.OpenAI()
+        self.openai_client = openai_client
         self.max_tweet_length = 280
         self.premium_max_length = 25000  # For long-form content
 
@@ -22,7 +22,7 @@ class TwitterContentService:
             if request.additional_context:
                 system_prompt += f"\nAdditional context: {request.additional_context}"
 
-            response = await self.openai_client.chat.completions.create(
+            response = await chat_completion(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": system_prompt},
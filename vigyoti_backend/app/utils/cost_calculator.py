@@ -1,10 +1,32 @@
+import threading
 import tiktoken
 import logging
-from typing import Dict, Union, Tuple
-from openai.types.completion import Completion
+from typing import Dict, List, Optional, Union, Tuple
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ENCODING_MODEL = "gpt-4o-mini"
+FALLBACK_ENCODING = "o200k_base"
+
+# Encoders are expensive to build, so each model's is loaded once and shared across threads
+_ENCODERS: Dict[str, tiktoken.Encoding] = {}
+_ENCODERS_LOCK = threading.Lock()
+
+def get_encoder(model: Optional[str] = None) -> tiktoken.Encoding:
+    """Return the tiktoken encoder for a model, loading it on first use"""
+    model = model or DEFAULT_ENCODING_MODEL
+    encoder = _ENCODERS.get(model)
+    if encoder is not None:
+        return encoder
+    with _ENCODERS_LOCK:
+        if model not in _ENCODERS:
+            try:
+                _ENCODERS[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                logger.warning(f"No tiktoken encoding registered for {model}, using {FALLBACK_ENCODING}")
+                _ENCODERS[model] = tiktoken.get_encoding(FALLBACK_ENCODING)
+        return _ENCODERS[model]
+
 class CostCalculator:
     GPT_4O_MINI_INPUT_COST = 0.15 / 1_000_000  # $0.15 per 1M input tokens
     GPT_4O_MINI_OUTPUT_COST = 0.60 / 1_000_000  # $0.60 per 1M output tokens
@@ -13,24 +35,20 @@ class CostCalculator:
     FIRECRAWL_COST_PER_CREDIT = 83 / 100_000  # $83 per 100,000 credits
 
     @staticmethod
-    def get_token_count(text: str) -> int:
+    def get_token_count(text: str, model: Optional[str] = None) -> int:
         """Count tokens in a text string using tiktoken"""
-        encoding = tiktoken.encoding_for_model("gpt-4o-mini")
-        return len(encoding.encode(text))
+        return len(get_encoder(model).encode(text))
+
+    @staticmethod
+    def count_tokens_batch(texts: List[str], model: Optional[str] = None) -> List[int]:
+        """Count tokens for many strings in one pass, tokenizing them in parallel"""
+        if not texts:
+            return []
+        return [len(tokens) for tokens in get_encoder(model).encode_batch(texts)]
 
     @classmethod
-    def calculate_gpt_cost(cls, input_text: str, output_text: str, completion: Completion = None) -> Dict[str, Union[int, float]]:
-        """Calculate cost for GPT-4o-mini usage"""
-        if completion and hasattr(completion, 'usage'):
-            # Use actual token counts from OpenAI response
-            input_tokens = completion.usage.prompt_tokens
-            output_tokens = completion.usage.completion_tokens
-        else:
-            # Fall back to tiktoken estimation if completion object not provided
-            input_tokens = cls.get_token_count(input_text)
-            output_tokens = cls.get_token_count(output_text)
-            logger.warning("Using tiktoken estimation for token counts as completion object not provided")
-        
+    def cost_from_tokens(cls, input_tokens: int, output_tokens: int) -> Dict[str, Union[int, float]]:
+        """Price known GPT-4o-mini token counts"""
         input_cost = input_tokens * cls.GPT_4O_MINI_INPUT_COST
         output_cost = output_tokens * cls.GPT_4O_MINI_OUTPUT_COST
         total_cost = input_cost + output_cost
@@ -0,0 +1,26 @@
+import hashlib
+import json
+from typing import Any
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+def hash_bytes(content: bytes) -> str:
+    """Return the SHA-256 hex digest of raw bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+def hash_text(text: str) -> str:
+    """Return the SHA-256 hex digest of the full text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_params(**params: Any) -> str:
+    """Return a short, order-independent digest of generation parameters"""
+    encoded = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+def hash_file(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Stream a file on disk through SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
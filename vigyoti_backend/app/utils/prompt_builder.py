@@ -0,0 +1,84 @@
+"""
+Token-budgeted prompt assembly.
+
+Prompts are sized with tiktoken rather than character slices: the model's
+context window (capped by PROMPT_MAX_INPUT_TOKENS to keep spend predictable)
+is split between the system prompt, the fixed parts of the user prompt
+(instructions, user requirements), the reserved output tokens and, with
+whatever is left, the source content, which is cut at a sentence boundary.
+"""
+import re
+from typing import Callable, List, Optional
+import tiktoken
+from ..core.config import settings
+from .cost_calculator import get_encoder
+
+# Context windows of the chat models we call; unknown models get the smallest
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Chat format overhead per request, plus slack for estimate drift
+PROMPT_SAFETY_MARGIN = 64
+
+_SENTENCE_END = re.compile(r"[.!?…](?=\s)|\n")
+
+def context_window(model: Optional[str] = None) -> int:
+    """Return the context window of a model in tokens"""
+    return MODEL_CONTEXT_WINDOWS.get(model or settings.OPENAI_MODEL, DEFAULT_CONTEXT_WINDOW)
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Trim text to at most max_tokens, ending on a sentence boundary where one is close enough"""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoder(model or settings.OPENAI_MODEL)
+    return _truncate_encoded(text, encoding.encode(text), max_tokens, encoding)
+
+def _truncate_encoded(text: str, tokens: List[int], max_tokens: int, encoding: tiktoken.Encoding) -> str:
+    if max_tokens <= 0:
+        return ""
+    if len(tokens) <= max_tokens:
+        return text
+
+    truncated = encoding.decode(tokens[:max_tokens])
+    # Only back off to a sentence end if that keeps most of the budget
+    boundaries = [match.end() for match in _SENTENCE_END.finditer(truncated)]
+    if boundaries and boundaries[-1] >= len(truncated) // 2:
+        truncated = truncated[:boundaries[-1]]
+    return truncated.rstrip()
+
+def content_budget(
+    fixed_tokens: int,
+    max_output_tokens: int,
+    model: Optional[str] = None
+) -> int:
+    """Tokens left for source content once the fixed prompt tokens and the output are reserved"""
+    available = min(
+        context_window(model) - max_output_tokens,
+        settings.PROMPT_MAX_INPUT_TOKENS
+    )
+    return max(0, available - fixed_tokens - PROMPT_SAFETY_MARGIN)
+
+def fit_prompt(
+    render: Callable[[str], str],
+    content: str,
+    system_prompt: str = "",
+    max_output_tokens: int = 1000,
+    model: Optional[str] = None
+) -> str:
+    """Render a prompt around content, trimming the content to fit the token budget.
+
+    `render` builds the full user prompt for a given content string; it is
+    rendered once without content to measure the instructions and user
+    requirements, which always go through untouched. Tokenizes a whole
+    document, so async callers should run it with asyncio.to_thread.
+    """
+    encoding = get_encoder(model or settings.OPENAI_MODEL)
+    # The fixed text and the content are tokenized in one parallel pass
+    fixed_tokens, content_tokens = encoding.encode_batch([system_prompt + render(""), content])
+    budget = content_budget(len(fixed_tokens), max_output_tokens, model)
+    return render(_truncate_encoded(content, content_tokens, budget, encoding))
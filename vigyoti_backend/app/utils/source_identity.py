@@ -0,0 +1,122 @@
+"""
+Canonical identities for content sources.
+
+The same video, paper or article reaches us in many URL shapes (tracking
+parameters, mobile hosts, shorts and embed links, arXiv abs/pdf pages). Cache
+and single-flight keys are built from the canonical id instead of the raw URL
+so every shape shares one scrape and one summary:
+
+- yt:<video id>
+- arxiv:<paper id>[v<n>]  (unversioned ids mean "latest" and stay unversioned)
+- url:<normalized url>
+"""
+import re
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+YOUTUBE_HOSTS = {"youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+YOUTUBE_PATH_PREFIXES = ("shorts", "embed", "live", "v", "e")
+VIDEO_ID_PATTERN = re.compile(r"^[\w-]{11}$")
+
+ARXIV_HOSTS = {"arxiv.org", "export.arxiv.org"}
+# New-style (2301.00001) and old-style (hep-th/9901001) identifiers
+ARXIV_ID_PATTERN = re.compile(r"^(\d{4}\.\d{4,5}|[a-z-]+(?:\.[A-Z]{2})?/\d{7})(?:v(\d+))?$")
+
+STRIPPED_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+# Second-level labels of country-code suffixes (example.co.uk), which aren't registrable on their own
+PUBLIC_SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "edu", "ac", "ne", "or", "go"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref_src", "ref_url", "_hsenc", "_hsmi", "mkt_tok", "si"
+}
+TRACKING_PARAM_PREFIXES = ("utm_", "pk_", "hsa_")
+
+def _is_registrable(host: str) -> bool:
+    labels = host.split(":")[0].split(".")
+    if len(labels) < 2:
+        return False
+    return not (len(labels) == 2 and len(labels[1]) == 2 and labels[0] in PUBLIC_SECOND_LEVEL_LABELS)
+
+def _host(netloc: str) -> str:
+    host = netloc.rsplit("@", 1)[-1].lower()
+    for prefix in STRIPPED_HOST_PREFIXES:
+        # Only a subdomain prefix: amp.dev and m.co.uk are sites of their own
+        if host.startswith(prefix) and _is_registrable(host[len(prefix):]):
+            return host[len(prefix):]
+    return host
+
+def _split(url: str):
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    return urlsplit(url)
+
+def youtube_video_id(url: str) -> Optional[str]:
+    """Video id from any watch, youtu.be, shorts, embed or live URL"""
+    parts = _split(url)
+    host = _host(parts.netloc).split(":")[0]
+    segments = [segment for segment in parts.path.split("/") if segment]
+    candidate = None
+    if host == "youtu.be":
+        candidate = segments[0] if segments else None
+    elif host in YOUTUBE_HOSTS:
+        if segments[:1] == ["watch"] or not segments:
+            candidate = dict(parse_qsl(parts.query)).get("v")
+        elif len(segments) >= 2 and segments[0] in YOUTUBE_PATH_PREFIXES:
+            candidate = segments[1]
+    return candidate if candidate and VIDEO_ID_PATTERN.match(candidate) else None
+
+def arxiv_paper_id(url: str) -> Optional[Tuple[str, Optional[str]]]:
+    """(paper id, version or None) from an arXiv abs/pdf/html URL or an arXiv:<id> reference"""
+    reference = url.strip()
+    if reference.lower().startswith("arxiv:"):
+        path = reference[len("arxiv:"):]
+    else:
+        parts = _split(reference)
+        if _host(parts.netloc).split(":")[0] not in ARXIV_HOSTS:
+            return None
+        match = re.match(r"^/(?:abs|pdf|html|format)/(.+?)(?:\.pdf)?/?$", parts.path)
+        if not match:
+            return None
+        path = match.group(1)
+    match = ARXIV_ID_PATTERN.match(path)
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+def normalize_url(url: str) -> str:
+    """Stable form of a web URL: https, bare host, no default port, tracking parameters,
+    fragment or trailing slash, and the remaining query parameters sorted"""
+    parts = _split(url)
+    scheme = parts.scheme.lower()
+    host = _host(parts.netloc)
+    if ":" in host:
+        name, port = host.rsplit(":", 1)
+        if port.isdigit() and int(port) == DEFAULT_PORTS.get(scheme):
+            host = name
+    if scheme == "http":
+        scheme = "https"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+def youtube_source_id(video_id: str) -> str:
+    return f"yt:{video_id}"
+
+def arxiv_source_id(paper_id: str, version: Optional[str] = None) -> str:
+    return f"arxiv:{paper_id}v{version}" if version else f"arxiv:{paper_id}"
+
+def canonical_source_id(url: str) -> str:
+    """The canonical id of any supported source URL"""
+    video_id = youtube_video_id(url)
+    if video_id:
+        return youtube_source_id(video_id)
+    paper = arxiv_paper_id(url)
+    if paper:
+        return arxiv_source_id(*paper)
+    return f"url:{normalize_url(url)}"
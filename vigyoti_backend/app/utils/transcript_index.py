@@ -0,0 +1,143 @@
+"""
+Timestamped transcripts as one text buffer plus parallel arrays.
+
+Segments are stored as three typed arrays (start, duration, text offset)
+next to a single string of the joined text, so time -> text and text -> time
+lookups are binary searches rather than rescans of a list of dicts. The whole
+structure serializes to a small binary blob for caching.
+"""
+import base64
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"TIX1"
+HEADER = struct.Struct("<4sI")  # magic, segment count
+SEPARATOR = " "
+
+class TranscriptIndex:
+    """A transcript's text with a time <-> offset index"""
+
+    __slots__ = ("starts", "durations", "offsets", "text")
+
+    def __init__(self, starts: array, durations: array, offsets: array, text: str):
+        self.starts = starts  # seconds, ascending
+        self.durations = durations
+        self.offsets = offsets  # character offset of each segment in text, ascending
+        self.text = text
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict[str, Any]]) -> "TranscriptIndex":
+        """Build from YouTube's [{text, start, duration}] or transcription's [{text, start, end}]"""
+        starts, durations, offsets = array("d"), array("d"), array("I")
+        parts: List[str] = []
+        position = 0
+        for segment in segments:
+            text = segment["text"].strip()
+            if not text:
+                continue
+            if parts:
+                position += len(SEPARATOR)
+            starts.append(float(segment["start"]))
+            durations.append(float(segment["duration"] if "duration" in segment else segment["end"] - segment["start"]))
+            offsets.append(position)
+            parts.append(text)
+            position += len(text)
+        return cls(starts, durations, offsets, SEPARATOR.join(parts))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        return self.starts[-1] + self.durations[-1] if self.starts else 0.0
+
+    def segment(self, index: int) -> Dict[str, Any]:
+        end = self.offsets[index + 1] - len(SEPARATOR) if index + 1 < len(self) else len(self.text)
+        return {
+            "text": self.text[self.offsets[index]:end],
+            "start": self.starts[index],
+            "duration": self.durations[index]
+        }
+
+    def segments(self) -> List[Dict[str, Any]]:
+        return [self.segment(index) for index in range(len(self))]
+
+    def segment_at_time(self, seconds: float) -> int:
+        """Index of the segment playing at `seconds` (the nearest earlier one in a gap)"""
+        return max(0, bisect_right(self.starts, seconds) - 1)
+
+    def segment_at_offset(self, offset: int) -> int:
+        """Index of the segment containing a character offset"""
+        return max(0, bisect_right(self.offsets, offset) - 1)
+
+    def offset_at_time(self, seconds: float) -> int:
+        """Character offset where the segment playing at `seconds` begins"""
+        return self.offsets[self.segment_at_time(seconds)] if len(self) else 0
+
+    def time_at_offset(self, offset: int) -> float:
+        """Timestamp of a character offset, interpolated within its segment"""
+        if not len(self):
+            return 0.0
+        index = self.segment_at_offset(offset)
+        segment_end = self.offsets[index + 1] if index + 1 < len(self) else len(self.text)
+        length = max(1, segment_end - self.offsets[index])
+        fraction = min(1.0, (offset - self.offsets[index]) / length)
+        return self.starts[index] + fraction * self.durations[index]
+
+    def text_between(self, start_seconds: float, end_seconds: float) -> str:
+        """Text of every segment overlapping [start_seconds, end_seconds)"""
+        if not len(self) or end_seconds <= start_seconds:
+            return ""
+        first = self.segment_at_time(start_seconds)
+        if self.starts[first] + self.durations[first] <= start_seconds and first + 1 < len(self):
+            first += 1
+        last = bisect_right(self.starts, end_seconds - 1e-9)
+        end = self.offsets[last] - len(SEPARATOR) if last < len(self) else len(self.text)
+        return self.text[self.offsets[first]:end] if last > first else ""
+
+    def locate(self, quote: str, start: int = 0) -> Optional[Tuple[float, float]]:
+        """(start, end) seconds of the first occurrence of a quote, or None"""
+        offset = self.text.find(quote, start)
+        if offset < 0:
+            offset = self.text.lower().find(quote.lower(), start)
+            if offset < 0:
+                return None
+        return self.time_at_offset(offset), self.time_at_offset(offset + len(quote))
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form: header, float32 times, uint32 offsets, then zlib-compressed UTF-8 text"""
+        return b"".join((
+            HEADER.pack(MAGIC, len(self)),
+            array("f", self.starts).tobytes(),
+            array("f", self.durations).tobytes(),
+            array("I", self.offsets).tobytes(),
+            zlib.compress(self.text.encode("utf-8"))
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TranscriptIndex":
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a serialized transcript index")
+        position = HEADER.size
+        columns = []
+        for typecode in ("f", "f", "I"):
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(data[position:position + size])
+            columns.append(column)
+            position += size
+        starts, durations, offsets = columns
+        # Times are kept as float64 in memory so arithmetic on them stays exact
+        return cls(array("d", starts), array("d", durations), offsets, zlib.decompress(data[position:]).decode("utf-8"))
+
+    def to_base64(self) -> str:
+        """Serialized form for JSON-backed caches"""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_base64(cls, encoded: str) -> "TranscriptIndex":
+        return cls.from_bytes(base64.b64decode(encoded))
@@ -0,0 +1,81 @@
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+import aiofiles
+from fastapi import UploadFile
+from ..core.exceptions import FileSizeError
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+@dataclass
+class SpooledUpload:
+    """An upload copied to a temporary file, with its size and content hash"""
+    path: str
+    size: int
+    sha256: str
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+
+    @contextmanager
+    def view(self) -> Iterator[Union[mmap.mmap, bytes]]:
+        """Memory-map the spooled file read-only; pages are loaded on demand"""
+        if self.size == 0:
+            # mmap refuses empty files
+            yield b""
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+    def cleanup(self) -> None:
+        """Delete the spooled file"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+def _size_error(max_bytes: int) -> FileSizeError:
+    return FileSizeError(f"File size exceeds maximum limit of {max_bytes/1024/1024}MB")
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int,
+    suffix: str = "",
+    directory: Optional[str] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> SpooledUpload:
+    """Copy an upload to a temporary file in fixed-size chunks.
+
+    The SHA-256 digest and size limit are computed as the bytes stream past,
+    so at most one chunk is held in memory. Uploads whose declared size is
+    already over the limit are rejected before anything is read.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _size_error(max_bytes)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    os.close(fd)
+    try:
+        await file.seek(0)
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _size_error(max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+        await file.seek(0)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    return SpooledUpload(
+        path=path,
+        size=size,
+        sha256=digest.hexdigest(),
+        filename=file.filename,
+        content_type=file.content_type
+    )
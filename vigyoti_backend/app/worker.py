@@ -0,0 +1,167 @@
+"""
+Background worker for queued content generation jobs.
+
+Run one or more worker processes next to the API:
+
+    python -m app.worker [--concurrency N]
+
+Each process runs up to JOB_WORKER_CONCURRENCY jobs at a time. Jobs run the
+same code as the synchronous endpoints, so results, caching and cost info are
+identical; uploads are read from JOB_UPLOAD_DIR, which must be shared with the
+API.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+from typing import Any, Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from app.core.cache import close_redis
+from app.core.config import settings
+from app.core.jobs import (
+    dequeue_job, ack_job, get_job_params, update_job, requeue_stale_jobs,
+    set_current_job, RUNNING, COMPLETED, FAILED
+)
+from app.api.v1 import content_sources
+from app.services.llm_gateway import close_llm_client
+from app.services.firecrawl_client import close_firecrawl_client
+from app.services.transcription import close_hls_client, close_local_engine
+from app.services.content_processing.youtube_batch import close_youtube_api_client
+from app.services.content_processing.youtube_transcripts import close_transcript_executor
+
+load_dotenv(override=True)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def _run_json_job(kind: str, params: Dict[str, Any]) -> Any:
+    if kind == "text":
+        return await content_sources.text_to_twitter(content_sources.TextToTwitterInput(**params))
+    if kind == "url":
+        return await content_sources.url_to_twitter(content_sources.URLToTwitterInput(**params))
+    if kind == "m3u8":
+        return await content_sources.m3u8_to_twitter(content_sources.URLToTwitterInput(**params))
+    return await content_sources.youtube_to_twitter(content_sources.ContentGenerationRequest(**params))
+
+async def _run_upload_job(kind: str, params: Dict[str, Any]) -> Any:
+    endpoint = {
+        "audio": content_sources.audio_to_twitter,
+        "image": content_sources.image_to_twitter,
+        "document": content_sources.document_to_twitter,
+    }[kind]
+    upload = params["upload"]
+    with open(upload["path"], "rb") as f:
+        file = UploadFile(
+            file=f,
+            filename=upload["filename"],
+            headers=Headers({"content-type": upload["content_type"]})
+        )
+        return await endpoint(file=file, **params["options"])
+
+JOB_HANDLERS: Dict[str, Callable[[str, Dict[str, Any]], Awaitable[Any]]] = {
+    "text": _run_json_job,
+    "url": _run_json_job,
+    "m3u8": _run_json_job,
+    "youtube": _run_json_job,
+    "audio": _run_upload_job,
+    "image": _run_upload_job,
+    "document": _run_upload_job,
+}
+
+async def _heartbeat(job_id: str) -> None:
+    """Keep the job's heartbeat fresh so it isn't requeued as stale"""
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        try:
+            await update_job(job_id)
+        except Exception as e:
+            logger.warning(f"Failed to heartbeat job {job_id}: {str(e)}")
+
+async def run_job(job_id: str) -> None:
+    """Run one claimed job and store its result or error"""
+    job = await get_job_params(job_id)
+    if job is None:
+        # Expired or deleted while queued
+        await ack_job(job_id)
+        return
+
+    kind, params = job["kind"], job["params"]
+    logger.info(f"Running {kind} job {job_id}")
+    set_current_job(job_id)
+    await update_job(job_id, status=RUNNING, progress=0, stage="started")
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        result = await JOB_HANDLERS[kind](kind, params)
+        if hasattr(result, "model_dump"):
+            result = result.model_dump()
+        await update_job(job_id, status=COMPLETED, progress=100, stage="completed", result=result)
+        logger.info(f"Completed {kind} job {job_id}")
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Job {job_id} failed: {error}", exc_info=True)
+        await update_job(job_id, status=FAILED, stage="failed", error=str(error))
+    finally:
+        heartbeat.cancel()
+        set_current_job(None)
+        await ack_job(job_id)
+        upload = params.get("upload")
+        if upload and os.path.exists(upload["path"]):
+            os.unlink(upload["path"])
+
+async def _worker_loop(worker_id: int, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            job_id = await dequeue_job()
+            if job_id is not None:
+                await run_job(job_id)
+        except Exception as e:
+            # Keep the loop alive through Redis errors; an unacked job is requeued by the stale sweep
+            logger.error(f"Worker {worker_id} failed to poll or run a job: {str(e)}", exc_info=True)
+            await asyncio.sleep(1)
+
+async def _stale_job_sweeper(stop: asyncio.Event) -> None:
+    """Requeue jobs of dead workers at startup and then every JOB_STALE_SECONDS"""
+    while not stop.is_set():
+        try:
+            await requeue_stale_jobs()
+        except Exception as e:
+            logger.warning(f"Could not requeue stale jobs: {str(e)}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.JOB_STALE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_workers(concurrency: int, stop: Optional[asyncio.Event] = None) -> None:
+    """Run `concurrency` job loops, plus the stale job sweep, until stop is set"""
+    stop = stop or asyncio.Event()
+    logger.info(f"Job worker started with concurrency {concurrency}")
+    await asyncio.gather(
+        _stale_job_sweeper(stop),
+        *(_worker_loop(i, stop) for i in range(concurrency))
+    )
+
+async def _main(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # Finish in-flight jobs, then exit
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await run_workers(concurrency, stop)
+    finally:
+        await close_redis()
+        await close_llm_client()
+        await close_hls_client()
+        await close_firecrawl_client()
+        await close_local_engine()
+        await close_youtube_api_client()
+        close_transcript_executor()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background content generation workers")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(_main(args.concurrency))
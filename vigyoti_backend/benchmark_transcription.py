@@ -0,0 +1,71 @@
+"""
+Compare transcription backends by real-time factor.
+
+    python benchmark_transcription.py sample1.mp3 sample2.wav \
+        --backends openai whisper faster-whisper --repeat 3
+
+RTF is processing time divided by audio duration: 0.25 means four times faster
+than real time. Backends are called directly, bypassing the per-file result
+cache (long files on the openai backend still reuse cached segments on repeat
+runs), and each local backend is warmed up once so model loading isn't counted.
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+from app.services.transcription import get_transcription_backend, close_local_engine, get_local_engine_stats
+from app.services.transcription.segmenter import probe_duration
+from app.services.llm_gateway import close_llm_client
+
+async def benchmark(files: List[str], backends: List[str], repeat: int) -> None:
+    durations: Dict[str, float] = {path: await probe_duration(path) for path in files}
+    total_audio = sum(durations.values())
+    print(f"{len(files)} files, {total_audio:.1f}s of audio\n")
+
+    rows = []
+    for name in backends:
+        backend = get_transcription_backend(name)
+        if name != "openai":
+            await backend.transcribe(files[0])
+
+        for path in files:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                text = await backend.transcribe(path)
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            rows.append((name, path, durations[path], best, best / durations[path], len(text.split())))
+
+    print(f"{'backend':<16}{'file':<40}{'audio s':>9}{'best s':>9}{'RTF':>8}{'x RT':>8}{'words':>8}")
+    for name, path, duration, best, rtf, words in rows:
+        print(f"{name:<16}{path[-39:]:<40}{duration:>9.1f}{best:>9.2f}{rtf:>8.3f}{1 / rtf:>8.1f}{words:>8}")
+
+    print()
+    for name in backends:
+        processing = sum(row[3] for row in rows if row[0] == name)
+        print(f"{name:<16} overall RTF {processing / total_audio:.3f} ({total_audio / processing:.1f}x real time)")
+
+    for kind, stats in get_local_engine_stats().items():
+        load = [job["load_seconds"] for job in stats["recent_jobs"] if job["load_seconds"]]
+        if load:
+            print(f"{kind:<16} model load {max(load):.1f}s (excluded above)")
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare transcription backends by real-time factor")
+    parser.add_argument("files", nargs="+", help="Audio files to transcribe")
+    parser.add_argument("--backends", nargs="+", default=["openai", "whisper", "faster-whisper"])
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per file; the fastest is reported")
+    args = parser.parse_args()
+    try:
+        await benchmark(args.files, args.backends, args.repeat)
+    finally:
+        await close_local_engine()
+        await close_llm_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
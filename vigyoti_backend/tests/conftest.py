@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings the app refuses to start without; tests never reach these services
+for name, value in {
+    "OPENAI_API_KEY": "test",
+    "DATABASE_URL": "sqlite://",
+    "STRIPE_SECRET_KEY": "test",
+    "STRIPE_PUBLISHABLE_KEY": "test",
+    "FIREBASE_PRIVATE_KEY": "test",
+    "FIREBASE_CLIENT_EMAIL": "test@example.com",
+    # Required by app.core.settings, which some services still import
+    "YOUTUBE_API_KEY": "test",
+    "FIRECRAWL_API_KEY": "test",
+    "REPLICATE_API_TOKEN": "test",
+    "PHOENIX_API_KEY": "test",
+    "TWITTER_CLIENT_ID": "test",
+    "TWITTER_CLIENT_SECRET": "test",
+    "TWITTER_CALLBACK_URL": "http://localhost",
+    "SMARTPROXY_USERNAME": "test",
+    "SMARTPROXY_PASSWORD": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class FixtureServer:
+    """A local HTTP server over a fixture directory that can fail or slow down chosen paths"""
+
+    def __init__(self, directory: str):
+        self.requests = Counter()
+        self.failures = Counter()  # path -> remaining 503 responses
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests[self.path] += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    fail = server.failures[self.path] > 0
+                    if fail:
+                        server.failures[self.path] -= 1
+                try:
+                    if server.delay:
+                        threading.Event().wait(server.delay)
+                    if fail:
+                        self.send_error(503)
+                    else:
+                        super().do_GET()
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=directory))
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def hls_server():
+    with FixtureServer(os.path.join(FIXTURES_DIR, "hls")) as server:
+        yield server
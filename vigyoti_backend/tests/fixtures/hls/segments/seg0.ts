@@ -0,0 +1 @@
+one two three
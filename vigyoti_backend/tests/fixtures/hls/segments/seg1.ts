@@ -0,0 +1 @@
+four five six
@@ -0,0 +1 @@
+seven eight nine
@@ -0,0 +1 @@
+ten eleven twelve
@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+import pytest_asyncio
+from app.core.config import settings
+from app.core.exceptions import ContentProcessingError, InvalidCredentialsError
+from app.services import firecrawl_client
+
+PAGE = {"success": True, "data": {"markdown": "# Title\n\nBody", "metadata": {"title": "Title"}}}
+
+class StubFirecrawl:
+    """Answers POST /v1/scrape with scripted (status, headers, body, delay) responses, then PAGE"""
+
+    def __init__(self):
+        self.responses = deque()
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("content-length", 0)))
+                stub.requests.append({
+                    "path": self.path,
+                    "authorization": self.headers.get("authorization"),
+                    "json": json.loads(body)
+                })
+                status, headers, payload, delay = stub.responses.popleft() if stub.responses else (200, {}, PAGE, 0)
+                if delay:
+                    time.sleep(delay)
+                encoded = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("content-type", "application/json")
+                    self.send_header("content-length", str(len(encoded)))
+                    self.end_headers()
+                    self.wfile.write(encoded)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up first
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest_asyncio.fixture
+async def stub(monkeypatch):
+    server = StubFirecrawl()
+    client = httpx.AsyncClient(base_url=server.url, timeout=httpx.Timeout(5.0))
+    monkeypatch.setattr(firecrawl_client, "http_client", client)
+    monkeypatch.setattr(firecrawl_client, "_semaphore", firecrawl_client.asyncio.Semaphore(2))
+    monkeypatch.setattr(firecrawl_client, "RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "FIRECRAWL_API_KEY", "fc-test")
+    yield server
+    await client.aclose()
+    server.close()
+
+@pytest.mark.asyncio
+async def test_scrape_returns_data(stub):
+    data = await firecrawl_client.scrape_url("https://example.com/post")
+
+    assert data == PAGE["data"]
+    assert stub.requests == [{
+        "path": "/v1/scrape",
+        "authorization": "Bearer fc-test",
+        "json": {"url": "https://example.com/post", "formats": ["markdown"]}
+    }]
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(stub):
+    stub.responses.extend([
+        (503, {}, {"error": "unavailable"}, 0),
+        (429, {"Retry-After": "0"}, {"error": "rate limited"}, 0),
+    ])
+
+    assert await firecrawl_client.scrape_url("https://example.com") == PAGE["data"]
+    assert len(stub.requests) == 3
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(stub):
+    stub.responses.append((402, {}, {"error": "payment required"}, 0))
+
+    with pytest.raises(ContentProcessingError, match="HTTP 402"):
+        await firecrawl_client.scrape_url("https://example.com")
+    assert len(stub.requests) == 1
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded(stub, monkeypatch):
+    monkeypatch.setattr(settings, "FIRECRAWL_MAX_RETRIES", 2)
+    stub.responses.extend([(500, {}, {}, 0)] * 5)
+
+    with pytest.raises(ContentProcessingError, match="HTTP 500"):
+        await firecrawl_client.scrape_url("https://example.com")
+    assert len(stub.requests) == 3
+
+@pytest.mark.asyncio
+async def test_deadline_covers_the_whole_call(stub, monkeypatch):
+    monkeypatch.setattr(settings, "FIRECRAWL_DEADLINE", 0.3)
+    stub.responses.append((200, {}, PAGE, 1.0))
+
+    started = time.perf_counter()
+    with pytest.raises(ContentProcessingError, match="timed out"):
+        await firecrawl_client.scrape_url("https://example.com")
+    assert time.perf_counter() - started < 1.0
+
+@pytest.mark.asyncio
+async def test_unsuccessful_response_is_an_error(stub):
+    stub.responses.append((200, {}, {"success": False, "error": "Blocked by robots.txt"}, 0))
+
+    with pytest.raises(ContentProcessingError, match="Blocked by robots.txt"):
+        await firecrawl_client.scrape_url("https://example.com")
+
+@pytest.mark.asyncio
+async def test_missing_key_fails_at_call_time(stub, monkeypatch):
+    monkeypatch.setattr(settings, "FIRECRAWL_API_KEY", None)
+
+    with pytest.raises(InvalidCredentialsError):
+        await firecrawl_client.scrape_url("https://example.com")
+    assert stub.requests == []
+
+def test_retry_after_is_honoured_and_capped():
+    request = httpx.Request("POST", "http://stub/v1/scrape")
+
+    def rate_limited(retry_after: str) -> httpx.HTTPStatusError:
+        response = httpx.Response(429, headers={"Retry-After": retry_after}, request=request)
+        return httpx.HTTPStatusError("rate limited", request=request, response=response)
+
+    assert firecrawl_client._retry_delay(0, rate_limited("3")) == 3.0
+    assert firecrawl_client._retry_delay(0, rate_limited("600")) == firecrawl_client.RETRY_MAX_SECONDS
+    assert 0 <= firecrawl_client._retry_delay(2, httpx.ConnectError("refused")) <= 4 * firecrawl_client.RETRY_BASE_SECONDS
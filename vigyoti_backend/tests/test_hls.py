@@ -0,0 +1,103 @@
+import os
+import shutil
+import httpx
+import pytest
+import pytest_asyncio
+from app.core.config import settings
+from app.services.transcription import hls
+from app.services.transcription.playlist import plan_windows
+
+SEGMENTS = ["/segments/seg0.ts", "/segments/seg1.ts", "/segments/seg2.ts", "/segments/seg3.ts"]
+
+@pytest_asyncio.fixture
+async def http_client(monkeypatch):
+    # A client per test: the module's pooled client is bound to the loop it first ran on
+    client = httpx.AsyncClient(timeout=httpx.Timeout(5.0))
+    monkeypatch.setattr(hls, "http_client", client)
+    monkeypatch.setattr(hls, "RETRY_BACKOFF_SECONDS", 0.0)
+    yield client
+    await client.aclose()
+
+def _fixture_bytes(path: str) -> bytes:
+    with open(os.path.join(os.path.dirname(__file__), "fixtures", "hls", path.lstrip("/")), "rb") as f:
+        return f.read()
+
+@pytest.mark.asyncio
+async def test_fetch_playlist_follows_master_to_cheapest_variant(hls_server, http_client):
+    playlist = await hls.fetch_playlist(f"{hls_server.url}/master.m3u8")
+
+    assert not playlist.is_master
+    assert [segment.uri for segment in playlist.segments] == [f"{hls_server.url}{path}" for path in SEGMENTS]
+    assert playlist.duration == 16.0
+    assert hls_server.requests["/video_720.m3u8"] == 0
+
+@pytest.mark.asyncio
+async def test_failed_requests_are_retried(hls_server, http_client, tmp_path):
+    hls_server.failures["/audio.m3u8"] = 1
+    hls_server.failures["/segments/seg1.ts"] = 2
+
+    playlist = await hls.fetch_playlist(f"{hls_server.url}/audio.m3u8")
+    path = await hls.SegmentFetcher(str(tmp_path)).fetch(playlist.segments[1])
+
+    assert hls_server.requests["/audio.m3u8"] == 2
+    assert hls_server.requests["/segments/seg1.ts"] == 3
+    with open(path, "rb") as f:
+        assert f.read() == _fixture_bytes("/segments/seg1.ts")
+
+@pytest.mark.asyncio
+async def test_persistent_failure_gives_up(hls_server, http_client, tmp_path):
+    hls_server.failures["/segments/seg0.ts"] = settings.HLS_SEGMENT_RETRIES + 1
+    playlist = await hls.fetch_playlist(f"{hls_server.url}/audio.m3u8")
+
+    with pytest.raises(hls.ContentProcessingError):
+        await hls.SegmentFetcher(str(tmp_path)).fetch(playlist.segments[0])
+    assert hls_server.requests["/segments/seg0.ts"] == settings.HLS_SEGMENT_RETRIES + 1
+
+@pytest.mark.asyncio
+async def test_windows_download_concurrently_and_share_overlap(hls_server, http_client, tmp_path):
+    hls_server.delay = 0.1
+    playlist = await hls.fetch_playlist(f"{hls_server.url}/audio.m3u8")
+    windows = plan_windows(playlist.segments, 8.0)
+    assert [len(window) for window in windows] == [3, 2]  # the first window carries seg2 as overlap
+
+    fetcher = hls.SegmentFetcher(str(tmp_path))
+    for window in windows:
+        for segment in window:
+            fetcher.retain(segment)
+    outputs = [str(tmp_path / f"window-{index}") for index in range(len(windows))]
+    for window, output in zip(windows, outputs):
+        await hls._assemble(fetcher, None, window, output)
+
+    assert hls_server.max_in_flight > 1
+    assert all(hls_server.requests[path] == 1 for path in SEGMENTS)
+    with open(outputs[0], "rb") as f:
+        assert f.read() == b"".join(_fixture_bytes(path) for path in SEGMENTS[:3])
+    # Every segment is deleted once the last window that needs it has been assembled
+    assert sorted(os.listdir(tmp_path)) == ["window-0", "window-1"]
+
+class EchoBackend:
+    """Transcribes a window by reading back the fixture words it contains"""
+    name = "echo"
+
+    async def transcribe(self, path, source_hash=None):
+        with open(path, "r") as f:
+            return " ".join(f.read().split())
+
+@pytest.mark.asyncio
+async def test_transcribe_hls_stitches_windows(hls_server, http_client, monkeypatch):
+    async def run_stage(stage, identifier, compute):
+        return await compute()
+
+    async def convert_for_speech(src, out):
+        shutil.copyfile(src, out)
+
+    # ffmpeg, the transcription backend and the Redis stage cache are outside this test
+    monkeypatch.setattr(hls, "run_stage", run_stage)
+    monkeypatch.setattr(hls, "convert_for_speech", convert_for_speech)
+    monkeypatch.setattr(hls, "get_transcription_backend", lambda: EchoBackend())
+    monkeypatch.setattr(settings, "AUDIO_SEGMENT_SECONDS", 8.0)
+
+    transcript = await hls.transcribe_hls(f"{hls_server.url}/master.m3u8")
+
+    assert transcript == "one two three four five six seven eight nine ten eleven twelve"
+    assert all(hls_server.requests[path] == 1 for path in SEGMENTS)
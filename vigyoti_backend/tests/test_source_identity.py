@@ -0,0 +1,10 @@
+from app.utils.source_identity import canonical_source_id
+
+def test_mobile_and_amp_subdomains_share_the_site_id():
+    assert canonical_source_id("https://m.example.com/post?utm_source=x") == "url:https://example.com/post"
+    assert canonical_source_id("https://amp.theguardian.com/story") == "url:https://theguardian.com/story"
+    assert canonical_source_id("https://www.bbc.co.uk/news/") == "url:https://bbc.co.uk/news"
+
+def test_prefix_is_kept_when_it_is_the_site_itself():
+    assert canonical_source_id("https://amp.dev/about") == "url:https://amp.dev/about"
+    assert canonical_source_id("https://m.co.uk/") == "url:https://m.co.uk"
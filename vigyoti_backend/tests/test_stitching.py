@@ -0,0 +1,28 @@
+from app.services.transcription.stitching import stitch_transcripts, trim_overlap
+
+def test_repeated_words_at_the_boundary_are_trimmed():
+    previous = "and that was the end of the story"
+    current = "the end of the story. Then we moved on."
+
+    assert trim_overlap(previous, current, 2.0) == "Then we moved on."
+
+def test_run_may_start_a_little_way_into_the_segment():
+    previous = "we walked down to the river bank"
+    current = "uh, down to the river bank and sat there"
+
+    assert trim_overlap(previous, current, 2.0) == "and sat there"
+
+def test_phrase_recurring_later_in_the_segment_is_kept():
+    # Whisper heard the boundary differently, so only a common phrase deep in the segment matches
+    previous = "and that brings us to the end of the story"
+    current = (
+        "of this story. Then we discussed many other topics in great depth, "
+        "including the moral of the story and what it teaches us today."
+    )
+
+    assert trim_overlap(previous, current, 2.0) == current
+
+def test_stitch_skips_empty_segments():
+    texts = ["one two three four", "", "three four five six"]
+
+    assert stitch_transcripts(texts, 2.0) == "one two three four five six"
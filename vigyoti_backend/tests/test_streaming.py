@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+import pytest
+from app.core.usage import start_usage_tracking
+from app.services.content_processing import streaming
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+def _events(raw):
+    events = []
+    for block in raw:
+        name, data = block.strip().split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+async def _stream(monkeypatch, pieces, content_type, num_tweets, is_premium):
+    async def stream_chat_completion(messages, **kwargs):
+        for piece in pieces:
+            yield _chunk(piece)
+
+    monkeypatch.setattr(streaming, "stream_chat_completion", stream_chat_completion)
+    start_usage_tracking()
+    raw = [event async for event in streaming.stream_twitter_content(
+        [{"role": "user", "content": "prompt"}],
+        content_type=content_type,
+        num_tweets=num_tweets,
+        is_premium=is_premium,
+        max_tokens=100,
+        temperature=0.7
+    )]
+    events = _events(raw)
+    return [data for name, data in events if name == "post"], events[-1]
+
+@pytest.mark.asyncio
+async def test_premium_long_pieces_split_on_the_marker(monkeypatch):
+    pieces = ["\"First\"\n\nOne para", "graph.\n\nTwo.[NEW_", "CONTENT]\"Second\"\n\nMore."]
+
+    posts, done = await _stream(monkeypatch, pieces, "long", 2, True)
+
+    assert [post["tweet_text"] for post in posts] == ["\"First\"\n\nOne paragraph.\n\nTwo.", "\"Second\"\n\nMore."]
+    assert all(post["is_premium_content"] for post in posts)
+    assert done[0] == "done" and done[1]["num_posts"] == 2 and "cost_info" in done[1]
+
+@pytest.mark.asyncio
+async def test_premium_long_without_marker_is_one_post(monkeypatch):
+    # Text, URL and document prompts ask for a single long post
+    posts, _ = await _stream(monkeypatch, ["Intro.\n\n", "Body.\n\nEnd."], "long", 1, True)
+
+    assert [post["tweet_text"] for post in posts] == ["Intro.\n\nBody.\n\nEnd."]
+
+@pytest.mark.asyncio
+async def test_regular_posts_split_on_blank_lines(monkeypatch):
+    posts, _ = await _stream(monkeypatch, ["one\n", "\ntwo\n\nthree"], "thread", 2, False)
+
+    assert [(post["tweet_text"], post["thread_position"]) for post in posts] == [("one", 1), ("two", 2)]